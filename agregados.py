@@ -0,0 +1,140 @@
+import atexit
+import json
+import os
+
+import repositorio
+from arquivos import gravar_json_atomico
+from serializacao import ler_arquivo
+from vendas import itens_da_venda
+
+# ===================== Agregados de vendas =====================
+# Totais por produto, cliente, fornecedor e dia mantidos a cada venda: o
+# repositório avisa cada venda que entra na coleção (gravada por este terminal
+# ou trazida de outro na sincronização) e ela é somada em O(itens), sem reler
+# o histórico.
+#
+# Os agregados ficam em dados/agregados.json, gravados ao sair do menu de
+# vendas e ao encerrar o programa. Junto vão a quantidade de vendas somadas e
+# a soma dos seus IDs: se não baterem com a coleção ao carregar (o programa
+# caiu antes de gravar, vendas foram alteradas por fora...), os agregados estão
+# velhos e são recalculados a partir das vendas.
+#
+# O fornecedor de uma venda é o fornecedor do produto no momento em que ela é
+# somada; vendas sem data_hora (anteriores a ela) entram no dia "sem data".
+# Esse fornecedor fica guardado nos agregados (fornecedor_de), e é dele que a
+# venda sai ao ser subtraída, mesmo que o produto já tenha saído da coleção ou
+# mudado de fornecedor.
+
+ARQUIVO_AGREGADOS = "agregados.json"
+
+SEM_DATA = "sem data"
+
+_estado = {"origem": None, "arquivo": None, "agregados": None, "alterado": False}
+
+def _vazios():
+    return {
+        "vendas": 0,
+        "soma_ids": 0,
+        "faturamento": 0.0,
+        "por_produto": {},     # id_produto -> [quantidade, faturamento]
+        "por_cliente": {},     # id_cliente -> faturamento
+        "por_fornecedor": {},  # fornecedor_id -> faturamento
+        "por_dia": {},         # "AAAA-MM-DD" -> [vendas, faturamento]
+        "fornecedor_de": {},   # id_produto -> fornecedor_id com que as vendas dele foram somadas
+    }
+
+def _fornecedor(agregados, id_produto, sinal):
+    """Fornecedor do produto para a soma (o atual) ou para a subtração (o guardado na soma)."""
+    fornecedores = agregados["fornecedor_de"]
+    if sinal > 0 or id_produto not in fornecedores:
+        produto = repositorio.buscar("produtos", id_produto)
+        if produto is None:
+            return fornecedores.get(id_produto)
+        fornecedores[id_produto] = produto["fornecedor_id"]
+    return fornecedores[id_produto]
+
+def _somar(agregados, venda, sinal=1):
+    """Soma (ou, com sinal=-1, subtrai) uma venda nos agregados."""
+    valor = sinal * venda["valor_total"]
+    agregados["vendas"] += sinal
+    agregados["soma_ids"] += sinal * venda["id_venda"]
+    agregados["faturamento"] += valor
+
+    por_cliente = agregados["por_cliente"]
+    por_cliente[venda["id_cliente"]] = por_cliente.get(venda["id_cliente"], 0.0) + valor
+
+    dia = venda["data_hora"][:10] if venda.get("data_hora") else SEM_DATA
+    totais_dia = agregados["por_dia"].setdefault(dia, [0, 0.0])
+    totais_dia[0] += sinal
+    totais_dia[1] += valor
+
+    por_fornecedor = agregados["por_fornecedor"]
+    for item in itens_da_venda(venda):
+        totais_produto = agregados["por_produto"].setdefault(item["id_produto"], [0, 0.0])
+        totais_produto[0] += sinal * item["quantidade"]
+        totais_produto[1] += sinal * item["valor_total"]
+
+        id_fornecedor = _fornecedor(agregados, item["id_produto"], sinal)
+        if id_fornecedor is not None:
+            por_fornecedor[id_fornecedor] = por_fornecedor.get(id_fornecedor, 0.0) + sinal * item["valor_total"]
+
+def recalcular(vendas):
+    """Recalcula os agregados do zero a partir de todas as vendas."""
+    agregados = _vazios()
+    for venda in vendas:
+        _somar(agregados, venda)
+    return agregados
+
+def _ler_arquivo():
+    """Lê os agregados gravados, ou None se não existirem ou estiverem ilegíveis."""
+    arquivo = repositorio.caminho(ARQUIVO_AGREGADOS)
+    if not os.path.exists(arquivo):
+        return None
+    try:
+        agregados = ler_arquivo(arquivo)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if "fornecedor_de" not in agregados:
+        return None  # gravados por uma versão anterior: recalcula
+    # JSON só tem chaves texto: os IDs voltam a ser inteiros
+    for campo in ("por_produto", "por_cliente", "por_fornecedor", "fornecedor_de"):
+        agregados[campo] = {int(id): total for id, total in agregados[campo].items()}
+    return agregados
+
+def agregados():
+    """Retorna os agregados atuais, recalculando-os só se os gravados estiverem velhos."""
+    with repositorio.trava_memoria:
+        repositorio.sincronizar("vendas")
+        vendas = repositorio.indice("vendas")
+        if _estado["origem"] is vendas:
+            return _estado["agregados"]
+
+        # Primeira leitura (ou a coleção foi recarregada): confere os gravados
+        atual = _ler_arquivo()
+        if atual is None or atual["vendas"] != len(vendas) or atual["soma_ids"] != sum(vendas):
+            atual = recalcular(vendas.values())
+            _estado["alterado"] = True
+        _estado.update(origem=vendas, arquivo=repositorio.caminho(ARQUIVO_AGREGADOS), agregados=atual)
+        return atual
+
+def _ao_mudar_venda(acao, venda, anterior):
+    """Mantém os agregados em dia com cada venda que entra, muda ou sai da coleção."""
+    if _estado["origem"] is not repositorio.indice("vendas"):
+        return  # ainda não carregados: serão conferidos na primeira leitura
+    if anterior is not None:
+        _somar(_estado["agregados"], anterior, -1)
+    _somar(_estado["agregados"], venda, -1 if acao == "remover" else 1)
+    _estado["alterado"] = True
+
+repositorio.observar("vendas", _ao_mudar_venda)
+
+def salvar():
+    """Grava os agregados na pasta de dados, se mudaram desde a última gravação."""
+    with repositorio.trava_memoria:
+        if not _estado["alterado"] or _estado["agregados"] is None:
+            return
+        # Grava na pasta de onde as vendas vieram, mesmo que ela já tenha sido trocada
+        gravar_json_atomico(_estado["arquivo"], _estado["agregados"])
+        _estado["alterado"] = False
+
+atexit.register(salvar)
@@ -0,0 +1,384 @@
+import atexit
+import json
+import os
+import sys
+import threading
+from collections.abc import Mapping
+
+import particoes
+import repositorio
+import snapshot_binario
+from arquivos import gravar_json_atomico
+from diario import anexar_registro, carregar_com_diario, carregar_snapshot, compactar, ler_diario, mesclar_diario
+from registros import compactar as compactar_registro
+from serializacao import ler_arquivo
+
+# ===================== Backend JSON (pasta dados/) =====================
+# Cada entidade é um arquivo .json com a lista de registros. Entidades com
+# diário (produtos e vendas) anexam a imagem de cada registro novo ou alterado
+# em um .jsonl e só reescrevem o snapshot na compactação, a cada LIMITE_DIARIO
+# linhas. Toda gravação é atômica (temporário + rename).
+#
+# Vários terminais podem usar a mesma pasta: leituras e gravações acontecem
+# sob a trava de dados do repositório, e cada processo guarda a assinatura
+# (mtime/tamanho/inode) dos arquivos que leu para saber, com um stat, se
+# outro processo os alterou. Do diário só se lê o trecho novo.
+#
+# Com a escrita adiada ligada (OTIMIZA_JANELA_ESCRITA, em segundos), salvar
+# apenas marca a entidade como pendente: todas as gravações dentro da janela
+# viram uma só, feita por uma thread em segundo plano ou ao sair do programa.
+# A escrita adiada é pensada para um único terminal por pasta de dados.
+#
+# Com OTIMIZA_SNAPSHOT_BINARIO=1, cada snapshot .json ganha um espelho .bin
+# (snapshot_binario.py), regravado junto com ele. Ao ler, se o .bin espelha a
+# versão atual do .json, a coleção é aberta com mmap e os registros só são
+# decodificados quando acessados, em vez de um json.load do arquivo inteiro.
+# Os .bin existentes podem ser gerados com: python armazenamento_json.py [pasta]
+#
+# Entidades particionadas (vendas) não têm um único snapshot: a compactação
+# grava as partições por mês de particoes.py, e o manifesto delas faz o papel
+# do .json na detecção de mudanças. Elas não usam o espelho .bin: com
+# OTIMIZA_SNAPSHOT_BINARIO=1 as vendas voltam a ser lidas com json.load,
+# partição por partição. Em troca, uma consulta por período só lê as partições
+# que cruzam o período, e as arquivadas são lidas em fluxo.
+
+# Registros no diário que disparam a compactação no snapshot
+LIMITE_DIARIO = 500
+
+# Janela da escrita adiada, em segundos (0 = grava na hora)
+JANELA_ESCRITA = float(os.environ.get("OTIMIZA_JANELA_ESCRITA", "0"))
+
+# Log de refazer das transações com mais de uma operação
+ARQUIVO_TRANSACOES = "transacoes.jsonl"
+
+# Espelha os snapshots em .bin e lê por eles (ver acima)
+SNAPSHOT_BINARIO = os.environ.get("OTIMIZA_SNAPSHOT_BINARIO", "0") == "1"
+
+_registros_no_diario = {}
+_posicao_diario = {}   # entidade -> bytes do diário já lidos por este processo
+_assinaturas = {}      # entidade -> assinatura do arquivo na última leitura/gravação
+_pendentes = {}        # entidade -> coleção a gravar no próximo descarregar()
+_temporizador = None
+_lock_pendentes = threading.Lock()
+
+class ArquivoCorrompido(Exception):
+    """O arquivo de dados existe mas não é um JSON válido."""
+
+# ===================== Leitura =====================
+
+def _assinatura(arquivo):
+    """Identifica a versão de um arquivo no disco sem lê-lo."""
+    try:
+        info = os.stat(arquivo)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+def _arquivo_binario(entidade):
+    return repositorio.caminho(entidade + ".bin")
+
+def _arquivo_principal(entidade):
+    """Arquivo cuja assinatura muda a cada gravação completa da entidade."""
+    config = repositorio.ENTIDADES[entidade]
+    if "particionada" in config:
+        return particoes.caminho_manifesto(entidade)
+    return repositorio.caminho(config["arquivo"])
+
+def gravar_binario(entidade, registros=None):
+    """Grava o espelho .bin do snapshot atual da entidade (lido do .json, se não vier pronto)."""
+    if "particionada" in repositorio.ENTIDADES[entidade]:
+        return
+    arquivo = repositorio.caminho(repositorio.ENTIDADES[entidade]["arquivo"])
+    if registros is None:
+        registros = carregar_snapshot(arquivo)
+    try:
+        snapshot_binario.gravar(_arquivo_binario(entidade), entidade, registros, _assinatura(arquivo) or ())
+    except OSError:
+        # No Windows um .bin aberto (mapeado) não pode ser substituído: fica
+        # velho, e a próxima leitura percebe pela assinatura e usa o .json
+        pass
+
+def _abrir_binario(entidade, arquivo):
+    """Abre a entidade pelo .bin, ou None se ele não espelha o .json atual."""
+    origem = _assinatura(arquivo)
+    if origem is None:
+        return None
+    snapshot = snapshot_binario.abrir(_arquivo_binario(entidade), origem)
+    if snapshot is None:
+        # .bin ausente ou velho (ex.: .json gravado sem o espelho): refaz uma vez
+        gravar_binario(entidade)
+        snapshot = snapshot_binario.abrir(_arquivo_binario(entidade), origem)
+        if snapshot is None:
+            return None
+    return snapshot_binario.ColecaoBinaria(snapshot, lambda registro: compactar_registro(entidade, registro))
+
+def _ler_arquivo(entidade, binario=True):
+    """Lê a entidade do disco (snapshot + diário, quando houver).
+
+    Com o snapshot binário, retorna a coleção {id: registro} preguiçosa em vez
+    da lista de registros.
+    """
+    config = repositorio.ENTIDADES[entidade]
+    arquivo = repositorio.caminho(config["arquivo"])
+
+    # Um arquivo ilegível nunca vira uma lista vazia: a próxima gravação
+    # apagaria o catálogo inteiro
+    try:
+        _assinaturas[entidade] = _assinatura(_arquivo_principal(entidade))
+        if "particionada" in config:
+            registros, pendentes, posicao = mesclar_diario(
+                particoes.ler(entidade), repositorio.caminho(config["diario"]), config["chave"]
+            )
+            _registros_no_diario[entidade] = pendentes
+            _posicao_diario[entidade] = posicao
+            return registros
+
+        colecao = _abrir_binario(entidade, arquivo) if SNAPSHOT_BINARIO and binario else None
+        if colecao is not None:
+            if "diario" in config:
+                pendentes, _posicao_diario[entidade] = ler_diario(repositorio.caminho(config["diario"]))
+                _registros_no_diario[entidade] = len(pendentes)
+                for registro in pendentes:
+                    colecao[registro[config["chave"]]] = registro  # a imagem do diário é a mais recente
+            return colecao
+
+        if "diario" in config:
+            registros, pendentes, posicao = carregar_com_diario(
+                arquivo, repositorio.caminho(config["diario"]), config["chave"]
+            )
+            _registros_no_diario[entidade] = pendentes
+            _posicao_diario[entidade] = posicao
+            return registros
+
+        if not os.path.exists(arquivo):
+            return []
+        return ler_arquivo(arquivo)
+    except json.JSONDecodeError as e:
+        raise ArquivoCorrompido(f"{arquivo} está corrompido ({e}); restaure-o antes de continuar") from e
+
+def ler(entidade):
+    """Lê a entidade do disco, concluindo antes alguma transação interrompida."""
+    with repositorio.trava_dados():
+        recuperar()
+        return _ler_arquivo(entidade)
+
+def percorrer_periodo(entidade, inicio=None, fim=None):
+    """Registros com data em [inicio, fim], um de cada vez: só as partições do período mais o diário.
+
+    A trava de dados fica com o gerador até ele ser consumido (ou fechado).
+    """
+    config = repositorio.ENTIDADES[entidade]
+    chave = config["chave"]
+    with repositorio.trava_dados():
+        recuperar()
+        # O diário tem as vendas ainda não compactadas; após uma queda na
+        # compactação elas também podem estar nas partições, e valem as dele
+        pendentes, _ = ler_diario(repositorio.caminho(config["diario"]))
+        no_diario = {registro[chave] for registro in pendentes}
+        for registro in particoes.percorrer(entidade, inicio, fim):
+            if registro[chave] not in no_diario:
+                yield registro
+    for registro in pendentes:
+        if repositorio.no_periodo(entidade, registro, inicio, fim):
+            yield registro
+
+def ler_periodo(entidade, inicio=None, fim=None):
+    """Lista dos registros com data em [inicio, fim] (ver percorrer_periodo())."""
+    return list(percorrer_periodo(entidade, inicio, fim))
+
+def mudancas(entidade):
+    """Retorna o que outro processo gravou desde a última leitura, ou None.
+
+    O resultado é (registros, completo, removidos): com completo=True os
+    registros são a coleção inteira; senão, só os registros novos do diário.
+    """
+    config = repositorio.ENTIDADES[entidade]
+    if _assinatura(_arquivo_principal(entidade)) != _assinaturas.get(entidade):
+        registros = ler(entidade)
+        return (registros.values() if isinstance(registros, Mapping) else registros), True, ()
+
+    if "diario" not in config:
+        return None
+
+    arquivo_diario = repositorio.caminho(config["diario"])
+    if (_assinatura(arquivo_diario) or (0, 0, 0))[1] <= _posicao_diario.get(entidade, 0):
+        return None
+    novos, _posicao_diario[entidade] = ler_diario(arquivo_diario, _posicao_diario.get(entidade, 0))
+    _registros_no_diario[entidade] = _registros_no_diario.get(entidade, 0) + len(novos)
+    return novos, False, ()
+
+# ===================== Gravação =====================
+
+def _escrever(entidade, registros):
+    """Escreve a coleção inteira no arquivo da entidade (compactando o diário, se houver)."""
+    config = repositorio.ENTIDADES[entidade]
+    arquivo = repositorio.caminho(config["arquivo"])
+    registros = list(registros)
+    if "particionada" in config:
+        particoes.gravar(entidade, registros)
+        # Só depois das partições estarem no disco o diário pode ser zerado
+        with open(repositorio.caminho(config["diario"]), "w", encoding="utf-8"):
+            pass
+        _registros_no_diario[entidade] = 0
+        _posicao_diario[entidade] = 0
+    elif "diario" in config:
+        compactar(arquivo, repositorio.caminho(config["diario"]), registros)
+        _registros_no_diario[entidade] = 0
+        _posicao_diario[entidade] = 0
+    else:
+        gravar_json_atomico(arquivo, registros)
+    if SNAPSHOT_BINARIO:
+        gravar_binario(entidade, registros)
+
+def _gravar(entidade, registros):
+    """Grava a coleção inteira da entidade no disco, de forma atômica."""
+    config = repositorio.ENTIDADES[entidade]
+    with repositorio.trava_memoria, repositorio.trava_dados():
+        if "diario" in config:
+            # O diário pode ter vendas de outros terminais que ainda não estão
+            # em memória; elas precisam entrar no snapshot antes de zerá-lo
+            repositorio.sincronizar(entidade)
+        _escrever(entidade, registros)
+        _assinaturas[entidade] = _assinatura(_arquivo_principal(entidade))
+
+def salvar(entidade, registros):
+    """Grava a coleção inteira da entidade (ou agenda, com a escrita adiada)."""
+    global _temporizador
+    if JANELA_ESCRITA <= 0:
+        _gravar(entidade, registros)
+        return
+
+    with _lock_pendentes:
+        _pendentes[entidade] = registros
+        if _temporizador is None:
+            _temporizador = threading.Timer(JANELA_ESCRITA, descarregar)
+            _temporizador.daemon = True
+            _temporizador.start()
+
+def descarregar():
+    """Grava agora tudo o que a escrita adiada deixou pendente."""
+    global _temporizador
+    with _lock_pendentes:
+        if _temporizador is not None:
+            _temporizador.cancel()
+            _temporizador = None
+        pendentes = list(_pendentes.items())
+        _pendentes.clear()
+
+    for entidade, registros in pendentes:
+        _gravar(entidade, registros)
+
+atexit.register(descarregar)
+
+def _anexar(entidade, registro):
+    """Anexa um registro ao diário da entidade, avançando a posição já lida."""
+    config = repositorio.ENTIDADES[entidade]
+    gravados = anexar_registro(repositorio.caminho(config["diario"]), registro)
+    _posicao_diario[entidade] = _posicao_diario.get(entidade, 0) + gravados
+    _registros_no_diario[entidade] = _registros_no_diario.get(entidade, 0) + 1
+
+def inserir(entidade, registro, registros):
+    """Persiste um registro novo: uma linha no diário, ou o arquivo inteiro."""
+    if "diario" not in repositorio.ENTIDADES[entidade]:
+        salvar(entidade, registros)
+        return
+
+    # Entidades com diário só anexam uma linha; a compactação é periódica
+    _anexar(entidade, registro)
+    if _registros_no_diario[entidade] >= LIMITE_DIARIO:
+        salvar(entidade, registros)
+
+def inserir_lote(entidade, novos, registros):
+    """Persiste vários registros novos com uma única gravação."""
+    if "diario" not in repositorio.ENTIDADES[entidade]:
+        salvar(entidade, registros)
+        return
+
+    # Um lote grande vai direto para o snapshot em vez de inchar o diário
+    if _registros_no_diario.get(entidade, 0) + len(novos) >= LIMITE_DIARIO:
+        salvar(entidade, registros)
+        return
+    for registro in novos:
+        _anexar(entidade, registro)
+
+def atualizar(entidade, registro, registros):
+    """Persiste um registro alterado: a nova imagem no diário, ou o arquivo inteiro."""
+    inserir(entidade, registro, registros)
+
+def remover(entidade, id, registros):
+    """Persiste a remoção de um registro reescrevendo o arquivo da entidade."""
+    salvar(entidade, registros)
+
+# ===================== Transações =====================
+# Uma transação (ex.: venda + baixa de estoque) toca mais de um arquivo. Antes
+# de gravar qualquer um deles, as imagens finais dos registros vão numa única
+# linha do log de refazer, com fsync: esse é o ponto de confirmação. Se o
+# processo cair no meio, a próxima leitura reaplica o log (reaplicar é seguro,
+# pois são imagens completas) e só então o zera.
+
+def efetivar(operacoes):
+    """Grava de forma atômica uma lista de operações [acao, entidade, registro]."""
+    with repositorio.trava_dados():
+        log = repositorio.caminho(ARQUIVO_TRANSACOES)
+        anexar_registro(log, {"operacoes": operacoes})
+
+        tocadas = {}
+        for acao, entidade, registro in operacoes:
+            tocadas.setdefault(entidade, []).append((acao, registro))
+        for entidade, alteracoes in tocadas.items():
+            sem_remocoes = all(acao != "remover" for acao, _ in alteracoes)
+            if sem_remocoes and "diario" in repositorio.ENTIDADES[entidade]:
+                # Ex.: uma venda anexa a venda e as imagens dos produtos baixados
+                for _, registro in alteracoes:
+                    _anexar(entidade, registro)
+                if _registros_no_diario[entidade] < LIMITE_DIARIO:
+                    continue
+            _gravar(entidade, repositorio.carregar(entidade))
+
+        with open(log, "w", encoding="utf-8"):
+            pass
+
+def recuperar():
+    """Reaplica transações confirmadas no log que não chegaram aos arquivos."""
+    log = repositorio.caminho(ARQUIVO_TRANSACOES)
+    transacoes, _ = ler_diario(log)
+    if not transacoes:
+        return
+
+    afetadas = {}
+    for transacao in transacoes:
+        for acao, entidade, registro in transacao["operacoes"]:
+            if entidade not in afetadas:
+                chave = repositorio.chave(entidade)
+                afetadas[entidade] = {r[chave]: r for r in _ler_arquivo(entidade, binario=False)}
+            id = registro[repositorio.chave(entidade)]
+            if acao == "remover":
+                afetadas[entidade].pop(id, None)
+            else:
+                afetadas[entidade][id] = registro
+
+    for entidade, registros in afetadas.items():
+        _escrever(entidade, registros.values())
+        # O que estiver em memória não tem essas alterações: força a releitura
+        _assinaturas.pop(entidade, None)
+    with open(log, "w", encoding="utf-8"):
+        pass
+
+def fechar():
+    """Grava o que estiver pendente e esquece o estado lido do disco."""
+    descarregar()
+    _registros_no_diario.clear()
+    _posicao_diario.clear()
+    _assinaturas.clear()
+
+if __name__ == "__main__":
+    # Gera os espelhos .bin dos snapshots: python armazenamento_json.py [pasta]
+    if len(sys.argv) > 1:
+        repositorio.configurar_pasta(sys.argv[1])
+    with repositorio.trava_dados():
+        for nome, config in repositorio.ENTIDADES.items():
+            if "particionada" in config:
+                print(f"➖ {nome}: particionada, sem espelho .bin")
+                continue
+            gravar_binario(nome)
+            print(f"✅ {nome}: {_arquivo_binario(nome)}")
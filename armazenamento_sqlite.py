@@ -0,0 +1,384 @@
+import json
+import sqlite3
+import sys
+import threading
+from collections.abc import Mapping
+
+import armazenamento_json
+import repositorio
+
+# ===================== Backend SQLite =====================
+# Uma tabela por entidade, com as colunas conhecidas tipadas e indexadas e uma
+# coluna "extras" (JSON) para campos que não têm coluna própria. Cada operação
+# grava só a linha afetada, numa transação, em vez de reescrever a entidade.
+#
+# Listas dentro do registro (os itens de uma venda) vão numa tabela filha,
+# uma linha por item, para que "vendas do produto X" use um índice.
+#
+# Gatilhos anotam cada linha alterada na tabela "alteracoes". Assim cada
+# processo descobre o que os outros terminais gravaram e relê só essas linhas.
+
+ARQUIVO_BANCO = "otimiza.db"
+
+TABELAS = {
+    "clientes": [
+        ("id", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("cpf", "TEXT"),
+        ("telefone", "TEXT"), ("email", "TEXT"), ("pais", "TEXT"), ("estado", "TEXT"),
+        ("cidade", "TEXT"), ("bairro", "TEXT"), ("rua_num", "TEXT"),
+    ],
+    "fornecedores": [
+        ("id", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("cnpj", "TEXT"),
+        ("telefone", "TEXT"), ("email", "TEXT"), ("pais", "TEXT"), ("estado", "TEXT"),
+        ("cidade", "TEXT"), ("bairro", "TEXT"), ("rua_num", "TEXT"),
+    ],
+    "produtos": [
+        ("id_produto", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("preco", "REAL"),
+        ("estoque", "INTEGER"), ("fornecedor_id", "INTEGER"), ("versao", "INTEGER"),
+    ],
+    "vendas": [
+        ("id_venda", "INTEGER PRIMARY KEY"), ("id_cliente", "INTEGER"), ("id_produto", "INTEGER"),
+        ("quantidade", "INTEGER"), ("valor_produto", "REAL"), ("valor_total", "REAL"), ("data_hora", "TEXT"),
+    ],
+}
+
+# entidade -> (campo com a lista, tabela filha, colunas de cada item)
+FILHAS = {
+    "vendas": ("itens", "itens_venda", [
+        ("id_produto", "INTEGER"), ("quantidade", "INTEGER"),
+        ("valor_produto", "REAL"), ("valor_total", "REAL"),
+    ]),
+}
+
+INDICES = [
+    ("produtos", "fornecedor_id"),
+    ("vendas", "id_cliente"),
+    ("vendas", "id_produto"),
+    ("vendas", "data_hora"),
+    ("itens_venda", "id_venda"),
+    ("itens_venda", "id_produto"),
+]
+
+# Alterações mantidas na tabela "alteracoes"; quem ficar mais atrasado relê tudo
+LIMITE_ALTERACOES = 100_000
+
+_conexao = None
+_lock = threading.RLock()  # uma conexão por processo, compartilhada entre threads
+_vistas = {}               # entidade -> última alteração já refletida em memória
+
+# ===================== Conexão e esquema =====================
+
+def _colunas(entidade):
+    """Nomes das colunas da tabela da entidade (a primeira é a chave)."""
+    return [nome for nome, _ in TABELAS[entidade]]
+
+def criar_tabelas(conexao):
+    """Cria as tabelas e índices que ainda não existem."""
+    for entidade, colunas in TABELAS.items():
+        definicao = ", ".join(f"{nome} {tipo}" for nome, tipo in colunas)
+        conexao.execute(f"CREATE TABLE IF NOT EXISTS {entidade} ({definicao}, extras TEXT)")
+
+        # Colunas acrescentadas depois da criação do banco
+        existentes = {linha[1] for linha in conexao.execute(f"PRAGMA table_info({entidade})")}
+        for nome, tipo in colunas:
+            if nome not in existentes:
+                conexao.execute(f"ALTER TABLE {entidade} ADD COLUMN {nome} {tipo}")
+                # Até aqui o campo, se existia, estava guardado em extras
+                conexao.execute(
+                    f"UPDATE {entidade} SET {nome} = json_extract(extras, '$.{nome}') "
+                    f"WHERE extras IS NOT NULL AND json_extract(extras, '$.{nome}') IS NOT NULL"
+                )
+
+    for entidade, (_, tabela, colunas) in FILHAS.items():
+        definicao = ", ".join(f"{nome} {tipo}" for nome, tipo in colunas)
+        conexao.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({_colunas(entidade)[0]} INTEGER NOT NULL, {definicao})")
+
+    for entidade, coluna in INDICES:
+        conexao.execute(f"CREATE INDEX IF NOT EXISTS idx_{entidade}_{coluna} ON {entidade} ({coluna})")
+
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS alteracoes "
+        "(seq INTEGER PRIMARY KEY AUTOINCREMENT, entidade TEXT NOT NULL, id INTEGER NOT NULL)"
+    )
+    for entidade in TABELAS:
+        chave = _colunas(entidade)[0]
+        for evento, linha in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conexao.execute(
+                f"CREATE TRIGGER IF NOT EXISTS alt_{entidade}_{evento.lower()} AFTER {evento} ON {entidade} "
+                f"BEGIN INSERT INTO alteracoes (entidade, id) VALUES ('{entidade}', {linha}.{chave}); END"
+            )
+    conexao.execute(
+        "DELETE FROM alteracoes WHERE seq <= (SELECT MAX(seq) FROM alteracoes) - ?", (LIMITE_ALTERACOES,)
+    )
+    conexao.commit()
+
+def conectar():
+    """Abre (uma vez por processo) a conexão com o banco em modo WAL."""
+    global _conexao
+    with _lock:
+        if _conexao is None:
+            conexao = sqlite3.connect(repositorio.caminho(ARQUIVO_BANCO), timeout=30, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            criar_tabelas(conexao)
+            _conexao = conexao
+        return _conexao
+
+def descarregar():
+    """Nada a fazer: cada operação já é gravada na sua própria transação."""
+
+def fechar():
+    """Fecha a conexão (usado ao trocar de pasta ou de backend)."""
+    global _conexao
+    with _lock:
+        if _conexao is not None:
+            _conexao.close()
+            _conexao = None
+        _vistas.clear()
+
+def _ultima_alteracao(conexao):
+    """Número da alteração mais recente gravada no banco."""
+    return conexao.execute("SELECT COALESCE(MAX(seq), 0) FROM alteracoes").fetchone()[0]
+
+def _marcar_vistas(conexao, entidades):
+    """Registra que a memória já reflete tudo o que está no banco para essas entidades.
+
+    Só é chamado sob a trava de dados, logo depois de sincronizar e gravar,
+    então não há alteração de outro processo no meio.
+    """
+    ultima = _ultima_alteracao(conexao)
+    for entidade in entidades:
+        _vistas[entidade] = ultima
+
+# ===================== Conversão registro <-> linha =====================
+
+def _para_linha(entidade, registro):
+    """Converte um registro (dict) nos valores das colunas + extras."""
+    colunas = _colunas(entidade)
+    campo_filho = FILHAS[entidade][0] if entidade in FILHAS else None
+    extras = {k: v for k, v in registro.items() if k not in colunas and k != campo_filho}
+    return [registro.get(c) for c in colunas] + [json.dumps(extras, ensure_ascii=False) if extras else None]
+
+def _para_registro(entidade, linha):
+    """Converte uma linha da tabela de volta em registro (dict)."""
+    registro = {c: v for c, v in zip(_colunas(entidade), linha) if v is not None}
+    if linha[-1]:
+        registro.update(json.loads(linha[-1]))
+    return registro
+
+def _sql_inserir_filho(entidade):
+    """INSERT parametrizado de um item na tabela filha da entidade."""
+    _, tabela, colunas = FILHAS[entidade]
+    nomes = [_colunas(entidade)[0]] + [nome for nome, _ in colunas]
+    return f"INSERT INTO {tabela} ({', '.join(nomes)}) VALUES ({', '.join('?' * len(nomes))})"
+
+def _linhas_filhas(entidade, registro):
+    """Valores das linhas da tabela filha para os itens de um registro."""
+    campo, _, colunas = FILHAS[entidade]
+    id = registro[_colunas(entidade)[0]]
+    return ([id] + [item.get(nome) for nome, _ in colunas] for item in registro.get(campo, ()))
+
+def _gravar_filhos(conexao, entidade, registro):
+    """Substitui as linhas da tabela filha de um registro pelos itens atuais."""
+    if entidade not in FILHAS:
+        return
+    chave = _colunas(entidade)[0]
+    conexao.execute(f"DELETE FROM {FILHAS[entidade][1]} WHERE {chave} = ?", (registro[chave],))
+    conexao.executemany(_sql_inserir_filho(entidade), _linhas_filhas(entidade, registro))
+
+def _carregar_filhos(entidade, registros, todos=False):
+    """Preenche a lista de itens dos registros a partir da tabela filha."""
+    if entidade not in FILHAS or not registros:
+        return
+    campo, tabela, colunas = FILHAS[entidade]
+    chave = _colunas(entidade)[0]
+    nomes = [nome for nome, _ in colunas]
+    por_id = {r[chave]: r for r in registros}
+
+    consultas = [("", [])] if todos else [
+        (f"WHERE {chave} IN ({', '.join('?' * len(lote))})", lote)
+        for lote in (list(por_id)[i:i + 500] for i in range(0, len(por_id), 500))
+    ]
+    for onde, parametros in consultas:
+        cursor = conectar().execute(
+            f"SELECT {chave}, {', '.join(nomes)} FROM {tabela} {onde} ORDER BY {chave}, rowid", parametros
+        )
+        for linha in cursor:
+            registro = por_id.get(linha[0])
+            if registro is not None:
+                registro.setdefault(campo, []).append(dict(zip(nomes, linha[1:])))
+
+def _sql_inserir(entidade):
+    """INSERT parametrizado da entidade (o sqlite3 reaproveita o statement preparado)."""
+    colunas = _colunas(entidade) + ["extras"]
+    return f"INSERT INTO {entidade} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+
+# ===================== Operações do backend =====================
+
+def _selecionar(entidade, onde="", parametros=()):
+    """Executa um SELECT das colunas da entidade e converte as linhas em registros."""
+    colunas = _colunas(entidade) + ["extras"]
+    cursor = conectar().execute(
+        f"SELECT {', '.join(colunas)} FROM {entidade} {onde} ORDER BY {colunas[0]}", parametros
+    )
+    registros = [_para_registro(entidade, linha) for linha in cursor]
+    _carregar_filhos(entidade, registros, todos=not onde)
+    return registros
+
+def ler(entidade):
+    """Lê todos os registros da entidade, em ordem de ID."""
+    with _lock, repositorio.trava_dados():
+        _vistas[entidade] = _ultima_alteracao(conectar())
+        return _selecionar(entidade)
+
+def ler_periodo(entidade, inicio=None, fim=None):
+    """Registros com data em [inicio, fim], pelo índice da coluna de data."""
+    campo = repositorio.ENTIDADES[entidade]["particionada"]
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append(f"{campo} >= ?")
+        parametros.append(inicio)
+    if fim is not None:
+        condicoes.append(f"{campo} <= ?")
+        parametros.append(fim)
+    if not condicoes:
+        return ler(entidade)
+    with _lock, repositorio.trava_dados():
+        return _selecionar(entidade, "WHERE " + " AND ".join(condicoes), parametros)
+
+def percorrer_periodo(entidade, inicio=None, fim=None):
+    """Registros com data em [inicio, fim], um de cada vez (lidos do banco de uma vez, pelo índice)."""
+    yield from ler_periodo(entidade, inicio, fim)
+
+def mudancas(entidade):
+    """Retorna as linhas que outros processos alteraram desde a última leitura, ou None.
+
+    O resultado é (registros, completo, removidos), como no backend JSON.
+    """
+    with _lock:
+        conexao = conectar()
+        vista = _vistas.get(entidade, 0)
+        menor = conexao.execute("SELECT MIN(seq) FROM alteracoes").fetchone()[0]
+        if menor is not None and vista < menor - 1:
+            return ler(entidade), True, ()  # as alterações antigas já foram descartadas
+
+        ids = [linha[0] for linha in conexao.execute(
+            "SELECT DISTINCT id FROM alteracoes WHERE entidade = ? AND seq > ?", (entidade, vista)
+        )]
+        _vistas[entidade] = _ultima_alteracao(conexao)
+        if not ids:
+            return None
+
+        registros = []
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            registros += _selecionar(
+                entidade, f"WHERE {_colunas(entidade)[0]} IN ({', '.join('?' * len(lote))})", lote
+            )
+        encontrados = {r[_colunas(entidade)[0]] for r in registros}
+        return registros, False, [id for id in ids if id not in encontrados]
+
+def salvar(entidade, registros):
+    """Nada a fazer: cada operação já grava a sua linha no banco quando acontece.
+
+    Regravar a tabela inteira custaria reescrever todas as linhas e anotar cada
+    uma em "alteracoes", fazendo os outros terminais relerem tudo.
+    """
+
+def _substituir(entidade, registros):
+    """Substitui o conteúdo da tabela pela coleção inteira, numa única transação."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            conexao.execute(f"DELETE FROM {entidade}")
+            if entidade in FILHAS:
+                conexao.execute(f"DELETE FROM {FILHAS[entidade][1]}")
+            conexao.executemany(_sql_inserir(entidade), (_para_linha(entidade, r) for r in registros))
+            if entidade in FILHAS:
+                conexao.executemany(
+                    _sql_inserir_filho(entidade), (linha for r in registros for linha in _linhas_filhas(entidade, r))
+                )
+        _marcar_vistas(conexao, [entidade])
+
+def inserir(entidade, registro, registros=None):
+    """Insere uma linha."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            conexao.execute(_sql_inserir(entidade), _para_linha(entidade, registro))
+            _gravar_filhos(conexao, entidade, registro)
+        _marcar_vistas(conexao, [entidade])
+
+def inserir_lote(entidade, novos, registros=None):
+    """Insere várias linhas numa única transação."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            conexao.executemany(_sql_inserir(entidade), (_para_linha(entidade, r) for r in novos))
+            if entidade in FILHAS:
+                conexao.executemany(
+                    _sql_inserir_filho(entidade), (linha for r in novos for linha in _linhas_filhas(entidade, r))
+                )
+        _marcar_vistas(conexao, [entidade])
+
+def _executar_atualizacao(conexao, entidade, registro):
+    """UPDATE parametrizado de uma linha pela chave."""
+    colunas = _colunas(entidade)
+    atribuicoes = ", ".join(f"{c} = ?" for c in colunas[1:] + ["extras"])
+    valores = _para_linha(entidade, registro)
+    conexao.execute(f"UPDATE {entidade} SET {atribuicoes} WHERE {colunas[0]} = ?", valores[1:] + valores[:1])
+    _gravar_filhos(conexao, entidade, registro)
+
+def atualizar(entidade, registro, registros=None):
+    """Atualiza uma linha pela chave."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            _executar_atualizacao(conexao, entidade, registro)
+        _marcar_vistas(conexao, [entidade])
+
+def remover(entidade, id, registros=None):
+    """Remove uma linha pela chave."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            conexao.execute(f"DELETE FROM {entidade} WHERE {_colunas(entidade)[0]} = ?", (id,))
+            _gravar_filhos(conexao, entidade, {_colunas(entidade)[0]: id})
+        _marcar_vistas(conexao, [entidade])
+
+def efetivar(operacoes):
+    """Grava uma lista de operações [acao, entidade, registro] numa única transação."""
+    with _lock:
+        conexao = conectar()
+        with conexao:
+            for acao, entidade, registro in operacoes:
+                if acao == "inserir":
+                    conexao.execute(_sql_inserir(entidade), _para_linha(entidade, registro))
+                    _gravar_filhos(conexao, entidade, registro)
+                elif acao == "atualizar":
+                    _executar_atualizacao(conexao, entidade, registro)
+                else:
+                    chave = _colunas(entidade)[0]
+                    conexao.execute(f"DELETE FROM {entidade} WHERE {chave} = ?", (registro[chave],))
+                    _gravar_filhos(conexao, entidade, {chave: registro[chave]})
+        _marcar_vistas(conexao, {entidade for _, entidade, _ in operacoes})
+
+# ===================== Migração =====================
+
+def migrar_json():
+    """Copia clientes, fornecedores, produtos e vendas dos arquivos JSON para o banco."""
+    totais = {}
+    for entidade in TABELAS:
+        registros = armazenamento_json.ler(entidade)
+        if isinstance(registros, Mapping):
+            registros = list(registros.values())  # espelho .bin (OTIMIZA_SNAPSHOT_BINARIO=1): {id: registro}
+        _substituir(entidade, registros)
+        totais[entidade] = len(registros)
+    return totais
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        repositorio.configurar_pasta(sys.argv[1])
+    print(f"📦 Migrando {repositorio.PASTA_DADOS}/*.json para {repositorio.caminho(ARQUIVO_BANCO)}...")
+    for entidade, total in migrar_json().items():
+        print(f"✅ {entidade}: {total} registro(s)")
+    print("Para usar o banco, rode o programa com OTIMIZA_BACKEND=sqlite.")
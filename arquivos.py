@@ -0,0 +1,41 @@
+import os
+from contextlib import contextmanager
+
+from serializacao import codificar
+
+# ===================== Gravação atômica =====================
+# Nunca se escreve direto no arquivo de destino: o conteúdo vai para um
+# arquivo temporário, que é sincronizado no disco (fsync) e então renomeado
+# por cima do original. Uma queda no meio da gravação deixa o arquivo antigo
+# intacto, nunca um arquivo truncado.
+
+def _sincronizar_pasta(pasta):
+    """Garante que o rename ficou registrado no disco (só em sistemas POSIX)."""
+    if os.name != "posix":
+        return
+    fd = os.open(pasta or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def escrita_atomica(caminho, modo="w"):
+    """Abre um temporário para escrita em partes; ao sair sem erro, fsync + rename sobre o destino."""
+    temporario = caminho + ".tmp"
+    with open(temporario, modo, encoding=None if "b" in modo else "utf-8") as f:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+    _sincronizar_pasta(os.path.dirname(caminho))
+
+def gravar_atomico(caminho, conteudo):
+    """Grava um texto no arquivo de forma atômica (temporário + fsync + rename)."""
+    with escrita_atomica(caminho) as f:
+        f.write(conteudo)
+
+def gravar_json_atomico(caminho, dados):
+    """Serializa os dados em JSON (ver serializacao.py) e grava o arquivo de forma atômica."""
+    with escrita_atomica(caminho, "wb") as f:
+        f.write(codificar(dados))
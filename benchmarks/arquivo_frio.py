@@ -0,0 +1,93 @@
+"""Arquivo frio: tamanho e velocidade de varredura das vendas comprimidas x vendas.json.
+
+Gera as vendas sintéticas da escala pedida e grava o mesmo conteúdo como o
+JSON de sempre (uma lista) e como JSON Lines comprimido com cada compressor
+disponível (compressao.py). Para cada formato mede o tamanho no disco, o
+tempo de gravação e uma varredura completa (soma do faturamento), com o pico
+de memória da varredura: o JSON é lido inteiro, os comprimidos em fluxo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.arquivo_frio --escala media
+    python -m benchmarks.arquivo_frio --escala grande --repeticoes 1 --saida frio.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import compressao
+from arquivos import gravar_json_atomico
+from benchmarks import dados_sinteticos
+from serializacao import ler_arquivo
+
+def varrer_json(arquivo):
+    """Faturamento total lendo o arquivo JSON inteiro para a memória."""
+    return sum(venda["valor_total"] for venda in ler_arquivo(arquivo))
+
+def varrer_comprimido(arquivo):
+    """Faturamento total descomprimindo em fluxo, uma venda por vez."""
+    return sum(venda["valor_total"] for venda in compressao.ler_linhas(arquivo))
+
+def medir(varrer, arquivo, repeticoes):
+    """Melhor tempo de varredura (s) e o pico de memória (KiB) de uma varredura à parte."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        varrer(arquivo)
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    varrer(arquivo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=sorted(dados_sinteticos.ESCALAS), default="pequena")
+    parser.add_argument("--repeticoes", type=int, default=3, help="varreduras por formato (vale a melhor)")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    vendas = dados_sinteticos.gerar(args.escala)["vendas"]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        formatos = [("json", os.path.join(pasta, "vendas.json"), varrer_json)] + [
+            (nome, os.path.join(pasta, "vendas" + compressao.EXTENSOES[nome]), varrer_comprimido)
+            for nome in compressao.disponiveis()
+        ]
+        for nome, arquivo, varrer in formatos:
+            inicio = time.perf_counter()
+            if nome == "json":
+                gravar_json_atomico(arquivo, vendas)
+            else:
+                compressao.gravar_linhas(arquivo, vendas)
+            gravacao = time.perf_counter() - inicio
+            varredura, pico = medir(varrer, arquivo, args.repeticoes)
+            resultados[nome] = {
+                "bytes": os.path.getsize(arquivo),
+                "gravacao_s": gravacao,
+                "varredura_s": varredura,
+                "vendas_por_s": len(vendas) / varredura,
+                "pico_memoria_kib": pico,
+            }
+
+    base = resultados["json"]
+    print(f"--- Arquivo frio: {len(vendas)} vendas (escala {args.escala}) ---")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:>5}: {r['bytes'] / 2**20:8.2f} MiB ({100 * r['bytes'] / base['bytes']:5.1f}% do JSON) | "
+            f"gravação {r['gravacao_s']:6.2f}s | varredura {r['varredura_s']:6.2f}s "
+            f"({r['vendas_por_s']:,.0f} vendas/s) | pico {r['pico_memoria_kib']:10.1f} KiB"
+        )
+    if "zstd" not in resultados:
+        print("(zstd não medido: instale o pacote zstandard)")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"escala": args.escala, "vendas": len(vendas), "formatos": resultados}, f, indent=4)
+        print(f"📄 Resultados em {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Gerador de dados sintéticos (fornecedores, produtos, clientes e vendas).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.dados_sinteticos --escala media --pasta /tmp/dados_bench
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+import repositorio
+
+# Quantidades de cada entidade por escala
+ESCALAS = {
+    "pequena": {"fornecedores": 50, "produtos": 1_000, "clientes": 1_000, "vendas": 10_000},
+    "media": {"fornecedores": 500, "produtos": 20_000, "clientes": 50_000, "vendas": 200_000},
+    "grande": {"fornecedores": 2_000, "produtos": 200_000, "clientes": 500_000, "vendas": 2_000_000},
+}
+
+NOMES = ["ANA", "BRUNO", "CARLA", "DIEGO", "ELISA", "FABIO", "GABRIELA", "HEITOR", "ISABEL", "JOAO",
+         "LARISSA", "MARCOS", "NATALIA", "OTAVIO", "PAULA", "RAFAEL", "SOFIA", "TIAGO", "VITORIA"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA",
+              "LIMA", "GOMES", "COSTA", "RIBEIRO", "MARTINS", "CARVALHO", "ARAUJO"]
+PRODUTOS = ["CAFÉ", "AÇÚCAR", "ARROZ", "FEIJÃO", "MACARRÃO", "ÓLEO", "LEITE", "PÃO", "QUEIJO",
+            "MANTEIGA", "SABÃO", "DETERGENTE", "BISCOITO", "FARINHA", "SUCO"]
+MARCAS = ["BOM DIA", "SOL", "ESTRELA", "AURORA", "PRIMOR", "DONA", "NOVA", "REAL"]
+EMBALAGENS = ["200G", "500G", "1KG", "2KG", "1L", "2L", "CX 12UN"]
+ESTADOS = ["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "SC", "GO"]
+
+def gerar_fornecedores(quantidade, aleatorio):
+    for id in range(1, quantidade + 1):
+        yield {
+            "id": id, "nome": f"{aleatorio.choice(MARCAS)} {aleatorio.choice(SOBRENOMES)} LTDA {id}",
+            "cnpj": f"{id:014d}", "telefone": f"119{aleatorio.randint(10_000_000, 99_999_999)}",
+            "email": f"fornecedor{id}@exemplo.com", "pais": "BRASIL", "estado": aleatorio.choice(ESTADOS),
+            "cidade": "CIDADE", "bairro": "CENTRO", "rua_num": f"RUA {id}, {aleatorio.randint(1, 999)}",
+        }
+
+def gerar_produtos(quantidade, fornecedores, aleatorio):
+    for id in range(1, quantidade + 1):
+        yield {
+            "id_produto": id, "nome": f"{aleatorio.choice(PRODUTOS)} {aleatorio.choice(MARCAS)} {aleatorio.choice(EMBALAGENS)}",
+            "preco": round(aleatorio.uniform(1, 500), 2), "estoque": aleatorio.randint(1_000, 100_000),
+            "fornecedor_id": aleatorio.randint(1, fornecedores),
+        }
+
+def gerar_clientes(quantidade, aleatorio):
+    for id in range(1, quantidade + 1):
+        yield {
+            "id": id, "nome": f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}",
+            "cpf": f"{id:011d}", "telefone": f"119{aleatorio.randint(10_000_000, 99_999_999)}",
+            "email": f"cliente{id}@exemplo.com",
+        }
+
+def gerar_vendas(quantidade, precos, clientes, aleatorio, inicio=datetime(2024, 1, 1)):
+    """Vendas de 1 a 5 itens, com data_hora crescente ao longo de um ano; `precos` é {id_produto: preço}."""
+    ids_produtos = list(precos)
+    passo = timedelta(days=365) / max(quantidade, 1)
+    for id in range(1, quantidade + 1):
+        itens = []
+        for id_produto in set(aleatorio.choices(ids_produtos, k=aleatorio.randint(1, 5))):
+            quantidade_item = aleatorio.randint(1, 5)
+            itens.append({
+                "id_produto": id_produto, "quantidade": quantidade_item,
+                "valor_produto": precos[id_produto], "valor_total": precos[id_produto] * quantidade_item,
+            })
+        yield {
+            "id_venda": id, "id_cliente": aleatorio.randint(1, clientes),
+            "data_hora": (inicio + passo * id).isoformat(timespec="seconds"),
+            "itens": itens, "valor_total": sum(item["valor_total"] for item in itens),
+        }
+
+def gerar(escala, semente=42):
+    """Gera todas as entidades da escala: {entidade: [registros]}."""
+    quantidades = ESCALAS[escala] if isinstance(escala, str) else escala
+    aleatorio = random.Random(semente)
+    produtos = list(gerar_produtos(quantidades["produtos"], quantidades["fornecedores"], aleatorio))
+    return {
+        "fornecedores": list(gerar_fornecedores(quantidades["fornecedores"], aleatorio)),
+        "produtos": produtos,
+        "clientes": list(gerar_clientes(quantidades["clientes"], aleatorio)),
+        "vendas": list(gerar_vendas(
+            quantidades["vendas"], {p["id_produto"]: p["preco"] for p in produtos}, quantidades["clientes"], aleatorio
+        )),
+    }
+
+def popular(pasta, escala, semente=42):
+    """Cria uma pasta de dados com a escala pedida (uma gravação por entidade).
+
+    As sequências de ID (dados/*.seq) não são gravadas: a primeira reserva as
+    reconstrói a partir do maior ID.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    repositorio.configurar_pasta(pasta)
+    for entidade, registros in gerar(escala, semente).items():
+        repositorio.inserir_lote(entidade, registros)
+    repositorio.descarregar()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="pequena")
+    parser.add_argument("--pasta", required=True, help="pasta de dados a criar (não use a pasta real)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS))
+    args = parser.parse_args()
+
+    if args.backend:
+        repositorio.configurar_backend(args.backend)
+    popular(args.pasta, args.escala, args.semente)
+    print(f"✅ Dados {args.escala} gerados em {args.pasta}: {ESCALAS[args.escala]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Teste de estresse: vários processos (terminais de caixa) vendendo o mesmo estoque.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.estresse_vendas --processos 8 --vendas 200 --backend json
+"""
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+
+import repositorio
+from erros import ConflitoDeVersao, EstoqueInsuficiente
+from servicos import vender_produto
+
+def preparar_dados(pasta, backend, produtos, estoque):
+    """Cria uma pasta de dados com um cliente e alguns produtos."""
+    repositorio.configurar_backend(backend)
+    repositorio.configurar_pasta(pasta)
+    repositorio.inserir("clientes", {"id": 1, "nome": "CLIENTE TESTE", "cpf": "00000000000",
+                                     "telefone": "11999999999", "email": "teste@teste.com"})
+    for id_produto in range(1, produtos + 1):
+        repositorio.inserir("produtos", {"id_produto": id_produto, "nome": f"PRODUTO {id_produto}",
+                                         "preco": 10.0, "estoque": estoque, "fornecedor_id": 1})
+    repositorio.limpar_cache()
+
+def terminal(pasta, backend, vendas, produtos, semente, resultados):
+    """Um terminal de caixa: tenta `vendas` vendas de 1 unidade, refazendo em caso de conflito."""
+    repositorio.configurar_backend(backend)
+    repositorio.configurar_pasta(pasta)
+    aleatorio = random.Random(semente)
+    vendidas = conflitos = recusadas = 0
+
+    inicio = time.perf_counter()
+    for _ in range(vendas):
+        id_produto = aleatorio.randint(1, produtos)
+        while True:
+            # A versão lida pode estar velha: é exatamente o caso de dois terminais
+            versao = repositorio.buscar("produtos", id_produto).get("versao", 0)
+            try:
+                vender_produto(1, id_produto, 1, versao_esperada=versao)
+                vendidas += 1
+                break
+            except ConflitoDeVersao:
+                conflitos += 1
+            except EstoqueInsuficiente:
+                recusadas += 1
+                break
+    resultados.put({"vendidas": vendidas, "conflitos": conflitos, "recusadas": recusadas,
+                    "segundos": time.perf_counter() - inicio})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--vendas", type=int, default=200, help="tentativas de venda por processo")
+    parser.add_argument("--produtos", type=int, default=2)
+    parser.add_argument("--estoque", type=int, default=1000, help="estoque inicial de cada produto")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), default="json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        preparar_dados(pasta, args.backend, args.produtos, args.estoque)
+
+        resultados = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(target=terminal, args=(pasta, args.backend, args.vendas, args.produtos, i, resultados))
+            for i in range(args.processos)
+        ]
+        inicio = time.perf_counter()
+        for p in processos:
+            p.start()
+        parciais = [resultados.get() for _ in processos]
+        for p in processos:
+            p.join()
+        duracao = time.perf_counter() - inicio
+
+        # Confere o resultado relendo tudo do disco
+        repositorio.configurar_pasta(pasta)
+        vendas_gravadas = list(repositorio.carregar("vendas"))
+        estoque_final = sum(p["estoque"] for p in repositorio.carregar("produtos"))
+        repositorio.limpar_cache()
+
+    vendidas = sum(r["vendidas"] for r in parciais)
+    conflitos = sum(r["conflitos"] for r in parciais)
+    recusadas = sum(r["recusadas"] for r in parciais)
+    estoque_inicial = args.produtos * args.estoque
+    ids = [v["id_venda"] for v in vendas_gravadas]
+
+    print(f"\n--- Estresse de vendas ({args.backend}, {args.processos} processos) ---")
+    print(f"Vendas confirmadas: {vendidas} | gravadas: {len(vendas_gravadas)} | recusadas por estoque: {recusadas}")
+    print(f"Conflitos de versão (refeitos): {conflitos} ({conflitos / max(vendidas + conflitos, 1):.1%} das tentativas)")
+    print(f"Estoque: inicial {estoque_inicial} | final {estoque_final} | esperado {estoque_inicial - vendidas}")
+    print(f"Vazão: {vendidas / duracao:.0f} vendas/s em {duracao:.2f}s")
+
+    ok = (
+        len(vendas_gravadas) == vendidas
+        and len(set(ids)) == len(ids)
+        and estoque_final == estoque_inicial - vendidas
+        and estoque_final >= 0
+    )
+    print("✅ Sem venda perdida, ID repetido ou estoque negativo." if ok else "❌ Inconsistência encontrada!")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+"""Memória por registro: dict (como sai do json.load) x registro compacto (registros.py).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.memoria_registros --quantidade 200000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks import dados_sinteticos
+from registros import compactar
+
+def gerar(entidade, quantidade):
+    """Gera registros sintéticos da entidade como JSON, no formato gravado em dados/."""
+    quantidades = {"fornecedores": 200, "produtos": quantidade if entidade == "produtos" else 5000,
+                   "clientes": 10_000, "vendas": quantidade if entidade == "vendas" else 0}
+    # Passa pelo JSON para medir exatamente o que o backend entrega
+    return json.dumps(dados_sinteticos.gerar(quantidades)[entidade])
+
+def medir(construir):
+    """Bytes alocados (e mantidos) pela construção da coleção."""
+    gc.collect()
+    tracemalloc.start()
+    colecao = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del colecao
+    return atual
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantidade", type=int, default=100_000, help="registros por entidade")
+    args = parser.parse_args()
+
+    print(f"--- Memória por registro ({args.quantidade} registros) ---")
+    for entidade in ("produtos", "vendas"):
+        texto = gerar(entidade, args.quantidade)
+        em_dict = medir(lambda: json.loads(texto))
+        compacto = medir(lambda: [compactar(entidade, r) for r in json.loads(texto)])
+        por_dict = em_dict / args.quantidade
+        por_compacto = compacto / args.quantidade
+        print(
+            f"{entidade:>9}: dict {por_dict:7.1f} B/registro | compacto {por_compacto:7.1f} B/registro | "
+            f"redução {100 * (1 - por_compacto / por_dict):.0f}%"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Formato e codec JSON: tempo de gravação/leitura e bytes em disco.
+
+Compara os formatos legível (indent) e compacto com cada codec instalado
+(stdlib, orjson, msgspec) sobre arquivos de vendas sintéticas.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.serializacao --tamanhos 100000 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import serializacao
+from benchmarks.memoria_registros import gerar
+
+def medir(registros, pasta, codec, formato):
+    """Grava e relê o arquivo com o codec/formato; retorna (segundos gravando, lendo, bytes)."""
+    serializacao.configurar(formato=formato, codec=codec)
+    arquivo = os.path.join(pasta, f"vendas-{codec}-{formato}.json")
+
+    inicio = time.perf_counter()
+    with open(arquivo, "wb") as f:
+        f.write(serializacao.codificar(registros))
+    gravacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lidos = serializacao.ler_arquivo(arquivo)
+    leitura = time.perf_counter() - inicio
+
+    assert len(lidos) == len(registros)
+    tamanho = os.path.getsize(arquivo)
+    os.remove(arquivo)
+    return gravacao, leitura, tamanho
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100_000], help="registros por arquivo")
+    args = parser.parse_args()
+
+    codecs = [c for c in serializacao.CODECS if c == "stdlib" or getattr(serializacao, c) is not None]
+    print(f"Codecs disponíveis: {', '.join(codecs)}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in args.tamanhos:
+            registros = json.loads(gerar("vendas", tamanho))
+            print(f"\n--- {tamanho} vendas ---")
+            base = None
+            for codec in codecs:
+                for formato in ("legivel", "compacto"):
+                    gravacao, leitura, bytes_disco = medir(registros, pasta, codec, formato)
+                    base = base or (gravacao, leitura, bytes_disco)
+                    print(
+                        f"{codec:>8} {formato:>9}: grava {gravacao:7.2f}s ({base[0] / gravacao:4.1f}x) | "
+                        f"lê {leitura:7.2f}s ({base[1] / leitura:4.1f}x) | "
+                        f"{bytes_disco / 2**20:8.1f} MiB ({100 * bytes_disco / base[2]:3.0f}%)"
+                    )
+            del registros
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Vazão do servidor HTTP (servidor.py) com vários terminais simultâneos.
+
+Sobe o servidor num processo sobre dados sintéticos e dispara terminais em
+outros processos, cada um com uma conexão mantida aberta (keep-alive) ou, com
+--sem-keepalive, uma conexão nova por requisição. A carga mistura consultas
+de produto por ID (90%) e vendas de 1 a 3 itens (10%).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.servidor_http --terminais 8 --requisicoes 2000
+    python -m benchmarks.servidor_http --terminais 8 --sem-keepalive
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import tempfile
+import time
+
+import repositorio
+from benchmarks import dados_sinteticos
+from benchmarks.suite import percentil
+
+def servir(pasta, backend, porta):
+    """Processo do servidor: carrega os dados e atende até ser encerrado."""
+    import servidor
+    repositorio.configurar_backend(backend)
+    repositorio.configurar_pasta(pasta)
+    for entidade in repositorio.ENTIDADES:
+        repositorio.indice(entidade)
+    instancia = servidor.criar_servidor("127.0.0.1", 0)
+    porta.put(instancia.server_address[1])
+    instancia.serve_forever()
+
+def terminal(porta, requisicoes, quantidades, keepalive, semente, resultados):
+    """Um terminal de caixa: consultas e vendas, medindo a latência de cada requisição."""
+    aleatorio = random.Random(semente)
+    conexao = http.client.HTTPConnection("127.0.0.1", porta)
+    tempos = []
+    erros = 0
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        if aleatorio.random() < 0.1:
+            itens = [{"id_produto": id_produto, "quantidade": 1}
+                     for id_produto in aleatorio.sample(range(1, quantidades["produtos"] + 1), aleatorio.randint(1, 3))]
+            corpo = json.dumps({"id_cliente": aleatorio.randint(1, quantidades["clientes"]), "itens": itens})
+            metodo, rota = "POST", "/vendas"
+        else:
+            corpo = None
+            metodo, rota = "GET", f"/produtos/{aleatorio.randint(1, quantidades['produtos'])}"
+
+        antes = time.perf_counter_ns()
+        if not keepalive:
+            conexao = http.client.HTTPConnection("127.0.0.1", porta)
+        conexao.request(metodo, rota, body=corpo, headers={"Content-Type": "application/json"})
+        resposta = conexao.getresponse()
+        resposta.read()
+        if not keepalive:
+            conexao.close()
+        tempos.append(time.perf_counter_ns() - antes)
+        erros += resposta.status >= 400
+    resultados.put((tempos, erros, time.perf_counter() - inicio))
+    conexao.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terminais", type=int, default=4, help="processos clientes simultâneos")
+    parser.add_argument("--requisicoes", type=int, default=1000, help="requisições por terminal")
+    parser.add_argument("--escala", choices=sorted(dados_sinteticos.ESCALAS), default="pequena")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), default=repositorio.BACKEND)
+    parser.add_argument("--sem-keepalive", action="store_true", help="abre uma conexão por requisição")
+    args = parser.parse_args()
+
+    quantidades = dados_sinteticos.ESCALAS[args.escala]
+    with tempfile.TemporaryDirectory() as pasta:
+        repositorio.configurar_backend(args.backend)
+        dados_sinteticos.popular(pasta, args.escala)
+        repositorio.limpar_cache()
+
+        fila_porta = multiprocessing.Queue()
+        processo_servidor = multiprocessing.Process(target=servir, args=(pasta, args.backend, fila_porta), daemon=True)
+        processo_servidor.start()
+        porta = fila_porta.get(timeout=120)
+
+        resultados = multiprocessing.Queue()
+        inicio = time.perf_counter()
+        terminais = [
+            multiprocessing.Process(
+                target=terminal,
+                args=(porta, args.requisicoes, quantidades, not args.sem_keepalive, semente, resultados),
+            )
+            for semente in range(args.terminais)
+        ]
+        for processo in terminais:
+            processo.start()
+        coletados = [resultados.get() for _ in terminais]
+        for processo in terminais:
+            processo.join()
+        duracao = time.perf_counter() - inicio
+        processo_servidor.terminate()
+        processo_servidor.join()
+
+    tempos = sorted(t for resultado in coletados for t in resultado[0])
+    erros = sum(resultado[1] for resultado in coletados)
+    print(f"--- {args.terminais} terminais x {args.requisicoes} requisições "
+          f"({'sem' if args.sem_keepalive else 'com'} keep-alive, backend {args.backend}) ---")
+    print(f"Vazão: {len(tempos) / duracao:.0f} requisições/s em {duracao:.2f}s")
+    print(f"Latência: p50 {percentil(tempos, 50) / 1e6:.2f} ms | p99 {percentil(tempos, 99) / 1e6:.2f} ms")
+    print(f"Respostas de erro (ex.: estoque esgotado): {erros}")
+
+if __name__ == "__main__":
+    main()
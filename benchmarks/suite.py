@@ -0,0 +1,246 @@
+"""Suíte de benchmarks do fluxo completo (carga, gravação, IDs, listagem e vendas).
+
+Gera uma pasta de dados sintéticos (benchmarks/dados_sinteticos.py) na escala
+pedida e mede, sem interação (o input() dos menus é roteirizado), cada cenário:
+latência p50/p99, vazão e pico de memória. O resultado vai para um JSON, e
+--comparar mostra a diferença contra um resultado anterior.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.suite --escala pequena --saida bench.json
+    python -m benchmarks.suite --escala pequena --comparar bench.json
+"""
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import busca
+import repositorio
+from benchmarks import dados_sinteticos
+from paginacao import transmitir
+import produto
+import vendas
+
+# ===================== Medição =====================
+
+@contextlib.contextmanager
+def roteiro(respostas):
+    """Substitui input() pelas respostas dadas (e descarta o que os menus imprimem)."""
+    respostas = iter(respostas)
+    original = builtins.input
+    builtins.input = lambda mensagem="": next(respostas)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as nulo, contextlib.redirect_stdout(nulo):
+            yield
+    finally:
+        builtins.input = original
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) de uma lista já ordenada, pelo vizinho mais próximo."""
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def medir(operacao, repeticoes):
+    """Executa a operação `repeticoes` vezes (sem e depois com tracemalloc) e resume os tempos."""
+    tempos = []
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        antes = time.perf_counter_ns()
+        operacao(i)
+        tempos.append(time.perf_counter_ns() - antes)
+    total = time.perf_counter() - inicio
+
+    # O pico de memória sai de uma execução à parte: o tracemalloc deixa tudo mais lento
+    tracemalloc.start()
+    operacao(repeticoes)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tempos.sort()
+    return {
+        "operacoes": repeticoes,
+        "p50_ms": percentil(tempos, 50) / 1e6,
+        "p99_ms": percentil(tempos, 99) / 1e6,
+        "media_ms": sum(tempos) / len(tempos) / 1e6,
+        "vazao_ops": repeticoes / total if total else None,
+        "pico_memoria_kib": pico / 1024,
+    }
+
+# ===================== Cenários =====================
+# Cada cenário recebe o gerador aleatório e devolve a operação a medir, que
+# recebe o número da repetição.
+
+def cenario_carregar(aleatorio):
+    """Lê todas as entidades do disco (cache vazio)."""
+    def operacao(_):
+        repositorio.limpar_cache()
+        for entidade in repositorio.ENTIDADES:
+            repositorio.indice(entidade)
+    return operacao
+
+def cenario_salvar(aleatorio):
+    """Grava todas as entidades por inteiro."""
+    def operacao(_):
+        for entidade in repositorio.ENTIDADES:
+            repositorio.salvar(entidade)
+        repositorio.descarregar()
+    return operacao
+
+def cenario_gerar_id(aleatorio):
+    """Reserva um novo ID de venda (sequência persistida)."""
+    return lambda _: vendas.gerar_id()
+
+def cenario_listar_produtos(aleatorio):
+    """Abre a listagem de produtos, avança algumas páginas e sai."""
+    produtos = repositorio.carregar("produtos")
+    fornecedores = repositorio.carregar("fornecedores")
+    def operacao(_):
+        with roteiro(["p", "p", "p", "s"]):
+            produto.listar_produtos(produtos, fornecedores)
+    return operacao
+
+def cenario_exportar_produtos(aleatorio):
+    """Exporta a listagem completa de produtos (para /dev/null)."""
+    produtos = repositorio.carregar("produtos")
+    return lambda _: transmitir(produtos, produto.formatar_produto, os.devnull)
+
+def cenario_buscar(aleatorio):
+    """Busca por prefixo de nome de produto."""
+    busca.indice("produtos")
+    termos = [nome[:3] for nome in dados_sinteticos.PRODUTOS]
+    return lambda i: busca.buscar("produtos", termos[i % len(termos)])
+
+def cenario_cadastrar_venda(aleatorio):
+    """Cadastra uma venda de 1 a 3 itens pelo menu, como um operador de caixa."""
+    clientes = repositorio.carregar("clientes")
+    produtos = repositorio.carregar("produtos")
+    ids_clientes = list(repositorio.indice("clientes"))
+    ids_produtos = list(repositorio.indice("produtos"))
+    def operacao(_):
+        respostas = ["s", str(aleatorio.choice(ids_clientes)), "s"]
+        for id_produto in aleatorio.sample(ids_produtos, aleatorio.randint(1, 3)):
+            respostas += [str(id_produto), "1"]
+        respostas.append("0")
+        with roteiro(respostas):
+            vendas.cadastrar_venda(repositorio.carregar("vendas"), clientes, produtos)
+    return operacao
+
+# nome -> (cenário, repetições)
+# Cenários que não medem nada num backend (pulados, com o motivo)
+SEM_EFEITO = {
+    "sqlite": {"salvar": "cada operação já grava a sua linha; salvar() não faz nada"},
+}
+
+CENARIOS = {
+    "carregar": (cenario_carregar, 5),
+    "salvar": (cenario_salvar, 5),
+    "gerar_id": (cenario_gerar_id, 1000),
+    "listar_produtos": (cenario_listar_produtos, 200),
+    "exportar_produtos": (cenario_exportar_produtos, 5),
+    "buscar": (cenario_buscar, 1000),
+    "cadastrar_venda": (cenario_cadastrar_venda, 200),
+}
+
+# ===================== Execução =====================
+
+def versao_do_codigo():
+    """Commit atual do git, para identificar o resultado (None fora de um repositório)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar(escala, backend, cenarios, fator=1.0, semente=42):
+    """Roda os cenários numa pasta temporária e retorna o resultado completo."""
+    repositorio.configurar_backend(backend)
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter()
+        dados_sinteticos.popular(pasta, escala, semente)
+        geracao = time.perf_counter() - inicio
+
+        resultados = {}
+        for nome in cenarios:
+            motivo = SEM_EFEITO.get(backend, {}).get(nome)
+            if motivo:
+                print(f"{nome:>18}: pulado ({motivo})")
+                continue
+            cenario, repeticoes = CENARIOS[nome]
+            repositorio.configurar_pasta(pasta)  # cada cenário começa do disco
+            operacao = cenario(random.Random(semente))
+            resultados[nome] = medir(operacao, max(1, int(repeticoes * fator)))
+            repositorio.descarregar()
+            print(formatar(nome, resultados[nome]))
+        repositorio.limpar_cache()
+
+    return {
+        "versao": versao_do_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "escala": escala,
+        "quantidades": dados_sinteticos.ESCALAS[escala],
+        "backend": backend,
+        "geracao_s": geracao,
+        # ru_maxrss vem em KiB no Linux e em bytes no macOS
+        "pico_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == "darwin" else 1),
+        "cenarios": resultados,
+    }
+
+def formatar(nome, r):
+    return (
+        f"{nome:>18}: p50 {r['p50_ms']:9.3f} ms | p99 {r['p99_ms']:9.3f} ms | "
+        f"{r['vazao_ops']:10.1f} ops/s | pico {r['pico_memoria_kib']:10.1f} KiB"
+    )
+
+def comparar(anterior, atual):
+    """Mostra a variação percentual de p50, p99 e vazão de cada cenário."""
+    print(f"\n--- Comparação com {anterior.get('versao')} ({anterior.get('data')}) ---")
+    if (anterior.get("escala"), anterior.get("backend")) != (atual["escala"], atual["backend"]):
+        print("⚠️ Escala ou backend diferentes: a comparação é só indicativa.")
+    for nome, r in atual["cenarios"].items():
+        antes = anterior.get("cenarios", {}).get(nome)
+        if antes is None:
+            print(f"{nome:>18}: (novo)")
+            continue
+        variacoes = " | ".join(
+            f"{campo} {100 * (r[campo] / antes[campo] - 1):+6.1f}%"
+            for campo in ("p50_ms", "p99_ms", "vazao_ops")
+            if antes.get(campo)
+        )
+        print(f"{nome:>18}: {variacoes}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=sorted(dados_sinteticos.ESCALAS), default="pequena")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), default=repositorio.BACKEND)
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--fator", type=float, default=1.0, help="multiplica o número de repetições")
+    parser.add_argument("--saida", help="grava o resultado neste arquivo JSON")
+    parser.add_argument("--comparar", help="resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    print(f"--- Escala {args.escala} ({dados_sinteticos.ESCALAS[args.escala]}), backend {args.backend} ---")
+    resultado = executar(args.escala, args.backend, args.cenarios, args.fator)
+    print(f"Pico de RSS do processo: {resultado['pico_rss_kib'] / 1024:.1f} MiB")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            comparar(json.load(f), resultado)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+        print(f"✅ Resultado gravado em {args.saida}")
+
+if __name__ == "__main__":
+    main()
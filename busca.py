@@ -0,0 +1,204 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+import repositorio
+from erros import ValorDuplicado
+
+# ===================== Busca =====================
+# Índice invertido em memória sobre o nome de produtos, clientes e
+# fornecedores: cada termo (palavra sem acento, em maiúsculas) aponta para o
+# conjunto de IDs que o contêm, e um vocabulário ordenado permite achar por
+# bisect todos os termos que começam com um prefixo. Uma consulta com vários
+# termos devolve os registros que têm todos eles (como prefixo).
+#
+# CPF, CNPJ e e-mail têm índices exatos (valor normalizado -> IDs), que
+# também garantem a unicidade desses campos no cadastro.
+#
+# Os índices são montados na primeira busca e, depois, mantidos a cada
+# inserção, alteração ou remoção avisada pelo repositório.
+
+LIMITE_RESULTADOS = 50
+
+CAMPO_TEXTO = "nome"
+
+def so_digitos(valor):
+    return re.sub(r"\D", "", valor or "")
+
+def email_normalizado(valor):
+    return (valor or "").strip().lower()
+
+# Campos com índice exato (e únicos na entidade) e a normalização de cada um
+CAMPOS_EXATOS = {
+    "produtos": {},
+    "clientes": {"cpf": so_digitos, "email": email_normalizado},
+    "fornecedores": {"cnpj": so_digitos, "email": email_normalizado},
+}
+
+_indices = {}  # entidade -> {"origem", "termos", "vocabulario", "exatos"}
+
+def normalizar(texto):
+    """Maiúsculas e sem acentos: "Pão de Açúcar" -> "PAO DE ACUCAR"."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).upper()
+
+def termos(texto):
+    """Quebra um texto normalizado nos termos indexados."""
+    return re.findall(r"\w+", normalizar(texto))
+
+# ===================== Manutenção =====================
+
+def _indexar(indice, id, registro):
+    termos_indice = indice["termos"]
+    for termo in set(termos(registro.get(CAMPO_TEXTO))):
+        ids = termos_indice.get(termo)
+        if ids is None:
+            ids = termos_indice[termo] = set()
+            insort(indice["vocabulario"], termo)
+        ids.add(id)
+    for campo, normalizar_campo in indice["normalizadores"].items():
+        valor = normalizar_campo(registro.get(campo))
+        if valor:
+            indice["exatos"][campo].setdefault(valor, set()).add(id)
+
+def _desindexar(indice, id, registro):
+    termos_indice = indice["termos"]
+    for termo in set(termos(registro.get(CAMPO_TEXTO))):
+        ids = termos_indice.get(termo)
+        if ids is None:
+            continue
+        ids.discard(id)
+        if not ids:
+            del termos_indice[termo]
+            vocabulario = indice["vocabulario"]
+            del vocabulario[bisect_left(vocabulario, termo)]
+    for campo, normalizar_campo in indice["normalizadores"].items():
+        valores = indice["exatos"][campo]
+        valor = normalizar_campo(registro.get(campo))
+        ids = valores.get(valor)
+        if ids is not None:
+            ids.discard(id)
+            if not ids:
+                del valores[valor]
+
+def indice(entidade):
+    """Retorna o índice de busca da entidade, montando-o na primeira vez."""
+    with repositorio.trava_memoria:
+        repositorio.sincronizar(entidade)
+        colecao = repositorio.indice(entidade)
+        atual = _indices.get(entidade)
+        if atual is not None and atual["origem"] is colecao:
+            return atual
+
+        normalizadores = CAMPOS_EXATOS[entidade]
+        atual = {
+            "origem": colecao,
+            "termos": {},
+            "vocabulario": [],
+            "normalizadores": normalizadores,
+            "exatos": {campo: {} for campo in normalizadores},
+        }
+        # Montagem em lote: o vocabulário é ordenado uma vez só no fim
+        termos_indice = atual["termos"]
+        for id, registro in colecao.items():
+            for termo in set(termos(registro.get(CAMPO_TEXTO))):
+                termos_indice.setdefault(termo, set()).add(id)
+            for campo, normalizar_campo in normalizadores.items():
+                valor = normalizar_campo(registro.get(campo))
+                if valor:
+                    atual["exatos"][campo].setdefault(valor, set()).add(id)
+        atual["vocabulario"] = sorted(termos_indice)
+        _indices[entidade] = atual
+        return atual
+
+def _observador(entidade):
+    def ao_mudar(acao, registro, anterior):
+        indice_entidade = _indices.get(entidade)
+        if indice_entidade is None or indice_entidade["origem"] is not repositorio.indice(entidade):
+            return  # ainda não montado: será montado do zero na primeira busca
+        id = registro[repositorio.chave(entidade)]
+        if anterior is not None:
+            _desindexar(indice_entidade, id, anterior)
+        if acao == "remover":
+            _desindexar(indice_entidade, id, registro)
+        else:
+            _indexar(indice_entidade, id, registro)
+    return ao_mudar
+
+for _entidade in CAMPOS_EXATOS:
+    repositorio.observar(_entidade, _observador(_entidade))
+
+# ===================== Consulta =====================
+
+def _ids_com_prefixo(indice_entidade, prefixo):
+    """União dos IDs de todos os termos que começam com o prefixo."""
+    vocabulario = indice_entidade["vocabulario"]
+    ids = set()
+    posicao = bisect_left(vocabulario, prefixo)
+    while posicao < len(vocabulario) and vocabulario[posicao].startswith(prefixo):
+        ids |= indice_entidade["termos"][vocabulario[posicao]]
+        posicao += 1
+    return ids
+
+def buscar_exato(entidade, campo, valor):
+    """Registros cujo campo (cpf, cnpj ou email), normalizado, é igual ao valor."""
+    indice_entidade = indice(entidade)
+    valor = indice_entidade["normalizadores"][campo](valor)
+    ids = indice_entidade["exatos"][campo].get(valor, ())
+    return [repositorio.buscar(entidade, id) for id in sorted(ids)]
+
+def buscar(entidade, consulta, limite=LIMITE_RESULTADOS):
+    """Registros cujo nome tem todos os termos da consulta como prefixo (em ordem de ID).
+
+    Se a consulta for um CPF, CNPJ ou e-mail cadastrado, devolve os registros
+    com esse valor exato.
+    """
+    indice_entidade = indice(entidade)
+    for campo, normalizar_campo in indice_entidade["normalizadores"].items():
+        ids = indice_entidade["exatos"][campo].get(normalizar_campo(consulta))
+        if ids:
+            return [repositorio.buscar(entidade, id) for id in sorted(ids)[:limite]]
+
+    prefixos = termos(consulta)
+    if not prefixos:
+        return []
+    # Os prefixos mais longos costumam casar menos IDs: começam a interseção
+    resultado = None
+    for prefixo in sorted(set(prefixos), key=len, reverse=True):
+        ids = _ids_com_prefixo(indice_entidade, prefixo)
+        resultado = ids if resultado is None else resultado & ids
+        if not resultado:
+            return []
+    return [repositorio.buscar(entidade, id) for id in heapq.nsmallest(limite, resultado)]
+
+# ===================== Unicidade =====================
+
+def valores_unicos(entidade, registro):
+    """Pares (campo, valor normalizado) do registro que precisam ser únicos."""
+    valores = []
+    for campo, normalizar_campo in CAMPOS_EXATOS[entidade].items():
+        valor = normalizar_campo(registro.get(campo))
+        if valor:
+            valores.append((campo, valor))
+    return valores
+
+def duplicado(entidade, campo, valor, ignorar_id=None):
+    """ID de outro registro com o mesmo valor (normalizado) no campo, ou None, em O(1)."""
+    indice_entidade = indice(entidade)
+    ids = indice_entidade["exatos"][campo].get(indice_entidade["normalizadores"][campo](valor), ())
+    for id in ids:
+        if id != ignorar_id:
+            return id
+    return None
+
+def garantir_unicos(entidade, registro, ignorar_id=None):
+    """Levanta ValorDuplicado se CPF, CNPJ ou e-mail do registro já pertencem a outro.
+
+    Chame dentro de repositorio.transacao(entidade), junto com a gravação,
+    para que outro terminal não cadastre o mesmo valor entre a checagem e ela.
+    """
+    for campo, valor in valores_unicos(entidade, registro):
+        id_existente = duplicado(entidade, campo, valor, ignorar_id)
+        if id_existente is not None:
+            raise ValorDuplicado(campo, registro[campo], id_existente)
@@ -0,0 +1,102 @@
+import gzip
+import io
+import lzma
+import os
+
+from arquivos import escrita_atomica
+from serializacao import codificar_linha, decodificar
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ===================== Compressão (arquivo frio) =====================
+# Períodos fechados que quase nunca são lidos (partições antigas de vendas)
+# vão para arquivos JSON Lines comprimidos: um registro por linha, então a
+# leitura descomprime em fluxo, bloco a bloco, e entrega um registro de cada
+# vez, sem inflar o arquivo inteiro na memória.
+#
+# Compressores (OTIMIZA_COMPRESSAO): "zstd" (pacote zstandard, se instalado:
+# rápido para ler e comprime bem), "gzip" (sempre disponível) e "lzma"
+# (arquivos menores, leitura mais lenta). O padrão, "auto", usa zstd se
+# houver, senão gzip. O compressor de cada arquivo sai da extensão
+# (.jsonl.zst, .jsonl.gz ou .jsonl.xz), então arquivos feitos com
+# compressores diferentes convivem na mesma pasta.
+
+COMPRESSAO = os.environ.get("OTIMIZA_COMPRESSAO", "auto")
+
+EXTENSOES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "lzma": ".jsonl.xz"}
+
+NIVEIS = {"gzip": 6, "zstd": 10, "lzma": 6}
+
+TAMANHO_BLOCO = 1 << 16  # bytes por escrita no compressor e por leitura do descompressor
+
+def escolher(nome=None):
+    """Nome do compressor a usar: o pedido, ou o da configuração ("auto" = zstd se instalado, senão gzip)."""
+    nome = nome or COMPRESSAO
+    if nome == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if nome not in EXTENSOES:
+        raise ValueError(f"Compressão desconhecida: {nome}")
+    if nome == "zstd" and zstandard is None:
+        raise ValueError("A compressão zstd precisa do pacote zstandard (pip install zstandard)")
+    return nome
+
+def disponiveis():
+    """Compressores utilizáveis neste ambiente."""
+    return [nome for nome in EXTENSOES if nome != "zstd" or zstandard is not None]
+
+def formato(arquivo):
+    """Compressor de um arquivo pela extensão, ou None se não for um arquivo comprimido."""
+    for nome, extensao in EXTENSOES.items():
+        if arquivo.endswith(extensao):
+            return nome
+    return None
+
+def _escritor(nome, bruto, nivel):
+    if nome == "gzip":
+        return gzip.GzipFile(filename="", fileobj=bruto, mode="wb", compresslevel=nivel, mtime=0)
+    if nome == "lzma":
+        return lzma.LZMAFile(bruto, "wb", preset=nivel)
+    escolher(nome)
+    return zstandard.ZstdCompressor(level=nivel).stream_writer(bruto, closefd=False)
+
+def _leitor(nome, bruto):
+    if nome == "gzip":
+        return gzip.GzipFile(fileobj=bruto, mode="rb")
+    if nome == "lzma":
+        return lzma.LZMAFile(bruto, "rb")
+    escolher(nome)
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(bruto), TAMANHO_BLOCO)
+
+def gravar_linhas(arquivo, registros, nivel=None):
+    """Grava os registros (um por linha) comprimidos pelo formato da extensão, de forma atômica.
+
+    Retorna quantos registros foram gravados.
+    """
+    nome = formato(arquivo)
+    quantidade = 0
+    with escrita_atomica(arquivo, "wb") as bruto:
+        with _escritor(nome, bruto, nivel or NIVEIS[nome]) as escritor:
+            bloco = []
+            tamanho = 0
+            for registro in registros:
+                linha = codificar_linha(registro)
+                bloco.append(linha)
+                tamanho += len(linha)
+                quantidade += 1
+                if tamanho >= TAMANHO_BLOCO:
+                    escritor.write(b"".join(bloco))
+                    bloco, tamanho = [], 0
+            if bloco:
+                escritor.write(b"".join(bloco))
+    return quantidade
+
+def ler_linhas(arquivo):
+    """Registros de um arquivo comprimido, descomprimidos em fluxo, um de cada vez."""
+    nome = formato(arquivo)
+    with open(arquivo, "rb") as bruto, _leitor(nome, bruto) as leitor:
+        for linha in leitor:
+            if linha.strip():
+                yield decodificar(linha)
@@ -0,0 +1,67 @@
+"""Relatório de CPFs, CNPJs e e-mails repetidos nos dados já gravados.
+
+Cada coleção é lida uma vez e cada valor normalizado (só dígitos no CPF e no
+CNPJ, minúsculas no e-mail) vai para um dict valor -> IDs: uma passada linear,
+em vez de comparar os registros dois a dois.
+
+Uso (a partir da raiz do projeto):
+    python deduplicacao.py
+    python deduplicacao.py --pasta copia_dados --saida duplicados.json
+"""
+import argparse
+import json
+import sys
+
+import repositorio
+from busca import CAMPOS_EXATOS
+
+def duplicados(entidade):
+    """Retorna {campo: {valor normalizado: [IDs]}} só com os valores repetidos."""
+    normalizadores = CAMPOS_EXATOS[entidade]
+    vistos = {campo: {} for campo in normalizadores}
+    k = repositorio.chave(entidade)
+    for registro in repositorio.carregar(entidade):
+        for campo, normalizar in normalizadores.items():
+            valor = normalizar(registro.get(campo))
+            if valor:
+                vistos[campo].setdefault(valor, []).append(registro[k])
+    return {
+        campo: {valor: ids for valor, ids in valores.items() if len(ids) > 1}
+        for campo, valores in vistos.items()
+    }
+
+def relatorio():
+    """Duplicados de todas as entidades com campos únicos."""
+    return {entidade: duplicados(entidade) for entidade, campos in CAMPOS_EXATOS.items() if campos}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", default=repositorio.PASTA_DADOS, help="pasta de dados")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), help="backend de armazenamento")
+    parser.add_argument("--saida", help="grava o relatório completo neste arquivo JSON")
+    args = parser.parse_args()
+
+    if args.backend:
+        repositorio.configurar_backend(args.backend)
+    repositorio.configurar_pasta(args.pasta)
+
+    resultado = relatorio()
+    total = 0
+    for entidade, campos in resultado.items():
+        for campo, valores in campos.items():
+            total += len(valores)
+            print(f"{entidade}.{campo}: {len(valores)} valor(es) repetido(s)")
+            for valor, ids in list(valores.items())[:10]:
+                print(f"    {valor}: IDs {', '.join(map(str, ids))}")
+            if len(valores) > 10:
+                print("    ...")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+        print(f"💾 Relatório completo em {args.saida}")
+    print("✅ Nenhum valor repetido." if total == 0 else f"⚠️ {total} valor(es) repetido(s) no total.")
+    return 1 if total else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
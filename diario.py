@@ -0,0 +1,86 @@
+import json
+import os
+
+from arquivos import gravar_json_atomico
+from serializacao import codificar_linha, decodificar, ler_arquivo
+
+# ===================== Diário (JSON Lines) =====================
+# Cada registro novo é anexado como uma linha JSON no fim do diário, então
+# gravar um registro custa O(1) de I/O, independente do tamanho do histórico.
+# De tempos em tempos o diário é "compactado": os registros são gravados no
+# snapshot (o arquivo .json de sempre) e o diário volta a ficar vazio.
+
+def anexar_registro(caminho, registro):
+    """Anexa um registro ao diário, força a gravação no disco (fsync) e retorna os bytes gravados."""
+    linha = codificar_linha(registro)
+    with open(caminho, "ab") as f:
+        f.write(linha)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(linha)
+
+def ler_diario(caminho, inicio=0):
+    """Lê os registros do diário a partir de uma posição, descartando uma última linha incompleta.
+
+    Retorna os registros e a posição (em bytes) logo após o último registro lido.
+    """
+    registros = []
+    if not os.path.exists(caminho):
+        return registros, 0
+
+    posicao_valida = inicio
+    with open(caminho, "rb") as f:
+        f.seek(inicio)
+        for linha in f:
+            # Uma linha sem "\n" ou ilegível só pode ser uma gravação interrompida
+            if not linha.endswith(b"\n"):
+                break
+            try:
+                registros.append(decodificar(linha))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            posicao_valida += len(linha)
+        tamanho = f.seek(0, os.SEEK_END)
+
+    # Remove o lixo do fim para que os próximos registros não colem nele
+    if posicao_valida < tamanho:
+        with open(caminho, "r+b") as f:
+            f.truncate(posicao_valida)
+    return registros, posicao_valida
+
+def carregar_snapshot(arquivo_snapshot):
+    """Carrega o snapshot (lista JSON) ou uma lista vazia se ele não existir."""
+    if not os.path.exists(arquivo_snapshot):
+        return []
+    return ler_arquivo(arquivo_snapshot)
+
+def carregar_com_diario(arquivo_snapshot, arquivo_diario, chave):
+    """Carrega o snapshot e reaplica o diário por cima (a última imagem de cada registro vale).
+
+    Retorna os registros, quantos vieram do diário e a posição final do diário.
+    """
+    return mesclar_diario(carregar_snapshot(arquivo_snapshot), arquivo_diario, chave)
+
+def mesclar_diario(registros, arquivo_diario, chave):
+    """Reaplica o diário sobre registros já lidos (ex.: das partições), como carregar_com_diario()."""
+    posicoes = {r[chave]: i for i, r in enumerate(registros)}
+    pendentes, posicao = ler_diario(arquivo_diario)
+    for registro in pendentes:
+        # Cada linha é a imagem completa do registro: um ID que já existe foi
+        # atualizado (ou, se a compactação caiu entre gravar o snapshot e zerar
+        # o diário, é o mesmo registro) e a última imagem vale
+        i = posicoes.get(registro[chave])
+        if i is None:
+            posicoes[registro[chave]] = len(registros)
+            registros.append(registro)
+        else:
+            registros[i] = registro
+    return registros, len(pendentes), posicao
+
+def compactar(arquivo_snapshot, arquivo_diario, registros):
+    """Grava todos os registros no snapshot e zera o diário."""
+    gravar_json_atomico(arquivo_snapshot, registros)
+
+    # Só depois do snapshot estar no disco o diário pode ser zerado
+    with open(arquivo_diario, "w", encoding="utf-8"):
+        pass
@@ -0,0 +1,57 @@
+# ===================== Erros do sistema =====================
+
+class ErroDeVenda(Exception):
+    """Uma venda não pôde ser registrada."""
+
+class EstoqueInsuficiente(ErroDeVenda):
+    """A quantidade pedida é inválida ou excede o estoque do produto."""
+
+    def __init__(self, produto, quantidade):
+        super().__init__(
+            f"Quantidade inválida para {produto['nome']}: pedido {quantidade}, estoque {produto['estoque']}."
+        )
+        self.produto = produto
+        self.quantidade = quantidade
+
+class ConflitoDeVersao(ErroDeVenda):
+    """O produto foi alterado (por outro terminal) depois de ter sido lido."""
+
+    def __init__(self, produto):
+        super().__init__(
+            f"O produto {produto['nome']} foi alterado em outro terminal (estoque atual: {produto['estoque']})."
+        )
+        self.produto = produto
+
+class ValorDuplicado(ValueError):
+    """CPF, CNPJ ou e-mail já pertence a outro registro da mesma entidade."""
+
+    def __init__(self, campo, valor, id_existente):
+        super().__init__(f"{campo.upper()} {valor} já cadastrado (ID {id_existente}).")
+        self.campo = campo
+        self.valor = valor
+        self.id_existente = id_existente
+
+class NaoEncontrado(LookupError):
+    """Não existe registro da entidade com o ID informado."""
+
+    def __init__(self, entidade, id):
+        super().__init__(f"{entidade.capitalize()}: ID {id} não encontrado.")
+        self.entidade = entidade
+        self.id = id
+
+class DadoInvalido(ValueError):
+    """Um campo enviado para cadastro ou atualização está vazio ou fora do formato."""
+
+    def __init__(self, campo, mensagem):
+        super().__init__(mensagem)
+        self.campo = campo
+
+class RegistroEmUso(Exception):
+    """O registro não pode ser excluído: outros registros ainda apontam para ele."""
+
+    def __init__(self, entidade, id, dependentes):
+        vinculados = ", ".join(f"{len(ids)} {nome}" for nome, ids in dependentes.items())
+        super().__init__(f"{entidade.capitalize()}: ID {id} ainda tem registros vinculados ({vinculados}).")
+        self.entidade = entidade
+        self.id = id
+        self.dependentes = dependentes  # entidade -> IDs que apontam para o registro
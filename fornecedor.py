@@ -1,56 +1,16 @@
-import json
-import os
-import re
-
-ARQUIVO_JSON = os.path.join("dados", "fornecedores.json")
+import busca
+import repositorio
+import servicos
+from erros import DadoInvalido, NaoEncontrado, RegistroEmUso, ValorDuplicado
+from paginacao import paginar
+from sequencias import proximo_id
+from servicos import validar_cnpj, validar_email, validar_telefone
 
 # ===================== Funções utilitárias =====================
 
-def carregar_fornecedores():
-    """Carrega os fornecedores do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_JSON):
-        return []
-    with open(ARQUIVO_JSON, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def salvar_fornecedores(fornecedores):
-    """Salva a lista de fornecedores no arquivo JSON."""
-    with open(ARQUIVO_JSON, "w", encoding="utf-8") as f:
-        json.dump(fornecedores, f, indent=4, ensure_ascii=False)
-
-def verificar_id_existe(id, fornecedores):
-    """Verifica se o ID já existe em qualquer lista de fornecedores."""
-    for f in fornecedores:
-        if f["id"] == id:
-            return True
-    return False
-
-def gerar_id(fornecedores):
-    """Gera um novo ID baseado no maior existente, garantindo que seja único."""
-    new_id = max(f["id"] for f in fornecedores) + 1 if fornecedores else 1
-    while verificar_id_existe(new_id, fornecedores):
-        new_id += 1  
-    return new_id
-
-# ===================== Funções de validação =====================
-
-def validar_cnpj(cnpj):
-    """Valida o formato do CNPJ."""
-    cnpj = re.sub(r'\D', '', cnpj)  # Remove qualquer coisa que não seja número
-    if len(cnpj) != 14:
-        return False
-    return True
-
-def validar_telefone(telefone):
-    """Valida o formato do telefone (DDD + número)."""
-    return bool(re.match(r'^\(?\d{2}\)?\s?\d{4,5}-?\d{4}$', telefone))
-
-def validar_email(email):
-    """Valida o formato do e-mail."""
-    return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
+def gerar_id():
+    """Gera um novo ID único a partir da sequência persistida (O(1))."""
+    return proximo_id("fornecedores")
 
 # ===================== Funções CRUD =====================
 
@@ -64,8 +24,8 @@ def cadastrar_fornecedor(fornecedores):
         nome = input("Nome: ").strip().upper()
     
     cnpj = input("CNPJ: ").strip()
-    while not validar_cnpj(cnpj):
-        print("⚠️ CNPJ inválido!")
+    while not validar_cnpj(cnpj) or busca.duplicado("fornecedores", "cnpj", cnpj) is not None:
+        print("⚠️ CNPJ já cadastrado!" if validar_cnpj(cnpj) else "⚠️ CNPJ inválido!")
         cnpj = input("CNPJ: ").strip()
 
     telefone = input("Telefone: ").strip()
@@ -74,8 +34,8 @@ def cadastrar_fornecedor(fornecedores):
         telefone = input("Telefone: ").strip()
 
     email = input("Email: ").strip().lower()
-    while not validar_email(email):
-        print("⚠️ E-mail inválido!")
+    while not validar_email(email) or busca.duplicado("fornecedores", "email", email) is not None:
+        print("⚠️ E-mail já cadastrado!" if validar_email(email) else "⚠️ E-mail inválido!")
         email = input("Email: ").strip().lower()
 
     endereco_pais = input("País: ").strip().upper()
@@ -84,35 +44,30 @@ def cadastrar_fornecedor(fornecedores):
     endereco_bairro = input("Bairro: ").strip().upper()
     endereco_rua = input("Rua e Número: ").strip().upper()
 
-    fornecedor = {
-        "id": gerar_id(fornecedores),
-        "nome": nome,
-        "cnpj": cnpj,
-        "telefone": telefone,
-        "email": email,
-        "pais": endereco_pais,
-        "estado": endereco_estado,
-        "cidade": endereco_cidade,
-        "bairro": endereco_bairro,
-        "rua_num": endereco_rua
-    }
-
-    fornecedores.append(fornecedor)
-    salvar_fornecedores(fornecedores)
+    try:
+        servicos.cadastrar_fornecedor(
+            nome, cnpj, telefone, email, pais=endereco_pais, estado=endereco_estado,
+            cidade=endereco_cidade, bairro=endereco_bairro, rua_num=endereco_rua,
+        )
+    except (DadoInvalido, ValorDuplicado) as e:
+        print(f"⚠️ {e}\n")
+        return
     print("✅ Fornecedor cadastrado com sucesso!\n")
 
+def formatar_fornecedor(f):
+    """Formata um fornecedor para a listagem."""
+    return (
+        f"ID: {f['id']} | Nome: {f['nome']} | CNPJ: {f['cnpj']} | "
+        f"Telefone: {f.get('telefone', 'N/A')} | Email: {f['email']} | País: {f['pais']} | Estado: {f['estado']}"
+    )
+
 def listar_fornecedores(fornecedores):
-    """Lista todos os fornecedores cadastrados."""
-    print("\n--- Lista de Fornecedores ---")
+    """Lista os fornecedores cadastrados, página por página."""
     if not fornecedores:
+        print("\n--- Lista de Fornecedores ---")
         print("Nenhum fornecedor cadastrado.")
         return
-    for f in fornecedores:
-        print(
-            f"ID: {f['id']} | Nome: {f['nome']} | CNPJ: {f['cnpj']} | "
-            f"Telefone: {f.get('telefone', 'N/A')} | Email: {f['email']} | País: {f['pais']} | Estado: {f['estado']}"
-        )
-    print()
+    paginar(fornecedores, formatar_fornecedor, "id", "Lista de Fornecedores", entidade_busca="fornecedores")
 
 def atualizar_fornecedor(fornecedores):
     """Atualiza um fornecedor existente com validação de dados e verificação de ID único."""
@@ -123,23 +78,31 @@ def atualizar_fornecedor(fornecedores):
         print("⚠️ ID inválido!")
         return
 
-    for f in fornecedores:
-        if f["id"] == id_atualizar:
-            print(f"\nEditando fornecedor: {f['nome']}")
-            f["nome"] = input(f"Novo nome ({f['nome']}): ") or f["nome"]
-            f["cnpj"] = input(f"Novo CNPJ ({f['cnpj']}): ") or f["cnpj"]
-            f["telefone"] = input(f"Novo telefone ({f.get('telefone', 'N/A')}): ") or f.get("telefone", "")
-            f["email"] = input(f"Novo e-mail ({f['email']}): ") or f["email"]
-            f["pais"] = input(f"Novo país ({f['pais']}): ") or f["pais"]
-            f["estado"] = input(f"Novo estado ({f['estado']}): ") or f["estado"]
-            f["cidade"] = input(f"Nova cidade ({f['cidade']}): ") or f["cidade"]
-            f["bairro"] = input(f"Novo bairro ({f['bairro']}): ") or f["bairro"]
-            f["rua_num"] = input(f"Nova rua/número ({f['rua_num']}): ") or f["rua_num"]
-
-            salvar_fornecedores(fornecedores)
-            print("✅ Fornecedor atualizado com sucesso!\n")
-            return
-    print("⚠️ Fornecedor não encontrado.\n")
+    try:
+        f = servicos.buscar_fornecedor(id_atualizar)
+    except NaoEncontrado:
+        print("⚠️ Fornecedor não encontrado.\n")
+        return
+
+    print(f"\nEditando fornecedor: {f['nome']}")
+    novos = {
+        "nome": input(f"Novo nome ({f['nome']}): ") or f["nome"],
+        "cnpj": input(f"Novo CNPJ ({f['cnpj']}): ") or f["cnpj"],
+        "telefone": input(f"Novo telefone ({f.get('telefone', 'N/A')}): ") or f.get("telefone", ""),
+        "email": input(f"Novo e-mail ({f['email']}): ") or f["email"],
+        "pais": input(f"Novo país ({f['pais']}): ") or f["pais"],
+        "estado": input(f"Novo estado ({f['estado']}): ") or f["estado"],
+        "cidade": input(f"Nova cidade ({f['cidade']}): ") or f["cidade"],
+        "bairro": input(f"Novo bairro ({f['bairro']}): ") or f["bairro"],
+        "rua_num": input(f"Nova rua/número ({f['rua_num']}): ") or f["rua_num"],
+    }
+
+    try:
+        servicos.atualizar_fornecedor(f["id"], **novos)
+    except (DadoInvalido, ValorDuplicado, NaoEncontrado) as e:
+        print(f"⚠️ {e}\n")
+        return
+    print("✅ Fornecedor atualizado com sucesso!\n")
 
 def excluir_fornecedor(fornecedores):
     """Exclui um fornecedor pelo ID com confirmação."""
@@ -150,22 +113,39 @@ def excluir_fornecedor(fornecedores):
         print("⚠️ ID inválido!")
         return
 
-    for f in fornecedores:
-        if f["id"] == id_excluir:
-            confirmacao = input(f"Você tem certeza que deseja excluir o fornecedor {f['nome']}? (s/n): ").strip().lower()
-            if confirmacao == 's':
-                fornecedores.remove(f)
-                salvar_fornecedores(fornecedores)
-                print("🗑️ Fornecedor excluído com sucesso!\n")
-            else:
-                print("⚠️ Exclusão cancelada.\n")
+    try:
+        f = servicos.buscar_fornecedor(id_excluir)
+    except NaoEncontrado:
+        print("⚠️ Fornecedor não encontrado.\n")
+        return
+
+    vinculados = servicos.dependentes("fornecedores", f["id"])
+    resumo = ", ".join(f"{len(ids)} {nome}" for nome, ids in vinculados.items())
+    if "vendas" in vinculados:
+        print(f"⚠️ O fornecedor tem registros vinculados ({resumo}) e não pode ser excluído: as vendas são histórico.\n")
+        return
+    if vinculados:
+        # A cascata é uma escolha à parte, nunca a resposta padrão
+        print(f"⚠️ O fornecedor tem registros vinculados ({resumo}).")
+        cascata = input("Digite 'cascata' para excluí-lo junto com eles (Enter cancela): ").strip().lower() == "cascata"
+        confirmado = cascata
+    else:
+        cascata = False
+        confirmado = input(f"Você tem certeza que deseja excluir o fornecedor {f['nome']}? (s/n): ").strip().lower() == 's'
+    if confirmado:
+        try:
+            servicos.excluir_fornecedor(f["id"], cascata=cascata)
+        except (NaoEncontrado, RegistroEmUso) as e:
+            print(f"⚠️ {e}\n")
             return
-    print("⚠️ Fornecedor não encontrado.\n")
+        print("🗑️ Fornecedor excluído com sucesso!\n")
+    else:
+        print("⚠️ Exclusão cancelada.\n")
 
 # ===================== MENU =====================
 
 def menu():
-    fornecedores = carregar_fornecedores()
+    fornecedores = repositorio.carregar("fornecedores")
 
     while True:
         print("""
@@ -188,8 +168,7 @@ def menu():
         elif opcao == "4":
             excluir_fornecedor(fornecedores)
         elif opcao == "5":
-            print("💾 Saindo e salvando dados...")
-            salvar_fornecedores(fornecedores)
+            print("💾 Saindo do menu de fornecedores...")
             break
         else:
             print("⚠️ Opção inválida. Tente novamente.\n")
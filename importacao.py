@@ -0,0 +1,145 @@
+"""Importação em lote de produtos, clientes e fornecedores a partir de CSV ou JSONL.
+
+Uso (a partir da raiz do projeto):
+    python importacao.py produtos catalogo.csv
+    python importacao.py clientes clientes.jsonl --lote 20000 --rejeitados ruins.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import busca
+import movimentos
+import repositorio
+import servicos
+from sequencias import reservar_ids
+
+# Registros gravados de uma vez (um salvar por lote, não por linha)
+TAMANHO_LOTE = 10_000
+
+# ===================== Leitura em fluxo =====================
+
+def ler_linhas(arquivo):
+    """Gera (número da linha, dict) lendo o CSV ou JSONL sem carregar o arquivo todo."""
+    with open(arquivo, "r", encoding="utf-8", newline="") as f:
+        if arquivo.lower().endswith(".csv"):
+            for numero, linha in enumerate(csv.DictReader(f), start=2):
+                yield numero, linha
+            return
+        for numero, texto in enumerate(f, start=1):
+            if not texto.strip():
+                continue
+            try:
+                valor = json.loads(texto)
+            except json.JSONDecodeError as e:
+                yield numero, ValueError(f"JSON inválido: {e}")
+                continue
+            if not isinstance(valor, dict):
+                yield numero, ValueError("linha não é um objeto JSON")
+                continue
+            yield numero, valor
+
+# ===================== Validação =====================
+
+# As mesmas regras do cadastro pelos menus (servicos.preparar); DadoInvalido é um ValueError
+
+def validar_cliente(linha):
+    """Monta um cliente a partir da linha ou levanta ValueError com o motivo."""
+    return servicos.preparar("clientes", linha)
+
+def validar_fornecedor(linha):
+    """Monta um fornecedor a partir da linha ou levanta ValueError com o motivo."""
+    return servicos.preparar("fornecedores", linha)
+
+def validar_produto(linha):
+    """Monta um produto a partir da linha ou levanta ValueError com o motivo."""
+    return servicos.preparar("produtos", linha)
+
+VALIDADORES = {
+    "clientes": validar_cliente,
+    "fornecedores": validar_fornecedor,
+    "produtos": validar_produto,
+}
+
+# ===================== Importação =====================
+
+def _gravar_lote(entidade, lote):
+    """Atribui um bloco de IDs ao lote e grava tudo numa única operação."""
+    chave = repositorio.chave(entidade)
+    with repositorio.transacao(entidade):
+        for id, registro in zip(reservar_ids(entidade, len(lote)), lote):
+            registro[chave] = id
+        repositorio.inserir_lote(entidade, lote)
+        if entidade == "produtos":
+            movimentos.registrar("cadastro", {registro[chave]: registro["estoque"] for registro in lote})
+
+def _conferir_unicos(entidade, registro, no_lote):
+    """Rejeita CPF, CNPJ ou e-mail já cadastrado ou repetido no lote ainda não gravado."""
+    busca.garantir_unicos(entidade, registro)
+    valores = busca.valores_unicos(entidade, registro)
+    for campo, valor in valores:
+        if (campo, valor) in no_lote:
+            raise ValueError(f"{campo.upper()} {registro[campo]} repetido no arquivo")
+    no_lote.update(valores)
+
+def importar(entidade, arquivo, arquivo_rejeitados, tamanho_lote=TAMANHO_LOTE):
+    """Importa o arquivo em lotes; linhas inválidas vão para o arquivo de rejeitados."""
+    validar = VALIDADORES[entidade]
+    importados = rejeitados = 0
+    lote = []
+    no_lote = set()  # (campo, valor) únicos do lote; depois de gravado, o índice de busca os tem
+    inicio = time.perf_counter()
+
+    with open(arquivo_rejeitados, "w", encoding="utf-8") as saida_rejeitados:
+        for numero, linha in ler_linhas(arquivo):
+            try:
+                if isinstance(linha, Exception):
+                    raise linha
+                registro = validar(linha)
+                _conferir_unicos(entidade, registro, no_lote)
+                lote.append(registro)
+            except ValueError as e:
+                rejeitados += 1
+                dados = None if isinstance(linha, Exception) else linha
+                saida_rejeitados.write(
+                    json.dumps({"linha": numero, "motivo": str(e), "dados": dados}, ensure_ascii=False) + "\n"
+                )
+                continue
+
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(entidade, lote)
+                importados += len(lote)
+                lote = []
+                no_lote.clear()
+
+        if lote:
+            _gravar_lote(entidade, lote)
+            importados += len(lote)
+
+    duracao = time.perf_counter() - inicio
+    return {"importados": importados, "rejeitados": rejeitados, "segundos": duracao}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entidade", choices=sorted(VALIDADORES))
+    parser.add_argument("arquivo", help="arquivo .csv (com cabeçalho) ou .jsonl")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="registros gravados por vez")
+    parser.add_argument("--rejeitados", help="arquivo JSONL para as linhas inválidas")
+    args = parser.parse_args()
+
+    arquivo_rejeitados = args.rejeitados or os.path.splitext(args.arquivo)[0] + ".rejeitados.jsonl"
+    print(f"📥 Importando {args.entidade} de {args.arquivo}...")
+    resultado = importar(args.entidade, args.arquivo, arquivo_rejeitados, args.lote)
+
+    total = resultado["importados"] + resultado["rejeitados"]
+    print(f"✅ {resultado['importados']} importado(s)")
+    if resultado["rejeitados"]:
+        print(f"⚠️ {resultado['rejeitados']} rejeitado(s), detalhes em {arquivo_rejeitados}")
+    print(f"⏱️ {total} linha(s) em {resultado['segundos']:.2f}s ({total / max(resultado['segundos'], 1e-9):.0f} linhas/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Integridade referencial entre fornecedores, produtos, clientes e vendas.
+
+Índices reversos em memória (fornecedor -> produtos, cliente -> vendas,
+produto -> vendas) dizem em O(1) quem aponta para um registro. Eles são
+montados na primeira consulta e mantidos a cada aviso do repositório, como os
+índices de busca. servicos.excluir() os usa para recusar a exclusão de um
+registro em uso ou, se pedido, excluir junto o que depende dele.
+
+Cada relação tem uma política (POLITICAS). Em RESTRITA o dependente nunca sai
+em cascata: as vendas são histórico financeiro, então um cliente ou produto
+com vendas não pode ser excluído, nem junto com o seu fornecedor. Em CASCATA,
+a exclusão pedida com cascata leva junto os dependentes (os produtos de um
+fornecedor, desde que nenhum tenha vendas).
+
+Executado direto, confere os dados gravados numa passada por coleção e lista
+as referências quebradas (ex.: produtos de um fornecedor excluído).
+
+Uso (a partir da raiz do projeto):
+    python integridade.py
+    python integridade.py --pasta copia_dados --saida problemas.json
+"""
+import argparse
+import json
+import sys
+
+import repositorio
+from erros import RegistroEmUso
+
+# ===================== Relações =====================
+# (entidade referenciada, entidade que referencia) -> IDs referenciados por um registro
+
+def _fornecedor_do_produto(produto):
+    return (produto.get("fornecedor_id"),)
+
+def _cliente_da_venda(venda):
+    return (venda.get("id_cliente"),)
+
+def _produtos_da_venda(venda):
+    # Vendas antigas têm um único produto, sem lista de itens
+    if "itens" in venda:
+        return {item["id_produto"] for item in venda["itens"]}
+    return (venda.get("id_produto"),)
+
+RELACOES = {
+    ("fornecedores", "produtos"): _fornecedor_do_produto,
+    ("clientes", "vendas"): _cliente_da_venda,
+    ("produtos", "vendas"): _produtos_da_venda,
+}
+
+RESTRITA = "restrita"
+CASCATA = "cascata"
+
+POLITICAS = {
+    ("fornecedores", "produtos"): CASCATA,
+    ("clientes", "vendas"): RESTRITA,
+    ("produtos", "vendas"): RESTRITA,
+}
+
+_indices = {}  # (pai, filho) -> {"origem": coleção do filho, "mapa": {id do pai: {IDs do filho}}}
+
+# ===================== Índices reversos =====================
+
+def _ligar(mapa, id, referencias):
+    for referencia in referencias:
+        mapa.setdefault(referencia, set()).add(id)
+
+def _desligar(mapa, id, referencias):
+    for referencia in referencias:
+        ids = mapa.get(referencia)
+        if ids is not None:
+            ids.discard(id)
+            if not ids:
+                del mapa[referencia]
+
+def indice(pai, filho):
+    """Retorna {id do pai: {IDs do filho}} da relação, montando-o na primeira vez."""
+    with repositorio.trava_memoria:
+        repositorio.sincronizar(filho)
+        colecao = repositorio.indice(filho)
+        atual = _indices.get((pai, filho))
+        if atual is not None and atual["origem"] is colecao:
+            return atual["mapa"]
+
+        referencias = RELACOES[(pai, filho)]
+        mapa = {}
+        for id, registro in colecao.items():
+            _ligar(mapa, id, referencias(registro))
+        _indices[(pai, filho)] = {"origem": colecao, "mapa": mapa}
+        return mapa
+
+def _observador(pai, filho):
+    referencias = RELACOES[(pai, filho)]
+
+    def ao_mudar(acao, registro, anterior):
+        atual = _indices.get((pai, filho))
+        if atual is None or atual["origem"] is not repositorio.indice(filho):
+            return  # ainda não montado: será montado do zero na primeira consulta
+        id = registro[repositorio.chave(filho)]
+        if anterior is not None:
+            _desligar(atual["mapa"], id, referencias(anterior))
+        if acao == "remover":
+            _desligar(atual["mapa"], id, referencias(registro))
+        else:
+            _ligar(atual["mapa"], id, referencias(registro))
+    return ao_mudar
+
+for _pai, _filho in RELACOES:
+    repositorio.observar(_filho, _observador(_pai, _filho))
+
+# ===================== Consultas =====================
+
+def dependentes(entidade, id):
+    """{entidade: {IDs}} dos registros que apontam para este (só as relações com algum)."""
+    encontrados = {}
+    for pai, filho in RELACOES:
+        if pai == entidade:
+            ids = indice(pai, filho).get(id)
+            if ids:
+                encontrados[filho] = set(ids)
+    return encontrados
+
+def alcancados(entidade, id):
+    """(entidade, id) do registro e de tudo que depende dele, direta ou indiretamente, sem olhar as políticas."""
+    plano = [(entidade, id)]
+    vistos = set(plano)
+    pendentes = [(entidade, id)]
+    while pendentes:
+        for filho, ids in dependentes(*pendentes.pop()).items():
+            for id_filho in ids:
+                if (filho, id_filho) not in vistos:
+                    vistos.add((filho, id_filho))
+                    plano.append((filho, id_filho))
+                    pendentes.append((filho, id_filho))
+    return plano
+
+def plano_de_exclusao(entidade, id, cascata=False):
+    """(entidade, id) de tudo que sai com o registro: só ele, ou, com cascata, também os dependentes.
+
+    Levanta RegistroEmUso se alguém aponta para o registro (sem cascata) ou se
+    algum registro do plano tem dependentes numa relação RESTRITA.
+    """
+    vinculados = dependentes(entidade, id)
+    if vinculados and not cascata:
+        raise RegistroEmUso(entidade, id, vinculados)
+    plano = alcancados(entidade, id)
+    for nome, id_registro in plano:
+        restritos = {filho: ids for filho, ids in dependentes(nome, id_registro).items()
+                     if POLITICAS[(nome, filho)] == RESTRITA}
+        if restritos:
+            raise RegistroEmUso(nome, id_registro, restritos)
+    return plano
+
+# ===================== Verificação dos dados =====================
+
+def verificar():
+    """Referências quebradas: {"filho.pai": {ID do filho: [IDs do pai que não existem]}}."""
+    problemas = {}
+    for (pai, filho), referencias in RELACOES.items():
+        pais = repositorio.indice(pai)
+        chave = repositorio.chave(filho)
+        quebradas = {}
+        for registro in repositorio.carregar(filho):
+            faltando = [referencia for referencia in referencias(registro) if referencia not in pais]
+            if faltando:
+                quebradas[registro[chave]] = faltando
+        problemas[f"{filho}.{pai}"] = quebradas
+    return problemas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", default=repositorio.PASTA_DADOS, help="pasta de dados")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), help="backend de armazenamento")
+    parser.add_argument("--saida", help="grava a lista completa neste arquivo JSON")
+    args = parser.parse_args()
+
+    if args.backend:
+        repositorio.configurar_backend(args.backend)
+    repositorio.configurar_pasta(args.pasta)
+
+    problemas = verificar()
+    total = 0
+    for relacao, quebradas in problemas.items():
+        total += len(quebradas)
+        filho, pai = relacao.split(".")
+        print(f"{filho} apontando para {pai} inexistentes: {len(quebradas)}")
+        for id, faltando in list(quebradas.items())[:10]:
+            print(f"    ID {id} -> {', '.join(map(str, faltando))}")
+        if len(quebradas) > 10:
+            print("    ...")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(problemas, f, indent=4, ensure_ascii=False)
+        print(f"📄 Lista completa em {args.saida}")
+
+    if total:
+        print(f"⚠️ {total} registro(s) com referências quebradas.")
+        sys.exit(1)
+    print("✅ Nenhuma referência quebrada.")
+
+if __name__ == "__main__":
+    main()
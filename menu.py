@@ -3,6 +3,9 @@ from fornecedor import menu as menu_fornecedores
 from produto import menu_produtos
 from vendas import menu_vendas
 from clientes import menu_clientes
+from relatorios import menu_relatorios
+import agregados
+import repositorio
 import os
 
 
@@ -47,15 +50,23 @@ def menu_principal():
                     
             elif opcao == "4":
                 try:
+                    # Carregados antes das vendas, os agregados só somam as novas
+                    agregados.agregados()
                     menu_vendas()
+                    agregados.salvar()
                 except Exception as e:
                     print(f"⚠️ Erro ao acessar Vendas: {e}")
                     
             elif opcao == "5":
-                print("\n📊 Relatórios ainda não implementados.\n")
+                try:
+                    menu_relatorios()
+                except Exception as e:
+                    print(f"⚠️ Erro ao acessar Relatórios: {e}")
 
             elif opcao == "0":
                 print("\n👋 Saindo do sistema... Até mais!\n")
+                repositorio.descarregar()
+                agregados.salvar()
                 break
 
     except KeyboardInterrupt:
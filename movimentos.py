@@ -0,0 +1,357 @@
+"""Livro de estoque: cada mudança de estoque é um movimento num diário só de anexação.
+
+Venda, reposição, ajuste manual, cadastro e exclusão de produto viram uma
+linha em dados/movimentos.jsonl ({data_hora, id_produto, quantidade com sinal,
+tipo, referencia}); nada é reescrito. A cada INTERVALO_SNAPSHOT movimentos os
+saldos de todos os produtos vão para um snapshot em dados/estoque/, com a data
+e a posição (em bytes) do diário até onde ele vale. O saldo atual, ou o de
+qualquer data, é o snapshot mais recente antes dela mais o trecho do diário
+depois dele: no máximo INTERVALO_SNAPSHOT linhas, nunca o histórico inteiro.
+
+O campo estoque do produto continua sendo o valor usado nas vendas; o livro é
+gravado logo depois dele, ainda sob a mesma trava (servicos.py), e só se a
+gravação deu certo: uma venda recusada ou um conflito de versão não deixam
+movimento no livro. Se o programa cair entre as duas gravações falta um
+movimento, e conferir() acha a diferença e, se pedido, lança o ajuste.
+
+Quando o livro ainda não existe, o primeiro uso grava um snapshot de abertura
+com o estoque dos produtos antes dos movimentos sendo lançados; antes dele não
+há histórico (saldo 0).
+
+Uso (a partir da raiz do projeto):
+    python movimentos.py conferir
+    python movimentos.py conferir --corrigir
+    python movimentos.py saldo 42 --data 2024-03-31
+    python movimentos.py extrato 42 --inicio 2024-03-01 --fim 2024-03-31
+    python movimentos.py snapshot
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import repositorio
+from arquivos import gravar_json_atomico
+from diario import anexar_registro
+from serializacao import codificar_linha, decodificar, ler_arquivo
+
+ARQUIVO_MOVIMENTOS = "movimentos.jsonl"
+PASTA_SNAPSHOTS = "estoque"
+INTERVALO_SNAPSHOT = 10_000
+
+TIPOS = ("cadastro", "venda", "reposicao", "ajuste", "exclusao")
+
+_estado = {
+    "arquivo": None,        # diário sobre o qual os saldos foram montados
+    "posicao": 0,           # bytes do diário já aplicados aos saldos
+    "saldos": {},           # id_produto -> saldo no livro
+    "desde_snapshot": 0,    # movimentos aplicados depois do último snapshot
+}
+
+# ===================== Arquivos =====================
+
+def _arquivo():
+    return repositorio.caminho(ARQUIVO_MOVIMENTOS)
+
+def _pasta():
+    return repositorio.caminho(PASTA_SNAPSHOTS)
+
+def _agora():
+    return datetime.now().isoformat(timespec="seconds")
+
+def _data(texto):
+    """Data limite de uma consulta: uma data sem hora vale até o fim do dia."""
+    if texto is None:
+        return None
+    texto = str(texto)
+    return texto + "T23:59:59" if len(texto) == 10 else texto
+
+def _snapshots():
+    """(data_hora, posição, caminho) de cada snapshot, do mais antigo ao mais novo."""
+    pasta = _pasta()
+    if not os.path.isdir(pasta):
+        return []
+    encontrados = []
+    for nome in os.listdir(pasta):
+        base, extensao = os.path.splitext(nome)
+        if extensao != ".json" or "-" not in base:
+            continue
+        data, posicao = base.split("-", 1)
+        data = datetime.strptime(data, "%Y%m%dT%H%M%S").isoformat()
+        encontrados.append((int(posicao), data, os.path.join(pasta, nome)))
+    encontrados.sort()
+    return [(data, posicao, caminho) for posicao, data, caminho in encontrados]
+
+def _ler_snapshot(caminho):
+    return {int(id): saldo for id, saldo in ler_arquivo(caminho)["estoques"].items()}
+
+def _gravar_snapshot(saldos, posicao, data_hora):
+    os.makedirs(_pasta(), exist_ok=True)
+    nome = f"{data_hora.replace('-', '').replace(':', '')}-{posicao:015d}.json"
+    gravar_json_atomico(os.path.join(_pasta(), nome), {
+        "data_hora": data_hora,
+        "posicao": posicao,
+        "estoques": {str(id): saldo for id, saldo in saldos.items() if saldo},
+    })
+
+def _ler(inicio=0, fim=None):
+    """Movimentos do diário entre as posições `inicio` e `fim` (bytes), com a posição após cada um.
+
+    Para numa linha incompleta (gravação interrompida).
+    """
+    if not os.path.exists(_arquivo()):
+        return
+    posicao = inicio
+    with open(_arquivo(), "rb") as f:
+        f.seek(inicio)
+        for linha in f:
+            if fim is not None and posicao >= fim:
+                return
+            if not linha.endswith(b"\n"):
+                return
+            try:
+                movimento = decodificar(linha)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return
+            posicao += len(linha)
+            yield movimento, posicao
+
+def _aplicar(saldos, movimento):
+    id_produto = movimento["id_produto"]
+    saldos[id_produto] = saldos.get(id_produto, 0) + movimento["quantidade"]
+
+# ===================== Saldos em memória =====================
+
+def _abrir(pendentes=None):
+    """Primeiro uso: grava o snapshot de abertura com o estoque dos produtos.
+
+    `pendentes` são movimentos já aplicados ao estoque e ainda não lançados:
+    saem da abertura para não serem contados duas vezes.
+    """
+    with repositorio.trava_dados():
+        if _snapshots() or os.path.exists(_arquivo()):
+            return  # outro processo abriu o livro antes
+        repositorio.sincronizar("produtos")
+        estoques = {id: produto["estoque"] for id, produto in repositorio.indice("produtos").items()}
+        for id_produto, quantidade in (pendentes or {}).items():
+            estoques[id_produto] = estoques.get(id_produto, 0) - quantidade
+        _gravar_snapshot(estoques, 0, _agora())
+
+def _carregar(pendentes=None):
+    """Monta os saldos do zero: último snapshot mais o diário depois dele."""
+    snapshots = _snapshots()
+    if not snapshots and not os.path.exists(_arquivo()):
+        _abrir(pendentes)
+        snapshots = _snapshots()
+    if snapshots:
+        _, posicao, caminho = snapshots[-1]
+        saldos = _ler_snapshot(caminho)
+    else:
+        posicao, saldos = 0, {}
+    _estado.update(arquivo=_arquivo(), posicao=posicao, saldos=saldos, desde_snapshot=0)
+    _acompanhar()
+
+def _acompanhar(pendentes=None):
+    """Aplica aos saldos o que foi anexado ao diário (por este ou outro processo) desde a última leitura."""
+    if _estado["arquivo"] != _arquivo():
+        _carregar(pendentes)
+        return
+    saldos = _estado["saldos"]
+    for movimento, posicao in _ler(_estado["posicao"]):
+        _aplicar(saldos, movimento)
+        _estado["posicao"] = posicao
+        _estado["desde_snapshot"] += 1
+
+def _anexar(linhas):
+    """Anexa as linhas ao diário numa única escrita + fsync, descartando antes uma linha incompleta."""
+    arquivo = _arquivo()
+    if os.path.exists(arquivo) and os.path.getsize(arquivo) > _estado["posicao"]:
+        with open(arquivo, "r+b") as f:
+            f.truncate(_estado["posicao"])
+    if len(linhas) == 1:
+        return anexar_registro(arquivo, linhas[0])
+    conteudo = b"".join(codificar_linha(movimento) for movimento in linhas)
+    with open(arquivo, "ab") as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(conteudo)
+
+def registrar(tipo, quantidades, referencia=None, data_hora=None):
+    """Lança no livro os movimentos {id_produto: quantidade com sinal} (zeros são ignorados).
+
+    Deve ser chamado depois de gravar o novo estoque, dentro da mesma transação.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de movimento desconhecido: {tipo}")
+    with repositorio.trava_memoria, repositorio.trava_dados():
+        _acompanhar(quantidades)
+        data_hora = data_hora or _agora()
+        movimentos = []
+        for id_produto, quantidade in quantidades.items():
+            if not quantidade:
+                continue
+            movimento = {"data_hora": data_hora, "id_produto": id_produto, "quantidade": quantidade, "tipo": tipo}
+            if referencia is not None:
+                movimento["referencia"] = referencia
+            movimentos.append(movimento)
+        if not movimentos:
+            return movimentos
+
+        _estado["posicao"] += _anexar(movimentos)
+        for movimento in movimentos:
+            _aplicar(_estado["saldos"], movimento)
+        _estado["desde_snapshot"] += len(movimentos)
+        if _estado["desde_snapshot"] >= INTERVALO_SNAPSHOT:
+            snapshot()
+        return movimentos
+
+def snapshot():
+    """Grava agora um snapshot dos saldos; retorna a posição do diário que ele cobre."""
+    with repositorio.trava_memoria, repositorio.trava_dados():
+        _acompanhar()
+        _gravar_snapshot(_estado["saldos"], _estado["posicao"], _agora())
+        _estado["desde_snapshot"] = 0
+        return _estado["posicao"]
+
+# ===================== Consultas =====================
+
+def _inicio_antes(data, inclusive=False):
+    """(saldos, posição) do snapshot mais recente anterior à data (ou dela mesma, com inclusive);
+    sem data, o do começo do diário."""
+    escolhido = None
+    for snapshot_data, posicao, caminho in _snapshots():
+        if data is None:
+            if posicao == 0:
+                escolhido = (posicao, caminho)
+            break
+        if snapshot_data > data or (snapshot_data == data and not inclusive):
+            break
+        escolhido = (posicao, caminho)
+    if escolhido is None:
+        return {}, 0
+    return _ler_snapshot(escolhido[1]), escolhido[0]
+
+def _fim_depois(data):
+    """Posição do primeiro snapshot posterior à data: dali em diante só há movimentos mais novos."""
+    if data is not None:
+        for snapshot_data, posicao, _ in _snapshots():
+            if snapshot_data > data:
+                return posicao
+    return None
+
+def saldos(data=None):
+    """{id_produto: saldo} de todos os produtos no livro, agora ou ao fim da data informada."""
+    data = _data(data)
+    if data is None:
+        with repositorio.trava_memoria:
+            _acompanhar()
+            return dict(_estado["saldos"])
+
+    encontrados, posicao = _inicio_antes(data, inclusive=True)
+    for movimento, _ in _ler(posicao, _fim_depois(data)):
+        if movimento["data_hora"] <= data:
+            _aplicar(encontrados, movimento)
+    return encontrados
+
+def saldo(id_produto, data=None):
+    """Saldo de um produto no livro, agora ou ao fim da data informada."""
+    if data is None:
+        with repositorio.trava_memoria:
+            _acompanhar()
+            return _estado["saldos"].get(id_produto, 0)
+    return saldos(data).get(id_produto, 0)
+
+def extrato(id_produto, inicio=None, fim=None):
+    """Saldo anterior ao período e os movimentos do produto dentro dele (datas inclusivas).
+
+    Retorna (saldo_inicial, [movimentos, cada um com o saldo após ele]).
+    """
+    fim = _data(fim)
+    anteriores, posicao = _inicio_antes(inicio)
+    atual = anteriores.get(id_produto, 0)
+    movimentos = []
+    for movimento, _ in _ler(posicao, _fim_depois(fim)):
+        if movimento["id_produto"] != id_produto or (fim is not None and movimento["data_hora"] > fim):
+            continue
+        atual += movimento["quantidade"]
+        if inicio is None or movimento["data_hora"] >= inicio:
+            movimentos.append({**movimento, "saldo": atual})
+    if movimentos:
+        return movimentos[0]["saldo"] - movimentos[0]["quantidade"], movimentos
+    return atual, movimentos
+
+def conferir(corrigir=False):
+    """Produtos cujo estoque difere do saldo no livro: {id_produto: (saldo no livro, estoque)}.
+
+    Com corrigir, lança um ajuste para cada diferença, deixando o livro igual ao estoque.
+    """
+    with repositorio.transacao("produtos"):
+        no_livro = saldos()
+        produtos = repositorio.indice("produtos")
+        diferencas = {}
+        for id_produto in no_livro.keys() | produtos.keys():
+            produto = produtos.get(id_produto)
+            estoque = produto["estoque"] if produto is not None else 0
+            if no_livro.get(id_produto, 0) != estoque:
+                diferencas[id_produto] = (no_livro.get(id_produto, 0), estoque)
+        if corrigir and diferencas:
+            registrar("ajuste", {id: estoque - livro for id, (livro, estoque) in diferencas.items()}, "conferencia")
+    return diferencas
+
+# ===================== Linha de comando =====================
+
+def _mostrar_movimento(movimento):
+    referencia = f" ({movimento['referencia']})" if "referencia" in movimento else ""
+    print(f"{movimento['data_hora']}  {movimento['tipo']:<10}{referencia:<14} "
+          f"{movimento['quantidade']:+6d}  saldo {movimento['saldo']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", default=repositorio.PASTA_DADOS, help="pasta de dados")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), help="backend de armazenamento")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comando_conferir = comandos.add_parser("conferir", help="compara o livro com o estoque dos produtos")
+    comando_conferir.add_argument("--corrigir", action="store_true", help="lança ajustes para as diferenças")
+    comando_saldo = comandos.add_parser("saldo", help="saldo de um produto, agora ou numa data")
+    comando_saldo.add_argument("id_produto", type=int)
+    comando_saldo.add_argument("--data", help="AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS")
+    comando_extrato = comandos.add_parser("extrato", help="movimentos de um produto num período")
+    comando_extrato.add_argument("id_produto", type=int)
+    comando_extrato.add_argument("--inicio")
+    comando_extrato.add_argument("--fim")
+    comandos.add_parser("snapshot", help="grava um snapshot dos saldos agora")
+    args = parser.parse_args()
+
+    if args.backend:
+        repositorio.configurar_backend(args.backend)
+    repositorio.configurar_pasta(args.pasta)
+
+    if args.comando == "saldo":
+        print(f"Produto {args.id_produto}: {saldo(args.id_produto, args.data)} em estoque"
+              + (f" ao fim de {args.data}" if args.data else ""))
+    elif args.comando == "extrato":
+        saldo_inicial, movimentos = extrato(args.id_produto, args.inicio, args.fim)
+        print(f"Saldo anterior: {saldo_inicial}")
+        for movimento in movimentos:
+            _mostrar_movimento(movimento)
+        print(f"{len(movimentos)} movimento(s)")
+    elif args.comando == "snapshot":
+        print(f"📸 Snapshot gravado (diário até o byte {snapshot()}).")
+    else:
+        diferencas = conferir(args.corrigir)
+        for id_produto, (livro, estoque) in sorted(diferencas.items())[:20]:
+            print(f"    Produto {id_produto}: livro {livro}, estoque {estoque}")
+        if len(diferencas) > 20:
+            print("    ...")
+        if diferencas and not args.corrigir:
+            print(f"⚠️ {len(diferencas)} produto(s) com estoque diferente do livro.")
+            sys.exit(1)
+        if diferencas:
+            print(f"✍️ {len(diferencas)} ajuste(s) lançado(s).")
+        else:
+            print("✅ Estoque e livro conferem.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import sys
+from bisect import bisect_left
+from itertools import islice
+
+import busca
+
+# ===================== Listagem paginada e em fluxo =====================
+# As listagens não montam mais a lista inteira na tela: mostram uma página por
+# vez (percorrendo a coleção com islice, sem cópia) ou escrevem linha a linha,
+# por um gerador, num arquivo ou na saída padrão, com buffer.
+
+TAMANHO_PAGINA = 20
+
+# Buffer de escrita da listagem em fluxo (bytes)
+TAMANHO_BUFFER = 1 << 16
+
+def gerar_linhas(registros, formatar):
+    """Gera as linhas formatadas, uma por registro (registros formatados como None são pulados)."""
+    for registro in registros:
+        linha = formatar(registro)
+        if linha is not None:
+            yield linha + "\n"
+
+def transmitir(registros, formatar, destino=None):
+    """Escreve todos os registros em fluxo, no arquivo `destino` ou na saída padrão.
+
+    Só uma linha formatada existe na memória de cada vez; o buffer de escrita
+    junta as linhas em blocos grandes antes de ir para o disco ou o terminal.
+    """
+    if destino:
+        with open(destino, "w", encoding="utf-8", buffering=TAMANHO_BUFFER) as saida:
+            saida.writelines(gerar_linhas(registros, formatar))
+    else:
+        sys.stdout.writelines(gerar_linhas(registros, formatar))
+        sys.stdout.flush()
+
+def _mapa(registros):
+    """O dict {id: registro} por trás de uma coleção do repositório (visão dos valores), ou None."""
+    return getattr(registros, "mapping", None) or getattr(registros, "_mapping", None)
+
+def _ids_em_ordem(registros, campo_id):
+    """(IDs em ordem crescente, posição de cada um na coleção ou None se forem as próprias).
+
+    Montados uma vez por listagem; os de uma coleção do repositório saem das
+    chaves do dict, sem montar registros. Em geral já vêm em ordem; um registro
+    trazido fora de ordem de outro terminal obriga a ordenar.
+    """
+    mapa = _mapa(registros)
+    ids = list(mapa) if mapa is not None else [registro[campo_id] for registro in registros]
+    if all(anterior < id for anterior, id in zip(ids, islice(ids, 1, None))):
+        return ids, None
+    posicoes = sorted(range(len(ids)), key=ids.__getitem__)
+    return [ids[posicao] for posicao in posicoes], posicoes
+
+def _posicao_do_id(ordenados, posicoes, id):
+    """Posição do ID na coleção, ou None: busca binária nos IDs ordenados."""
+    i = bisect_left(ordenados, id)
+    if i == len(ordenados) or ordenados[i] != id:
+        return None
+    return i if posicoes is None else posicoes[i]
+
+def paginar(registros, formatar, campo_id, titulo, tamanho=TAMANHO_PAGINA, entidade_busca=None):
+    """Mostra a coleção página por página, com navegação pelo teclado.
+
+    Com `entidade_busca`, o comando "b <texto>" busca na entidade (por nome,
+    CPF, CNPJ ou e-mail) e pagina o resultado.
+    """
+    total = len(registros)
+    paginas = max((total + tamanho - 1) // tamanho, 1)
+    inicio = 0
+    mapa = _mapa(registros)
+    ordem = None  # IDs ordenados, montados no primeiro "i <ID>"
+
+    while True:
+        print(f"\n--- {titulo} (página {inicio // tamanho + 1} de {paginas}, {total} registro(s)) ---")
+        for linha in gerar_linhas(islice(registros, inicio, inicio + tamanho), formatar):
+            print(linha, end="")
+
+        comando = input(
+            "\n[Enter] próxima | a - anterior | i <ID> - ir para o ID | "
+            + ("b <texto> - buscar | " if entidade_busca else "")
+            + "e [arquivo] - exportar tudo | s - sair: "
+        ).strip()
+
+        if comando in ("", "p"):
+            if inicio + tamanho < total:
+                inicio += tamanho
+            else:
+                break  # passou da última página
+        elif comando == "a":
+            inicio = max(inicio - tamanho, 0)
+        elif comando.startswith("i"):
+            try:
+                id = int(comando[1:])
+            except ValueError:
+                print("⚠️ Use: i <ID>")
+                continue
+            if mapa is not None and id not in mapa:
+                posicao = None  # ID inexistente: o dict responde sem montar a ordem
+            else:
+                if ordem is None:
+                    ordem = _ids_em_ordem(registros, campo_id)
+                posicao = _posicao_do_id(*ordem, id)
+            if posicao is None:
+                print("⚠️ ID não encontrado.")
+            else:
+                inicio = posicao - posicao % tamanho
+        elif comando.startswith("b") and entidade_busca:
+            consulta = comando[1:].strip()
+            encontrados = busca.buscar(entidade_busca, consulta)
+            if encontrados:
+                paginar(encontrados, formatar, campo_id, f"Busca: {consulta}", tamanho)
+            else:
+                print("⚠️ Nenhum registro encontrado.")
+        elif comando.startswith("e"):
+            destino = comando[1:].strip() or None
+            transmitir(registros, formatar, destino)
+            if destino:
+                print(f"💾 Lista exportada para {destino}")
+        elif comando == "s":
+            break
+        else:
+            print("⚠️ Opção inválida.")
+    print()
@@ -0,0 +1,264 @@
+"""Partições por mês das vendas (backend JSON), com manifesto e poda por período.
+
+Em vez de um único vendas.json que cresce para sempre, cada mês vai para o
+seu arquivo em dados/vendas/ (2024-03.json; vendas sem data_hora, anteriores
+a ela, em sem-data.json). O manifesto (dados/vendas/manifesto.json) guarda
+por partição a quantidade, o menor e o maior ID e data_hora, o valor total e
+um resumo (hash) do conteúdo.
+
+Gravar a coleção regrava só as partições que mudaram (normalmente a do mês
+corrente): as de vendas inseridas, alteradas ou removidas em memória desde a
+última gravação (avisos do repositório, inclusive as trazidas de outros
+terminais) e as cuja quantidade, IDs ou valor total não batem com o
+manifesto. As demais nem são codificadas. O manifesto é gravado por último e
+é o que vale.
+
+A poda por período vale para as leituras do disco: repositorio.percorrer_periodo
+(e repositorio.periodo enquanto as vendas não estão em memória) abre só as
+partições cujo intervalo de datas cruza o pedido. Carregar a coleção (menus,
+relatórios, servidor) ainda lê todas as partições, e dali em diante
+repositorio.periodo filtra a memória. Meses fechados podem ser arquivados:
+a partição vira um arquivo JSON Lines comprimido (2024-03.jsonl.zst, .gz ou
+.xz, ver compressao.py), lido em fluxo, um registro de cada vez.
+
+O vendas.json de antes das partições é lido normalmente e convertido na
+primeira gravação; dali em diante ele é ignorado (e pode ser apagado).
+
+Uso (a partir da raiz do projeto):
+    python particoes.py manifesto
+    python particoes.py arquivar --ate 2024-01
+    python particoes.py arquivar --ate 2024-01 --compressao lzma
+    python particoes.py resumo --inicio 2024-03-01 --fim 2024-03-31
+"""
+import argparse
+import hashlib
+import os
+from datetime import date
+
+import compressao
+import repositorio
+from arquivos import escrita_atomica, gravar_json_atomico
+from diario import carregar_snapshot
+from serializacao import codificar, ler_arquivo
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+SEM_DATA = "sem-data"
+
+_alteradas = {}  # entidade -> períodos com registros alterados desde a última gravação
+
+# ===================== Manifesto =====================
+
+def _pasta(entidade):
+    return repositorio.caminho(entidade)
+
+def caminho_manifesto(entidade):
+    """Arquivo do manifesto: a assinatura dele diz se as partições mudaram."""
+    return os.path.join(_pasta(entidade), ARQUIVO_MANIFESTO)
+
+def _campo(entidade):
+    return repositorio.ENTIDADES[entidade]["particionada"]
+
+def periodo(entidade, registro):
+    """Partição do registro: "AAAA-MM" da data, ou SEM_DATA."""
+    data = registro.get(_campo(entidade))
+    return data[:7] if data else SEM_DATA
+
+def manifesto(entidade):
+    """{período: informações da partição}, ou None se a entidade ainda não foi particionada."""
+    arquivo = caminho_manifesto(entidade)
+    if not os.path.exists(arquivo):
+        return None
+    return ler_arquivo(arquivo)["particoes"]
+
+def _percorrer_particao(entidade, info):
+    """Registros de uma partição; as arquivadas são descomprimidas em fluxo."""
+    arquivo = os.path.join(_pasta(entidade), info["arquivo"])
+    if compressao.formato(arquivo):
+        return compressao.ler_linhas(arquivo)
+    return ler_arquivo(arquivo)
+
+def _gravar_particao(arquivo, registros, conteudo):
+    if compressao.formato(arquivo):
+        compressao.gravar_linhas(arquivo, registros)
+        return
+    with escrita_atomica(arquivo, "wb") as f:
+        f.write(conteudo)
+
+def _marcar(entidade):
+    def marcar(acao, registro, anterior):
+        alteradas = _alteradas.setdefault(entidade, set())
+        alteradas.add(periodo(entidade, registro))
+        if anterior is not None:
+            alteradas.add(periodo(entidade, anterior))  # a venda pode ter mudado de mês
+    return marcar
+
+for _entidade, _config in repositorio.ENTIDADES.items():
+    if "particionada" in _config:
+        repositorio.observar(_entidade, _marcar(_entidade))
+
+# ===================== Leitura e gravação =====================
+
+def ler(entidade):
+    """Todos os registros, partição por partição, em ordem de ID (a carga da coleção: sem poda)."""
+    particoes = manifesto(entidade)
+    if particoes is None:
+        # Ainda no formato antigo: um único arquivo com a coleção inteira
+        return carregar_snapshot(repositorio.caminho(repositorio.ENTIDADES[entidade]["arquivo"]))
+    registros = []
+    for nome in sorted(particoes):
+        registros.extend(_percorrer_particao(entidade, particoes[nome]))
+    # Já vem quase em ordem (IDs crescem com a data): o sort é praticamente linear
+    registros.sort(key=lambda registro: registro[repositorio.chave(entidade)])
+    return registros
+
+def gravar(entidade, registros):
+    """Grava a coleção nas partições, reescrevendo só as que mudaram, e depois o manifesto."""
+    chave = repositorio.chave(entidade)
+    campo = _campo(entidade)
+    grupos = {}
+    for registro in registros:
+        grupos.setdefault(periodo(entidade, registro), []).append(registro)
+
+    pasta = _pasta(entidade)
+    os.makedirs(pasta, exist_ok=True)
+    anteriores = manifesto(entidade) or {}
+    alteradas = _alteradas.get(entidade, set())
+    particoes = {}
+    for nome in sorted(grupos):
+        grupo = grupos[nome]
+        anterior = anteriores.get(nome)
+        # Uma partição arquivada continua comprimida quando precisa ser regravada
+        arquivo = anterior["arquivo"] if anterior else f"{nome}.json"
+        datas = [registro[campo] for registro in grupo if registro.get(campo)]
+        info = particoes[nome] = {
+            "arquivo": arquivo,
+            "registros": len(grupo),
+            "id_min": min(registro[chave] for registro in grupo),
+            "id_max": max(registro[chave] for registro in grupo),
+            "data_min": min(datas, default=None),
+            "data_max": max(datas, default=None),
+            "valor_total": round(sum(registro.get("valor_total", 0) for registro in grupo), 2),
+        }
+        existe = os.path.exists(os.path.join(pasta, arquivo))
+        if (anterior is not None and existe and nome not in alteradas
+                and all(anterior[c] == info[c] for c in ("registros", "id_min", "id_max", "valor_total"))):
+            info["resumo"] = anterior["resumo"]
+            continue
+        conteudo = codificar(grupo)
+        info["resumo"] = hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+        if anterior is None or anterior["resumo"] != info["resumo"] or not existe:
+            _gravar_particao(os.path.join(pasta, arquivo), grupo, conteudo)
+    gravar_json_atomico(caminho_manifesto(entidade), {"particoes": particoes})
+    _alteradas.pop(entidade, None)
+
+    # Só com o novo manifesto no disco os arquivos que saíram dele podem ser apagados
+    em_uso = {info["arquivo"] for info in particoes.values()}
+    for info in anteriores.values():
+        if info["arquivo"] not in em_uso:
+            os.remove(os.path.join(pasta, info["arquivo"]))
+
+def _cruza(info, inicio, fim):
+    if info["data_min"] is None:
+        return False  # partição sem data nunca entra numa consulta por período
+    return (inicio is None or info["data_max"] >= inicio) and (fim is None or info["data_min"] <= fim)
+
+def percorrer(entidade, inicio=None, fim=None):
+    """Registros com data em [inicio, fim], um de cada vez, abrindo só as partições que cruzam o período.
+
+    As partições arquivadas são descomprimidas em fluxo: a memória usada não
+    depende do tamanho delas.
+    """
+    particoes = manifesto(entidade)
+    if particoes is None:
+        candidatos = ler(entidade)
+    else:
+        candidatos = (
+            registro
+            for nome in sorted(particoes)
+            if (inicio is None and fim is None) or _cruza(particoes[nome], inicio, fim)
+            for registro in _percorrer_particao(entidade, particoes[nome])
+        )
+    for registro in candidatos:
+        if repositorio.no_periodo(entidade, registro, inicio, fim):
+            yield registro
+
+def ler_periodo(entidade, inicio=None, fim=None):
+    """Lista dos registros com data em [inicio, fim] (ver percorrer())."""
+    return list(percorrer(entidade, inicio, fim))
+
+# ===================== Arquivamento =====================
+
+def arquivar(entidade, ate, compressor=None):
+    """Move para o arquivo frio (JSON Lines comprimido) as partições anteriores ao mês `ate` ("AAAA-MM").
+
+    `compressor` é "zstd", "gzip" ou "lzma" (padrão: compressao.escolher()).
+    Retorna os períodos arquivados.
+    """
+    extensao = compressao.EXTENSOES[compressao.escolher(compressor)]
+    arquivados = []
+    with repositorio.trava_dados():
+        particoes = manifesto(entidade)
+        if not particoes:
+            return arquivados
+        pasta = _pasta(entidade)
+        for nome, info in sorted(particoes.items()):
+            # As vendas sem data são as mais antigas de todas: sempre entram
+            if (nome != SEM_DATA and nome >= ate) or compressao.formato(info["arquivo"]):
+                continue
+            origem = os.path.join(pasta, info["arquivo"])
+            info["arquivo"] = nome + extensao
+            compressao.gravar_linhas(os.path.join(pasta, info["arquivo"]), ler_arquivo(origem))
+            arquivados.append((nome, origem))
+        if arquivados:
+            gravar_json_atomico(caminho_manifesto(entidade), {"particoes": particoes})
+            for _, origem in arquivados:
+                os.remove(origem)
+    return [nome for nome, _ in arquivados]
+
+# ===================== Linha de comando =====================
+
+def _tamanho(entidade, info):
+    return os.path.getsize(os.path.join(_pasta(entidade), info["arquivo"]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", default=repositorio.PASTA_DADOS, help="pasta de dados")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("manifesto", help="lista as partições (convertendo o vendas.json antigo, se preciso)")
+    comando_arquivar = comandos.add_parser("arquivar", help="comprime os meses fechados")
+    comando_arquivar.add_argument("--ate", default=date.today().strftime("%Y-%m"),
+                                  help="arquiva os meses anteriores a este AAAA-MM (padrão: o mês atual)")
+    comando_arquivar.add_argument("--compressao", choices=sorted(compressao.EXTENSOES),
+                                  help="padrão: zstd se instalado, senão gzip")
+    comando_resumo = comandos.add_parser("resumo", help="vendas e faturamento de um período")
+    comando_resumo.add_argument("--inicio", help="AAAA-MM-DD")
+    comando_resumo.add_argument("--fim", help="AAAA-MM-DD")
+    args = parser.parse_args()
+
+    # As partições são o formato do backend JSON
+    repositorio.configurar_backend("json")
+    repositorio.configurar_pasta(args.pasta)
+    entidade = "vendas"
+
+    if args.comando == "resumo":
+        # Soma em fluxo: nem a coleção nem as partições inteiras vão para a memória
+        vendas, faturamento = 0, 0.0
+        for venda in repositorio.percorrer_periodo(entidade, args.inicio, args.fim):
+            vendas += 1
+            faturamento += venda["valor_total"]
+        print(f"Vendas: {vendas} | Faturamento: R${faturamento:.2f}")
+        return
+
+    if manifesto(entidade) is None:
+        repositorio.salvar(entidade)
+        repositorio.descarregar()
+    if args.comando == "arquivar":
+        arquivados = arquivar(entidade, args.ate, args.compressao)
+        print(f"🗜️ {len(arquivados)} partição(ões) arquivada(s): {', '.join(arquivados) or '-'}")
+
+    for nome, info in sorted(manifesto(entidade).items()):
+        print(f"{nome:<9} {info['registros']:>8} vendas | IDs {info['id_min']}-{info['id_max']} | "
+              f"R${info['valor_total']:.2f} | {_tamanho(entidade, info) / 1024:.0f} KiB | {info['arquivo']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,15 @@
-import json
-import os
-import re
-
-ARQUIVO_PRODUTOS = os.path.join("dados", "produtos.json")
-ARQUIVO_FORNECEDORES = os.path.join("dados", "fornecedores.json")
+import movimentos
+import repositorio
+import servicos
+from erros import DadoInvalido, NaoEncontrado, RegistroEmUso
+from paginacao import paginar
+from sequencias import proximo_id
 
 # ===================== Funções utilitárias =====================
 
-def carregar_fornecedores():
-    """Carrega os fornecedores do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_FORNECEDORES):
-        return []
-    with open(ARQUIVO_FORNECEDORES, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def carregar_produtos():
-    """Carrega os produtos do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_PRODUTOS):
-        return []
-    with open(ARQUIVO_PRODUTOS, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def salvar_produtos(produtos):
-    """Salva a lista de produtos no arquivo JSON."""
-    with open(ARQUIVO_PRODUTOS, "w", encoding="utf-8") as f:
-        json.dump(produtos, f, indent=4, ensure_ascii=False)
-
-def salvar_fornecedores(fornecedores):
-    """Salva a lista de fornecedores no arquivo JSON."""
-    with open(ARQUIVO_FORNECEDORES, "w", encoding="utf-8") as f:
-        json.dump(fornecedores, f, indent=4, ensure_ascii=False)
-
-def verificar_id_existe(id, produtos):
-    """Verifica se o ID já existe em qualquer lista de produtos."""
-    for p in produtos:
-        if p["id_produto"] == id:
-            return True
-    return False
-
-def gerar_id(produtos):
-    """Gera um novo ID baseado no maior existente, garantindo que seja único."""
-    new_id = max(p["id_produto"] for p in produtos) + 1 if produtos else 1
-    while verificar_id_existe(new_id, produtos):  # Garantir que o ID seja único
-        new_id += 1
-    return new_id
-
-# ===================== Funções de validação =====================
-
-def validar_cnpj(cnpj):
-    """Valida o formato do CNPJ."""
-    cnpj = re.sub(r'\D', '', cnpj)  # Remove qualquer coisa que não seja número
-    if len(cnpj) != 14:
-        return False
-    return True
-
-# def validar_telefone(telefone):
-#     """Valida o formato do telefone (DDD + número)."""
-#     return bool(re.match(r'^\(?\d{2}\)?\s?\d{4,5}-?\d{4}$', telefone))
-
-def validar_email(email):
-    """Valida o formato do e-mail."""
-    return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
+def gerar_id():
+    """Gera um novo ID único a partir da sequência persistida (O(1))."""
+    return proximo_id("produtos")
 
 # ===================== Funções CRUD =====================
 
@@ -93,7 +36,7 @@ def cadastrar_produto(produtos, fornecedores):
     while True:
         try:
             id_fornecedor = int(input("Escolha o ID do Fornecedor: "))
-            fornecedor = next((f for f in fornecedores if f["id"] == id_fornecedor), None)
+            fornecedor = repositorio.buscar("fornecedores", id_fornecedor)
             
             # Verifica se o fornecedor com o ID escolhido existe
             if fornecedor:
@@ -118,34 +61,30 @@ def cadastrar_produto(produtos, fornecedores):
         print("⚠️ Erro: valores numéricos inválidos.")
         return
 
-    produto = {
-        "id_produto": gerar_id(produtos),
-        "nome": nome,
-        "preco": preco,
-        "estoque": estoque,
-        "fornecedor_id": id_fornecedor  # Associando o fornecedor
-    }
-
-    produtos.append(produto)
-    salvar_produtos(produtos)
+    try:
+        servicos.cadastrar_produto(nome, preco, estoque, id_fornecedor)
+    except (DadoInvalido, NaoEncontrado) as e:
+        print(f"⚠️ {e}\n")
+        return
     print(f"✅ Produto '{nome}' cadastrado com sucesso!\n")
 
+def formatar_produto(p):
+    """Formata um produto para a listagem (avisando se o fornecedor não existe mais)."""
+    fornecedor = repositorio.buscar("fornecedores", p["fornecedor_id"])
+    nome_fornecedor = fornecedor["nome"] if fornecedor else "⚠️ fornecedor excluído (rode integridade.py)"
+    return (
+        f"\nID: {p['id_produto']} | Nome: {p['nome']}\n"
+        f"Preço: R${p['preco']:.2f}\nEstoque: {p['estoque']}\n"
+        f"Fornecido por: {nome_fornecedor} (ID: {p['fornecedor_id']})\n"
+    )
+
 def listar_produtos(produtos, fornecedores):
-    """Lista todos os produtos cadastrados com informações do fornecedor."""
-    print("\n--- Lista de Produtos ---")
+    """Lista os produtos cadastrados, página por página, com informações do fornecedor."""
     if not produtos:
+        print("\n--- Lista de Produtos ---")
         print("Não há produtos cadastrados.")
         return
-    for p in produtos:
-        # Verifica se o fornecedor existe
-        fornecedor = next((f for f in fornecedores if f["id"] == p["fornecedor_id"]), None)
-        if fornecedor:
-            print(
-                f"\nID: {p['id_produto']} | Nome: {p['nome']}\n"
-                f"Preço: R${p['preco']:.2f}\nEstoque: {p['estoque']}\n"
-                f"Fornecido por: {fornecedor['nome']} (ID: {fornecedor['id']})\n"
-                
-            )
+    paginar(produtos, formatar_produto, "id_produto", "Lista de Produtos", entidade_busca="produtos")
 
 def atualizar_produto(produtos, fornecedores):
     """Atualiza um produto existente com validação de dados e verificação de ID único."""
@@ -156,23 +95,30 @@ def atualizar_produto(produtos, fornecedores):
         print("⚠️ ID inválido!")
         return
 
-    for p in produtos:
-        if p["id_produto"] == id_alvo:
-            print(f"\nEditando produto: {p['nome']}")
-            novo_nome = input(f"Novo nome ({p['nome']}): ").strip().upper() or p["nome"]
-            novo_preco = input(f"Novo preço ({p['preco']}): ").strip()
-            novo_estoque = input(f"Novo estoque ({p['estoque']}): ").strip()
-            novo_forn = input(f"Novo ID Fornecedor ({p['fornecedor_id']}): ").strip()
+    try:
+        p = servicos.buscar_produto(id_alvo)
+    except NaoEncontrado:
+        print("⚠️ Produto não encontrado.\n")
+        return
 
-            p["nome"] = novo_nome
-            p["preco"] = float(novo_preco) if novo_preco else p["preco"]
-            p["estoque"] = int(novo_estoque) if novo_estoque else p["estoque"]
-            p["fornecedor_id"] = int(novo_forn) if novo_forn else p["fornecedor_id"]
+    print(f"\nEditando produto: {p['nome']}")
+    novo_nome = input(f"Novo nome ({p['nome']}): ").strip().upper() or p["nome"]
+    novo_preco = input(f"Novo preço ({p['preco']}): ").strip()
+    novo_estoque = input(f"Novo estoque ({p['estoque']}): ").strip()
+    novo_forn = input(f"Novo ID Fornecedor ({p['fornecedor_id']}): ").strip()
 
-            salvar_produtos(produtos)
-            print("✅ Produto atualizado com sucesso!\n")
-            return
-    print("⚠️ Produto não encontrado.\n")
+    try:
+        servicos.atualizar_produto(
+            p["id_produto"],
+            nome=novo_nome,
+            preco=novo_preco or p["preco"],
+            estoque=novo_estoque or p["estoque"],
+            fornecedor_id=novo_forn or p["fornecedor_id"],
+        )
+    except (DadoInvalido, NaoEncontrado) as e:
+        print(f"⚠️ {e}\n")
+        return
+    print("✅ Produto atualizado com sucesso!\n")
 
 def excluir_produto(produtos, fornecedores):
     """Exclui um produto pelo ID."""
@@ -183,19 +129,68 @@ def excluir_produto(produtos, fornecedores):
         print("⚠️ ID inválido!")
         return
 
-    for p in produtos:
-        if p["id_produto"] == id_excluir:
-            produtos.remove(p)
-            salvar_produtos(produtos)
-            print(f"🗑️ Produto '{p['nome']}' excluído com sucesso!\n")
-            return
-    print("⚠️ Produto não encontrado.\n")
+    try:
+        p = servicos.buscar_produto(id_excluir)
+    except NaoEncontrado:
+        print("⚠️ Produto não encontrado.\n")
+        return
+
+    vinculados = servicos.dependentes("produtos", p["id_produto"])
+    if vinculados:
+        resumo = ", ".join(f"{len(ids)} {nome}" for nome, ids in vinculados.items())
+        print(f"⚠️ O produto tem registros vinculados ({resumo}) e não pode ser excluído: as vendas são histórico.\n")
+        return
+
+    try:
+        servicos.excluir_produto(p["id_produto"])
+    except (NaoEncontrado, RegistroEmUso) as e:
+        print(f"⚠️ {e}\n")
+        return
+    print(f"🗑️ Produto '{p['nome']}' excluído com sucesso!\n")
+
+def repor_estoque(produtos, fornecedores):
+    """Lança a entrada de mercadoria de um produto (uma reposição no livro de estoque)."""
+    listar_produtos(produtos, fornecedores)
+    try:
+        id_alvo = int(input("Digite o ID do produto reposto: "))
+    except ValueError:
+        print("⚠️ ID inválido!")
+        return
+
+    quantidade = input("Quantidade recebida: ").strip()
+    documento = input("Nota fiscal ou pedido (opcional): ").strip() or None
+    try:
+        p = servicos.repor_estoque(id_alvo, quantidade, documento)
+    except (DadoInvalido, NaoEncontrado) as e:
+        print(f"⚠️ {e}\n")
+        return
+    print(f"✅ Estoque de {p['nome']} agora é {p['estoque']}.\n")
+
+def historico_estoque():
+    """Mostra os movimentos de estoque de um produto num período."""
+    try:
+        id_alvo = int(input("Digite o ID do produto: "))
+    except ValueError:
+        print("⚠️ ID inválido!")
+        return
+    inicio = input("Data inicial (AAAA-MM-DD, vazio = desde o início): ").strip() or None
+    fim = input("Data final (AAAA-MM-DD, vazio = até hoje): ").strip() or None
+
+    saldo_inicial, historico = movimentos.extrato(id_alvo, inicio, fim)
+    print(f"\n--- Histórico de estoque do produto {id_alvo} ---")
+    print(f"Saldo anterior: {saldo_inicial}")
+    for m in historico:
+        referencia = f" ({m['referencia']})" if "referencia" in m else ""
+        print(f"{m['data_hora']} | {m['tipo']}{referencia} | {m['quantidade']:+d} | Saldo: {m['saldo']}")
+    if not historico:
+        print("Nenhum movimento no período.")
+    print()
 
 # ===================== MENU =====================
 
 def menu_produtos():
-    fornecedores = carregar_fornecedores()
-    produtos = carregar_produtos()
+    fornecedores = repositorio.carregar("fornecedores")
+    produtos = repositorio.carregar("produtos")
 
     while True:
         print("""
@@ -204,7 +199,9 @@ def menu_produtos():
 2 - Listar produtos
 3 - Atualizar produto
 4 - Excluir produto
-5 - Voltar
+5 - Repor estoque
+6 - Histórico de estoque
+7 - Voltar
 ===================================
 """)
         opcao = input("Escolha uma opção: ").strip()
@@ -218,8 +215,11 @@ def menu_produtos():
         elif opcao == "4":
             excluir_produto(produtos, fornecedores)
         elif opcao == "5":
+            repor_estoque(produtos, fornecedores)
+        elif opcao == "6":
+            historico_estoque()
+        elif opcao == "7":
             print("💾 Saindo do menu de produtos...")
-            salvar_produtos(produtos)
             break
         else:
             print("⚠️ Opção inválida. Tente novamente.\n")
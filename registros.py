@@ -0,0 +1,128 @@
+import sys
+from collections.abc import MutableMapping
+
+# ===================== Registros compactos =====================
+# Produtos e vendas são as coleções que mais crescem, e um dict por registro
+# custa centenas de bytes (a tabela de hash, mais as chaves repetidas em cada
+# um). Em memória eles viram objetos com __slots__: cada campo conhecido ocupa
+# um ponteiro, sem dict por instância; campos desconhecidos (ex.: de vendas
+# antigas) vão para um dict de extras criado só quando necessário.
+#
+# As classes se comportam como dict (MutableMapping): registro["nome"], get,
+# update, in, dict(registro)... então menus e backends não mudam, e o JSON
+# (serializacao.py) os grava como objetos comuns.
+
+class Registro(MutableMapping):
+    """Base dos registros compactos: campos fixos em __slots__ e o resto em _extras."""
+
+    __slots__ = ("_extras",)
+    CAMPOS = ()
+    _CAMPOS = frozenset()
+    INTERNADOS = ()   # campos texto internados (um só objeto por valor repetido)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._CAMPOS = frozenset(cls.CAMPOS)
+
+    def __init__(self, dados=()):
+        self._extras = None
+        for campo, valor in (dados.items() if hasattr(dados, "items") else dados):
+            self[campo] = valor
+
+    @classmethod
+    def de(cls, dados):
+        """Converte um dict (ex.: lido do disco) num registro compacto."""
+        return dados if type(dados) is cls else cls(dados)
+
+    def __getitem__(self, campo):
+        if campo in self._CAMPOS:
+            try:
+                return getattr(self, campo)
+            except AttributeError:
+                raise KeyError(campo) from None
+        if self._extras is not None and campo in self._extras:
+            return self._extras[campo]
+        raise KeyError(campo)
+
+    def get(self, campo, padrao=None):
+        if campo in self._CAMPOS:
+            return getattr(self, campo, padrao)
+        return self._extras.get(campo, padrao) if self._extras is not None else padrao
+
+    def __setitem__(self, campo, valor):
+        if campo in self._CAMPOS:
+            if campo in self.INTERNADOS and type(valor) is str:
+                valor = sys.intern(valor)
+            setattr(self, campo, valor)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[campo] = valor
+
+    def __delitem__(self, campo):
+        if campo in self._CAMPOS:
+            try:
+                delattr(self, campo)
+            except AttributeError:
+                raise KeyError(campo) from None
+        elif self._extras is not None and campo in self._extras:
+            del self._extras[campo]
+        else:
+            raise KeyError(campo)
+
+    def __contains__(self, campo):
+        if campo in self._CAMPOS:
+            return hasattr(self, campo)
+        return self._extras is not None and campo in self._extras
+
+    def __iter__(self):
+        for campo in self.CAMPOS:
+            if hasattr(self, campo):
+                yield campo
+        if self._extras is not None:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def clear(self):
+        for campo in self.CAMPOS:
+            if hasattr(self, campo):
+                delattr(self, campo)
+        self._extras = None
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class Produto(Registro):
+    CAMPOS = ("id_produto", "nome", "preco", "estoque", "fornecedor_id", "versao")
+    INTERNADOS = ("nome",)
+    __slots__ = CAMPOS
+
+class ItemVenda(Registro):
+    CAMPOS = ("id_produto", "quantidade", "valor_produto", "valor_total")
+    __slots__ = CAMPOS
+
+class Venda(Registro):
+    CAMPOS = ("id_venda", "id_cliente", "data_hora", "itens", "valor_total")
+    __slots__ = CAMPOS
+
+    def __setitem__(self, campo, valor):
+        # Os itens viram uma tupla de ItemVenda (sem a folga de uma lista)
+        if campo == "itens":
+            valor = tuple(ItemVenda.de(item) for item in valor)
+        super().__setitem__(campo, valor)
+
+# Entidade -> classe do registro compacto (as demais continuam em dict)
+TIPOS = {
+    "produtos": Produto,
+    "vendas": Venda,
+}
+
+def compactar(entidade, registro):
+    """Converte o registro para a forma compacta da entidade, se ela tiver uma."""
+    tipo = TIPOS.get(entidade)
+    return tipo.de(registro) if tipo is not None else registro
@@ -0,0 +1,250 @@
+import heapq
+from array import array
+from itertools import islice
+
+import agregados
+import reposicao
+import repositorio
+from vendas import itens_da_venda
+
+try:
+    import numpy as np
+except ImportError:  # sem NumPy, as mesmas contas rodam sobre os arrays do módulo array
+    np = None
+
+# ===================== Relatórios (colunas) =====================
+# As vendas são copiadas uma vez para colunas compactas (array("q") e
+# array("d")), uma posição por item vendido. Os relatórios agregam essas
+# colunas por ID: com NumPy, via np.bincount sobre as próprias colunas (sem
+# cópia, por np.frombuffer); sem NumPy, num único laço sobre os arrays.
+#
+# Enquanto as vendas só são anexadas, as colunas crescem junto com a coleção:
+# a cada relatório apenas as vendas novas são copiadas. Uma venda alterada ou
+# removida (aqui ou por outro terminal) descarta as colunas, que são refeitas
+# no próximo relatório. Os números do resumo e das vendas por dia nem isso:
+# vêm prontos dos agregados (agregados.py).
+
+TOP_N = 10
+
+_colunas = {
+    "origem": None,     # dict de vendas do repositório de onde as colunas vieram
+    "vendas": 0,        # quantas vendas já estão nas colunas
+    "produto": array("q"),
+    "cliente": array("q"),
+    "quantidade": array("q"),
+    "valor": array("d"),
+}
+
+def _zerar_colunas(origem):
+    """Descarta as colunas (a coleção de vendas foi trocada ou encolheu)."""
+    _colunas.update(
+        origem=origem, vendas=0,
+        produto=array("q"), cliente=array("q"), quantidade=array("q"),
+        valor=array("d"),
+    )
+
+def _ao_mudar_venda(acao, venda, anterior):
+    """Qualquer mudança que não seja uma venda nova invalida as colunas."""
+    if acao != "inserir":
+        _colunas["origem"] = None
+
+repositorio.observar("vendas", _ao_mudar_venda)
+
+def colunas():
+    """Retorna as colunas das vendas, copiando só as vendas novas desde a última chamada."""
+    with repositorio.trava_memoria:
+        repositorio.sincronizar("vendas")
+        vendas = repositorio.indice("vendas")
+        if _colunas["origem"] is not vendas or len(vendas) < _colunas["vendas"]:
+            _zerar_colunas(vendas)
+
+        produto, cliente = _colunas["produto"], _colunas["cliente"]
+        quantidade, valor = _colunas["quantidade"], _colunas["valor"]
+        inicio = _colunas["vendas"]
+        if inicio == 0:
+            novas = vendas.values()
+        else:
+            # Pula pelos IDs (baratos) e só monta as vendas novas
+            novas = (vendas[id_venda] for id_venda in islice(vendas, inicio, None))
+        for venda in novas:
+            for item in itens_da_venda(venda):
+                produto.append(item["id_produto"])
+                cliente.append(venda["id_cliente"])
+                quantidade.append(item["quantidade"])
+                valor.append(item["valor_total"])
+        _colunas["vendas"] = len(vendas)
+        return _colunas
+
+# ===================== Agregação =====================
+
+def _somar_por(grupos, pesos, mapa=None):
+    """Soma os pesos por grupo (group-by); mapa traduz o grupo antes (ex.: produto -> fornecedor).
+
+    Retorna uma sequência indexada pelo ID do grupo.
+    """
+    if np is not None:
+        ids = np.frombuffer(grupos, dtype=np.int64)
+        if mapa is not None:
+            ids = np.asarray(mapa, dtype=np.int64)[ids]
+        tipo = np.float64 if pesos.typecode == "d" else np.int64
+        return np.bincount(ids, weights=np.frombuffer(pesos, dtype=tipo))
+
+    if mapa is not None:
+        grupos = array("q", (mapa[g] for g in grupos))
+    totais = [0] * (max(grupos, default=-1) + 1)
+    for g, p in zip(grupos, pesos):
+        totais[g] += p
+    return totais
+
+def _maiores(totais, n):
+    """IDs dos n maiores totais (positivos), do maior para o menor."""
+    if np is not None and len(totais) > n:
+        candidatos = np.argpartition(totais, -n)[-n:]
+    else:
+        candidatos = range(len(totais))
+    return [i for i in heapq.nlargest(n, candidatos, key=lambda i: totais[i]) if totais[i] > 0]
+
+def _mapa_fornecedores():
+    """Array produto -> fornecedor (0 para produtos sem cadastro)."""
+    produtos = repositorio.indice("produtos")
+    mapa = array("q", [0]) * (max(produtos, default=0) + 1)
+    for id_produto, produto in produtos.items():
+        mapa[id_produto] = produto["fornecedor_id"]
+    return mapa
+
+def faturamento_por_produto():
+    """Faturamento e unidades vendidas por produto: (faturamento, quantidade), indexados pelo ID."""
+    c = colunas()
+    return _somar_por(c["produto"], c["valor"]), _somar_por(c["produto"], c["quantidade"])
+
+def faturamento_por_cliente():
+    """Faturamento por cliente, indexado pelo ID."""
+    c = colunas()
+    return _somar_por(c["cliente"], c["valor"])
+
+def faturamento_por_fornecedor():
+    """Faturamento por fornecedor (pelo fornecedor_id atual de cada produto), indexado pelo ID."""
+    c = colunas()
+    mapa = _mapa_fornecedores()
+    if c["produto"] and max(c["produto"]) >= len(mapa):
+        # Vendas de produtos já excluídos, com ID acima do maior atual
+        mapa.extend([0] * (max(c["produto"]) + 1 - len(mapa)))
+    return _somar_por(c["produto"], c["valor"], mapa)
+
+def resumo():
+    """Totais gerais: quantidade de vendas, faturamento e ticket médio."""
+    totais = agregados.agregados()
+    vendas, faturamento = totais["vendas"], totais["faturamento"]
+    return {
+        "vendas": vendas,
+        "faturamento": faturamento,
+        "ticket_medio": faturamento / vendas if vendas else 0.0,
+    }
+
+# ===================== Menu =====================
+
+def _nome(entidade, id):
+    registro = repositorio.buscar(entidade, id)
+    return registro["nome"] if registro else "(excluído)"
+
+def _mostrar_ranking(titulo, entidade, totais, n=TOP_N, quantidades=None):
+    print(f"\n--- {titulo} (top {n}) ---")
+    ids = _maiores(totais, n)
+    if not ids:
+        print("Não há vendas cadastradas.")
+    for posicao, id in enumerate(ids, 1):
+        linha = f"{posicao:>2}. ID: {id} | {_nome(entidade, id)} | Faturamento: R${float(totais[id]):.2f}"
+        if quantidades is not None:
+            linha += f" | Unidades: {int(quantidades[id])}"
+        print(linha)
+    print()
+
+def _mostrar_reposicao():
+    print("\n--- Reposição de estoque por fornecedor ---")
+    grupos = reposicao.sugestoes()
+    if not grupos:
+        print("Nenhum produto no ponto de pedido.\n")
+        return
+    for id_fornecedor in sorted(grupos):
+        print(f"\n{_nome('fornecedores', id_fornecedor)} (ID: {id_fornecedor})")
+        for s in grupos[id_fornecedor]:
+            print(
+                f"  {s['nome']} (ID: {s['id_produto']}) | Estoque: {s['estoque']} | "
+                f"Ponto de pedido: {s['ponto_de_pedido']} | {s['vendas_por_dia']:.2f}/dia | Pedir: {s['quantidade']}"
+            )
+    print()
+
+def vendas_do_periodo(inicio=None, fim=None):
+    """Totais das vendas entre duas datas (AAAA-MM-DD), lendo só esse período."""
+    vendas = repositorio.periodo("vendas", inicio, fim)
+    faturamento = sum(venda["valor_total"] for venda in vendas)
+    por_produto = {}
+    for venda in vendas:
+        for item in itens_da_venda(venda):
+            por_produto[item["id_produto"]] = por_produto.get(item["id_produto"], 0.0) + item["valor_total"]
+    return {
+        "vendas": len(vendas),
+        "faturamento": faturamento,
+        "ticket_medio": faturamento / len(vendas) if vendas else 0.0,
+        "por_produto": por_produto,
+    }
+
+def _mostrar_periodo():
+    inicio = input("Data inicial (AAAA-MM-DD, vazio = desde o início): ").strip() or None
+    fim = input("Data final (AAAA-MM-DD, vazio = até hoje): ").strip() or None
+    r = vendas_do_periodo(inicio, fim)
+    print(
+        f"\nVendas: {r['vendas']} | Faturamento: R${r['faturamento']:.2f} | "
+        f"Ticket médio: R${r['ticket_medio']:.2f}"
+    )
+    por_produto = r["por_produto"]
+    for posicao, id in enumerate(heapq.nlargest(TOP_N, por_produto, key=por_produto.get), 1):
+        print(f"{posicao:>2}. ID: {id} | {_nome('produtos', id)} | Faturamento: R${por_produto[id]:.2f}")
+    print()
+
+def menu_relatorios():
+    while True:
+        print("\n--- MENU RELATÓRIOS ---")
+        print("1 - Resumo geral")
+        print("2 - Produtos mais vendidos")
+        print("3 - Faturamento por cliente")
+        print("4 - Faturamento por fornecedor")
+        print("5 - Vendas por dia")
+        print("6 - Reposição de estoque por fornecedor")
+        print("7 - Vendas de um período")
+        print("0 - Voltar")
+        opcao = input("Escolha uma opção: ").strip()
+
+        if opcao == "1":
+            r = resumo()
+            print(
+                f"\nVendas: {r['vendas']} | Faturamento: R${r['faturamento']:.2f} | "
+                f"Ticket médio: R${r['ticket_medio']:.2f}\n"
+            )
+        elif opcao == "2":
+            faturamento, quantidades = faturamento_por_produto()
+            _mostrar_ranking("Produtos mais vendidos", "produtos", faturamento, quantidades=quantidades)
+        elif opcao == "3":
+            _mostrar_ranking("Faturamento por cliente", "clientes", faturamento_por_cliente())
+        elif opcao == "4":
+            _mostrar_ranking("Faturamento por fornecedor", "fornecedores", faturamento_por_fornecedor())
+        elif opcao == "5":
+            print("\n--- Vendas por dia ---")
+            por_dia = agregados.agregados()["por_dia"]
+            if not por_dia:
+                print("Não há vendas cadastradas.")
+            for dia in sorted(por_dia):
+                vendas, faturamento = por_dia[dia]
+                print(f"{dia} | Vendas: {vendas} | Faturamento: R${faturamento:.2f}")
+            print()
+        elif opcao == "6":
+            _mostrar_reposicao()
+        elif opcao == "7":
+            _mostrar_periodo()
+        elif opcao == "0":
+            break
+        else:
+            print("Opção inválida!")
+
+if __name__ == "__main__":
+    menu_relatorios()
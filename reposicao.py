@@ -0,0 +1,180 @@
+import heapq
+import math
+from collections import deque
+from datetime import datetime, timedelta
+
+import repositorio
+from vendas import itens_da_venda
+
+# ===================== Reposição de estoque =====================
+# Cada produto tem um ponto de pedido: o estoque que cobre PRAZO_DIAS de
+# vendas no ritmo dos últimos JANELA_DIAS (e nunca menos que ESTOQUE_MINIMO).
+# A folga (estoque - ponto de pedido) de todos os produtos fica num min-heap,
+# então os que chegaram ao ponto de pedido (folga <= 0) estão sempre no topo:
+# listá-los custa O(k log n) para k produtos em falta, sem varrer o catálogo.
+#
+# O heap é atualizado a cada aviso do repositório: uma venda soma as
+# quantidades na janela e a baixa de estoque muda a folga do produto, cada
+# mudança um push O(log n). Entradas velhas não são removidas na hora; são
+# descartadas quando chegam ao topo (a folga atual do produto está em
+# _estado["folga"]). Vendas que saem da janela reduzem o ritmo do produto e
+# são expiradas pela ordem de data_hora, antes de cada consulta.
+#
+# Vendas sem data_hora (anteriores a ela) não contam para o ritmo.
+
+JANELA_DIAS = 30      # período usado para medir o ritmo de vendas
+PRAZO_DIAS = 7        # tempo de entrega do fornecedor
+CICLO_DIAS = 30       # cobertura de cada pedido, além do ponto de pedido
+ESTOQUE_MINIMO = 10
+
+_estado = {
+    "origem": None,      # coleção de produtos sobre a qual o heap foi montado
+    "heap": [],          # (folga, id_produto), com entradas velhas
+    "folga": {},         # id_produto -> folga atual
+    "vendidos": {},      # id_produto -> unidades vendidas na janela
+    "janela": deque(),   # (data_hora, id_produto, quantidade), em ordem de data
+    "limite": "",        # data_hora mais antiga ainda na janela
+}
+
+def _limite(agora):
+    return (agora - timedelta(days=JANELA_DIAS)).isoformat(timespec="seconds")
+
+def velocidade(id_produto):
+    """Unidades vendidas por dia, na média da janela."""
+    return _estado["vendidos"].get(id_produto, 0) / JANELA_DIAS
+
+def ponto_de_pedido(id_produto):
+    """Estoque a partir do qual o produto deve ser pedido de novo."""
+    return max(ESTOQUE_MINIMO, math.ceil(velocidade(id_produto) * PRAZO_DIAS))
+
+def _atualizar(id_produto):
+    """Recalcula a folga do produto e a empurra no heap se mudou: O(log n)."""
+    produto = repositorio.buscar("produtos", id_produto)
+    folgas = _estado["folga"]
+    if produto is None:
+        folgas.pop(id_produto, None)  # a entrada no heap é descartada ao chegar ao topo
+        return
+    folga = produto["estoque"] - ponto_de_pedido(id_produto)
+    if folgas.get(id_produto) != folga:
+        folgas[id_produto] = folga
+        heapq.heappush(_estado["heap"], (folga, id_produto))
+        # Muitas entradas velhas: remonta com uma por produto, em O(n)
+        if len(_estado["heap"]) > 2 * len(folgas) + 1024:
+            _estado["heap"] = [(f, id) for id, f in folgas.items()]
+            heapq.heapify(_estado["heap"])
+
+def _somar_venda(venda):
+    data = venda.get("data_hora")
+    if not data or data < _estado["limite"]:
+        return
+    for item in itens_da_venda(venda):
+        id_produto = item["id_produto"]
+        _estado["vendidos"][id_produto] = _estado["vendidos"].get(id_produto, 0) + item["quantidade"]
+        # Vendas novas chegam em ordem de data; uma sincronizada um pouco fora
+        # de ordem só sai da janela quando as anteriores a ela saírem
+        _estado["janela"].append((data, id_produto, item["quantidade"]))
+        _atualizar(id_produto)
+
+def _expirar(agora):
+    """Tira da janela as vendas mais antigas que JANELA_DIAS."""
+    limite = _estado["limite"] = _limite(agora)
+    janela = _estado["janela"]
+    vendidos = _estado["vendidos"]
+    while janela and janela[0][0] < limite:
+        _, id_produto, quantidade = janela.popleft()
+        vendidos[id_produto] -= quantidade
+        if not vendidos[id_produto]:
+            del vendidos[id_produto]
+        _atualizar(id_produto)
+
+def _montar(agora):
+    """Monta janela e heap do zero: uma passada pelas vendas e heapify dos produtos."""
+    produtos = repositorio.indice("produtos")
+    limite = _limite(agora)
+    entradas = sorted(
+        (venda["data_hora"], item["id_produto"], item["quantidade"])
+        for venda in repositorio.carregar("vendas")
+        if venda.get("data_hora") and venda["data_hora"] >= limite
+        for item in itens_da_venda(venda)
+    )
+    vendidos = {}
+    for _, id_produto, quantidade in entradas:
+        vendidos[id_produto] = vendidos.get(id_produto, 0) + quantidade
+    _estado.update(origem=produtos, vendidos=vendidos, janela=deque(entradas), limite=limite)
+
+    folgas = _estado["folga"] = {id: p["estoque"] - ponto_de_pedido(id) for id, p in produtos.items()}
+    heap = _estado["heap"] = [(folga, id) for id, folga in folgas.items()]
+    heapq.heapify(heap)
+
+def _preparar(agora=None):
+    agora = agora or datetime.now()
+    repositorio.sincronizar("produtos")
+    repositorio.sincronizar("vendas")
+    if _estado["origem"] is not repositorio.indice("produtos"):
+        _montar(agora)
+    else:
+        _expirar(agora)
+
+# ===================== Avisos do repositório =====================
+
+def _montado():
+    return _estado["origem"] is not None and _estado["origem"] is repositorio.indice("produtos")
+
+def _ao_mudar_produto(acao, produto, anterior):
+    if _montado():
+        _atualizar(produto["id_produto"])
+
+def _ao_mudar_venda(acao, venda, anterior):
+    if not _montado():
+        return
+    if acao == "inserir":
+        _somar_venda(venda)
+    else:
+        # Venda alterada ou removida (raro): a janela é remontada na próxima consulta
+        _estado["origem"] = None
+
+repositorio.observar("produtos", _ao_mudar_produto)
+repositorio.observar("vendas", _ao_mudar_venda)
+
+# ===================== Consulta =====================
+
+def em_falta(agora=None):
+    """(folga, id_produto) dos produtos no ponto de pedido ou abaixo, do mais urgente ao menos."""
+    with repositorio.trava_memoria:
+        _preparar(agora)
+        heap = _estado["heap"]
+        folgas = _estado["folga"]
+        encontrados = []
+        vistos = set()
+        while heap and heap[0][0] <= 0:
+            folga, id_produto = heapq.heappop(heap)
+            if folgas.get(id_produto) == folga and id_produto not in vistos:
+                vistos.add(id_produto)
+                encontrados.append((folga, id_produto))
+        # Devolve ao heap só as entradas válidas (as velhas ficam descartadas)
+        for entrada in encontrados:
+            heapq.heappush(heap, entrada)
+        return encontrados
+
+def sugestoes(agora=None):
+    """Pedidos sugeridos agrupados por fornecedor: {fornecedor_id: [sugestões, do mais urgente]}.
+
+    A quantidade sugerida leva o estoque ao ponto de pedido mais CICLO_DIAS
+    de vendas (ou a 2 x ESTOQUE_MINIMO, para produtos sem vendas recentes).
+    """
+    grupos = {}
+    with repositorio.trava_memoria:
+        for folga, id_produto in em_falta(agora):
+            produto = repositorio.buscar("produtos", id_produto)
+            ritmo = velocidade(id_produto)
+            ponto = ponto_de_pedido(id_produto)
+            alvo = max(2 * ESTOQUE_MINIMO, ponto + math.ceil(ritmo * CICLO_DIAS))
+            grupos.setdefault(produto["fornecedor_id"], []).append({
+                "id_produto": id_produto,
+                "nome": produto["nome"],
+                "estoque": produto["estoque"],
+                "vendas_por_dia": round(ritmo, 2),
+                "ponto_de_pedido": ponto,
+                "quantidade": alvo - produto["estoque"],
+            })
+    return grupos
@@ -0,0 +1,291 @@
+import importlib
+import os
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from registros import compactar
+from trava import travar
+
+# ===================== Configuração =====================
+# Cada entidade é carregada do disco uma única vez e fica em memória num dict
+# indexado pelo ID (que preserva a ordem de inserção). Todos os menus recebem
+# a mesma coleção, então trocar de menu não relê nem reinterpreta os arquivos,
+# e buscar, inserir, atualizar ou remover um registro custa O(1) em memória.
+# Produtos e vendas ficam em registros compactos (registros.py), que se
+# comportam como dict mas ocupam bem menos memória.
+#
+# A persistência fica a cargo de um backend plugável: "json" (arquivos em
+# dados/, o padrão) ou "sqlite" (dados/otimiza.db). Escolha com a variável de
+# ambiente OTIMIZA_BACKEND ou com configurar_backend().
+#
+# Vários terminais podem usar a mesma pasta de dados: toda gravação acontece
+# sob uma trava entre processos (dados/dados.trava) e, antes de gravar, a
+# coleção em memória é sincronizada com o que os outros processos gravaram.
+#
+# Entidades "particionadas" (vendas) são gravadas em partições por mês do seu
+# campo de data (particoes.py, no backend JSON): periodo() lê do disco só as
+# partições de um intervalo de datas, sem carregar a coleção inteira.
+
+PASTA_DADOS = "dados"
+BACKEND = os.environ.get("OTIMIZA_BACKEND", "json")
+
+BACKENDS = {
+    "json": "armazenamento_json",
+    "sqlite": "armazenamento_sqlite",
+}
+
+ENTIDADES = {
+    "clientes": {"arquivo": "clientes.json", "chave": "id"},
+    "fornecedores": {"arquivo": "fornecedores.json", "chave": "id"},
+    "produtos": {"arquivo": "produtos.json", "chave": "id_produto", "versionada": True, "diario": "produtos.jsonl"},
+    "vendas": {
+        "arquivo": "vendas.json", "chave": "id_venda", "diario": "vendas.jsonl",
+        "particionada": "data_hora",  # partições por mês desse campo (particoes.py)
+    },
+}
+
+_colecoes = {}         # entidade -> {id: registro}
+_observadores = {}     # entidade -> funções chamadas com (acao, registro, anterior)
+
+# Protege as coleções em memória contra gravações feitas por outras threads
+# (ex.: a escrita adiada do backend JSON serializando enquanto o menu altera)
+trava_memoria = threading.RLock()
+
+ARQUIVO_TRAVA = "dados.trava"
+
+def backend():
+    """Retorna o módulo do backend de armazenamento em uso."""
+    return importlib.import_module(BACKENDS[BACKEND])
+
+def configurar_pasta(pasta):
+    """Troca a pasta de dados e descarta o que estava em memória."""
+    global PASTA_DADOS
+    limpar_cache()
+    PASTA_DADOS = pasta
+
+def configurar_backend(nome):
+    """Troca o backend de armazenamento ("json" ou "sqlite")."""
+    global BACKEND
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {nome}")
+    limpar_cache()
+    BACKEND = nome
+
+def limpar_cache():
+    """Esquece as coleções carregadas; o próximo acesso lê o disco de novo."""
+    _colecoes.clear()
+    backend().fechar()
+
+def caminho(nome_arquivo):
+    """Monta o caminho de um arquivo dentro da pasta de dados."""
+    return os.path.join(PASTA_DADOS, nome_arquivo)
+
+def chave(entidade):
+    """Retorna o nome do campo de ID da entidade."""
+    return ENTIDADES[entidade]["chave"]
+
+def trava_dados():
+    """Trava exclusiva entre processos sobre a pasta de dados."""
+    return travar(caminho(ARQUIVO_TRAVA))
+
+def observar(entidade, funcao):
+    """Registra funcao(acao, registro, anterior), chamada a cada registro que entra
+    ("inserir"), muda ("atualizar", com uma cópia de como ele era em `anterior`)
+    ou sai ("remover") da coleção em memória, seja por este processo ou por
+    outro (na sincronização). A carga inicial do disco não é notificada.
+    """
+    _observadores.setdefault(entidade, []).append(funcao)
+
+def _notificar(entidade, acao, registro, anterior=None):
+    for funcao in _observadores.get(entidade, ()):
+        funcao(acao, registro, anterior)
+
+def _aplicar_campos(entidade, registro, campos):
+    """Atualiza o registro em memória e avisa os observadores com a imagem anterior."""
+    anterior = dict(registro) if _observadores.get(entidade) else None
+    registro.update(campos)
+    if anterior is not None:
+        _notificar(entidade, "atualizar", registro, anterior)
+
+# ===================== Leitura e gravação =====================
+
+def indice(entidade):
+    """Retorna o {id: registro} da entidade (um dict ou mapeamento equivalente), lendo o disco só na primeira vez."""
+    if entidade not in _colecoes:
+        registros = backend().ler(entidade)
+        if isinstance(registros, Mapping):
+            # O backend já entrega a coleção pronta (ex.: snapshot binário, decodificado sob demanda)
+            _colecoes[entidade] = registros
+        else:
+            _colecoes[entidade] = {r[chave(entidade)]: compactar(entidade, r) for r in registros}
+    return _colecoes[entidade]
+
+def carregar(entidade):
+    """Retorna a coleção compartilhada da entidade (uma visão dos registros, em ordem)."""
+    return indice(entidade).values()
+
+def buscar(entidade, id):
+    """Retorna o registro com o ID informado, ou None, em O(1)."""
+    return indice(entidade).get(id)
+
+def _mesclar(entidade, colecao, k, registro):
+    """Atualiza o registro em memória mantendo o mesmo objeto (quem o segura vê a mudança)."""
+    registro = compactar(entidade, registro)
+    atual = colecao.get(registro[k])
+    if atual is None:
+        colecao[registro[k]] = registro
+        _notificar(entidade, "inserir", registro)
+    elif atual is not registro and atual != registro:
+        anterior = dict(atual)
+        atual.clear()
+        atual.update(registro)
+        _notificar(entidade, "atualizar", atual, anterior)
+
+def sincronizar(entidade):
+    """Traz para a memória o que outros processos gravaram desde a última leitura."""
+    with trava_memoria:
+        if entidade not in _colecoes:
+            indice(entidade)
+            return
+        resultado = backend().mudancas(entidade)
+        if resultado is None:
+            return
+
+        registros, completo, removidos = resultado
+        colecao = _colecoes[entidade]
+        k = chave(entidade)
+        for registro in registros:
+            _mesclar(entidade, colecao, k, registro)
+        if completo:
+            removidos = set(colecao) - {r[k] for r in registros}
+        for id in removidos:
+            registro = colecao.pop(id, None)
+            if registro is not None:
+                _notificar(entidade, "remover", registro)
+
+def no_periodo(entidade, registro, inicio, fim):
+    """A data do registro (campo de partição) está em [inicio, fim]? Limites None são abertos."""
+    data = registro.get(ENTIDADES[entidade]["particionada"])
+    if not data:
+        return inicio is None and fim is None
+    return (inicio is None or data >= inicio) and (fim is None or data <= fim)
+
+def _fim_do_dia(fim):
+    """Uma data sem hora, como limite final, vale até o fim do dia."""
+    return fim + "T23:59:59" if fim is not None and len(fim) == 10 else fim
+
+def periodo(entidade, inicio=None, fim=None):
+    """Registros de uma entidade particionada com data em [inicio, fim] (AAAA-MM-DD ou ISO completo).
+
+    Com a coleção já em memória, filtra a memória; senão o backend lê do disco
+    só o período pedido (as partições que o cruzam, no backend JSON).
+    """
+    fim = _fim_do_dia(fim)
+    with trava_memoria:
+        if entidade in _colecoes:
+            sincronizar(entidade)
+            colecao = _colecoes[entidade].values()
+            return [registro for registro in colecao if no_periodo(entidade, registro, inicio, fim)]
+    return backend().ler_periodo(entidade, inicio, fim)
+
+def percorrer_periodo(entidade, inicio=None, fim=None):
+    """Como periodo(), mas lendo sempre do disco e entregando um registro de cada vez
+    (ex.: um relatório sobre partições arquivadas, sem carregá-las na memória)."""
+    return backend().percorrer_periodo(entidade, inicio, _fim_do_dia(fim))
+
+def salvar(entidade):
+    """Grava a coleção inteira da entidade."""
+    with trava_memoria, trava_dados():
+        sincronizar(entidade)
+        backend().salvar(entidade, carregar(entidade))
+
+def descarregar():
+    """Grava imediatamente qualquer escrita que o backend tenha adiado."""
+    backend().descarregar()
+
+# ===================== Operações =====================
+
+@contextmanager
+def transacao(*entidades):
+    """Trava memória e disco e sincroniza as entidades: ler, validar e gravar ficam atômicos."""
+    with trava_memoria, trava_dados():
+        for entidade in entidades:
+            sincronizar(entidade)
+        yield
+
+def inserir(entidade, registro):
+    """Adiciona um registro à coleção e persiste a mudança."""
+    registro = compactar(entidade, registro)
+    with transacao(entidade):
+        indice(entidade)[registro[chave(entidade)]] = registro
+        backend().inserir(entidade, registro, carregar(entidade))
+        _notificar(entidade, "inserir", registro)
+
+def inserir_lote(entidade, registros):
+    """Adiciona vários registros de uma vez, com uma única gravação no backend."""
+    registros = [compactar(entidade, registro) for registro in registros]
+    with transacao(entidade):
+        colecao = indice(entidade)
+        k = chave(entidade)
+        for registro in registros:
+            colecao[registro[k]] = registro
+        backend().inserir_lote(entidade, registros, carregar(entidade))
+        for registro in registros:
+            _notificar(entidade, "inserir", registro)
+
+def _novos_campos(entidade, registro, campos):
+    """Prepara os campos de uma atualização (o ID não muda; a versão sobe)."""
+    campos = dict(campos)
+    campos.pop(chave(entidade), None)  # o ID é a chave do índice e não muda
+    if ENTIDADES[entidade].get("versionada"):
+        campos["versao"] = registro.get("versao", 0) + 1
+    return campos
+
+def atualizar(entidade, registro, campos):
+    """Aplica os campos alterados a um registro e persiste a mudança."""
+    with transacao(entidade):
+        # Depois de sincronizar, o registro em memória é o mais recente do disco
+        registro = buscar(entidade, registro[chave(entidade)]) or registro
+        _aplicar_campos(entidade, registro, _novos_campos(entidade, registro, campos))
+        backend().atualizar(entidade, registro, carregar(entidade))
+
+def remover(entidade, registro):
+    """Remove um registro da coleção e persiste a mudança."""
+    id = registro[chave(entidade)]
+    with transacao(entidade):
+        registro = indice(entidade).pop(id, None)
+        backend().remover(entidade, id, carregar(entidade))
+        if registro is not None:
+            _notificar(entidade, "remover", registro)
+
+def efetivar(operacoes):
+    """Aplica várias operações de uma vez, gravadas de forma atômica pelo backend.
+
+    Cada operação é ("inserir" | "atualizar" | "remover", entidade, registro),
+    e para "atualizar" o registro traz só os campos alterados mais o ID. Use
+    dentro de transacao() quando a operação depende de uma leitura anterior.
+    """
+    with transacao():
+        imagens = []
+        notificacoes = []
+        for acao, entidade, registro in operacoes:
+            k = chave(entidade)
+            if acao == "inserir":
+                registro = compactar(entidade, registro)
+                indice(entidade)[registro[k]] = registro
+                notificacoes.append((entidade, acao, registro, None))
+            elif acao == "atualizar":
+                atual = buscar(entidade, registro[k])
+                anterior = dict(atual) if _observadores.get(entidade) else None
+                atual.update(_novos_campos(entidade, atual, registro))
+                registro = atual
+                notificacoes.append((entidade, acao, registro, anterior))
+            else:
+                registro = indice(entidade).pop(registro[k], None) or registro
+                notificacoes.append((entidade, acao, registro, None))
+            imagens.append([acao, entidade, dict(registro)])
+        backend().efetivar(imagens)
+        # Só depois de gravado: quem observa nunca vê uma operação desfeita
+        for entidade, acao, registro, anterior in notificacoes:
+            _notificar(entidade, acao, registro, anterior)
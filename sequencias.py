@@ -0,0 +1,48 @@
+import repositorio
+from arquivos import gravar_atomico
+from trava import travar
+
+# ===================== Sequências de ID =====================
+# Cada entidade tem um contador persistido ao lado dos dados (dados/<entidade>.seq)
+# com o último ID entregue. Gerar um ID custa O(1): lê o contador, soma e grava,
+# tudo sob uma trava de arquivo para que vários processos não repitam IDs. O
+# contador só é reconstruído a partir dos dados se estiver ausente ou corrompido.
+
+def _arquivo_sequencia(entidade):
+    """Caminho do arquivo de sequência da entidade."""
+    return repositorio.caminho(f"{entidade}.seq")
+
+def _ler_sequencia(entidade):
+    """Lê o último ID entregue, ou None se o arquivo não existir ou estiver corrompido."""
+    try:
+        with open(_arquivo_sequencia(entidade), "r", encoding="utf-8") as f:
+            valor = int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+    return valor if valor >= 0 else None
+
+def _gravar_sequencia(entidade, valor):
+    """Grava o contador de forma atômica (arquivo temporário + rename)."""
+    gravar_atomico(_arquivo_sequencia(entidade), str(valor))
+
+def reconstruir_sequencia(entidade):
+    """Recalcula o contador a partir do maior ID existente nos dados."""
+    return max(repositorio.indice(entidade), default=0)
+
+def reservar_ids(entidade, quantidade=1):
+    """Reserva um bloco de IDs consecutivos e retorna o range reservado."""
+    with travar(_arquivo_sequencia(entidade) + ".trava"):
+        ultimo = _ler_sequencia(entidade)
+        # Um contador atrás dos dados (ex.: arquivo editado à mão) também é
+        # tratado como corrompido; a checagem é um acesso O(1) ao índice por ID
+        if ultimo is None or any(
+            repositorio.buscar(entidade, id) is not None
+            for id in range(ultimo + 1, ultimo + quantidade + 1)
+        ):
+            ultimo = reconstruir_sequencia(entidade)
+        _gravar_sequencia(entidade, ultimo + quantidade)
+    return range(ultimo + 1, ultimo + quantidade + 1)
+
+def proximo_id(entidade):
+    """Retorna um novo ID único para a entidade."""
+    return reservar_ids(entidade)[0]
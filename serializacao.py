@@ -0,0 +1,92 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# ===================== Serialização JSON =====================
+# Toda leitura e gravação de JSON dos dados passa por aqui, com dois ajustes:
+#
+# - Formato (OTIMIZA_JSON): "compacto" (padrão, sem indentação nem espaços)
+#   ou "legivel" (indentado, como os arquivos eram gravados antes). Os dois
+#   são lidos do mesmo jeito, então dá para trocar a qualquer momento.
+# - Codec (OTIMIZA_CODEC): "orjson" ou "msgspec", bem mais rápidos que o
+#   módulo json, quando instalados; "stdlib" força o módulo json. O padrão,
+#   "auto", usa o primeiro disponível nessa ordem.
+#
+# O resultado é sempre UTF-8 (sem escapes \uXXXX), e registros compactos
+# (registros.py) viram objetos JSON.
+
+FORMATO = os.environ.get("OTIMIZA_JSON", "compacto")
+CODEC = os.environ.get("OTIMIZA_CODEC", "auto")
+
+CODECS = ("stdlib", "orjson", "msgspec")
+
+def _escolher_codec(nome):
+    if nome == "auto":
+        if orjson is not None:
+            return "orjson"
+        return "msgspec" if msgspec is not None else "stdlib"
+    if nome not in CODECS:
+        raise ValueError(f"Codec JSON desconhecido: {nome}")
+    if (nome == "orjson" and orjson is None) or (nome == "msgspec" and msgspec is None):
+        raise ValueError(f"O codec {nome} não está instalado")
+    return nome
+
+_codec = _escolher_codec(CODEC)
+_codificador = msgspec.json.Encoder(enc_hook=dict) if msgspec is not None else None
+
+def configurar(formato=None, codec=None):
+    """Troca o formato ("compacto" ou "legivel") e/ou o codec ("auto", "stdlib", "orjson", "msgspec")."""
+    global FORMATO, _codec
+    if formato is not None:
+        if formato not in ("compacto", "legivel"):
+            raise ValueError(f"Formato JSON desconhecido: {formato}")
+        FORMATO = formato
+    if codec is not None:
+        _codec = _escolher_codec(codec)
+
+def codec():
+    """Nome do codec em uso."""
+    return _codec
+
+def codificar(dados, legivel=None):
+    """Serializa os dados em bytes UTF-8 (indentados se legivel, ou conforme FORMATO)."""
+    if legivel is None:
+        legivel = FORMATO == "legivel"
+    if _codec == "orjson":
+        opcoes = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if legivel else 0)
+        return orjson.dumps(dados, default=dict, option=opcoes)
+    if _codec == "msgspec":
+        texto = _codificador.encode(dados)
+        return msgspec.json.format(texto, indent=4) if legivel else texto
+    if legivel:
+        return json.dumps(dados, indent=4, ensure_ascii=False, default=dict).encode("utf-8")
+    return json.dumps(dados, separators=(",", ":"), ensure_ascii=False, default=dict).encode("utf-8")
+
+def codificar_linha(registro):
+    """Serializa um registro numa linha JSON Lines (compacta, com o \\n)."""
+    return codificar(registro, legivel=False) + b"\n"
+
+def decodificar(dados):
+    """Lê JSON de bytes ou texto; erros de sintaxe levantam json.JSONDecodeError em qualquer codec."""
+    if _codec == "orjson":
+        return orjson.loads(dados)  # orjson.JSONDecodeError já é um json.JSONDecodeError
+    if _codec == "msgspec":
+        try:
+            return msgspec.json.decode(dados)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), "", 0) from e
+    return json.loads(dados)
+
+def ler_arquivo(caminho):
+    """Lê e decodifica um arquivo JSON inteiro."""
+    with open(caminho, "rb") as f:
+        return decodificar(f.read())
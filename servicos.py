@@ -0,0 +1,301 @@
+import re
+from collections.abc import Mapping
+from datetime import datetime
+
+import busca
+import integridade
+import movimentos
+import repositorio
+from erros import ConflitoDeVersao, DadoInvalido, ErroDeVenda, EstoqueInsuficiente, NaoEncontrado
+from sequencias import proximo_id
+
+# ===================== Serviços =====================
+# As regras de negócio de cadastro, consulta e venda, sem input() nem print():
+# recebem valores, devolvem registros e levantam erros tipados (erros.py).
+# Os menus são clientes finos destas funções, e scripts, a importação ou outro
+# processo podem chamá-las direto, sem passar pelo terminal. Toda mudança de
+# estoque passa também pelo livro de movimentos (movimentos.py).
+#
+# Os registros devolvidos são os da coleção em memória (sem cópia): leia à
+# vontade, mas altere só por atualizar_*().
+
+# ===================== Validação =====================
+
+def validar_cpf(cpf):
+    """Valida o formato do CPF."""
+    cpf = re.sub(r'\D', '', cpf)  # Remove qualquer coisa que não seja número
+    if len(cpf) != 11:
+        return False
+    return True
+
+def validar_cnpj(cnpj):
+    """Valida o formato do CNPJ."""
+    cnpj = re.sub(r'\D', '', cnpj)  # Remove qualquer coisa que não seja número
+    if len(cnpj) != 14:
+        return False
+    return True
+
+def validar_telefone(telefone):
+    """Valida o formato do telefone (DDD + número)."""
+    return bool(re.match(r'^\(?\d{2}\)?\s?\d{4,5}-?\d{4}$', telefone))
+
+def validar_email(email):
+    """Valida o formato do e-mail."""
+    return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
+
+def _texto(valor):
+    """Valor como texto sem espaços nas pontas ('' se ausente)."""
+    return "" if valor is None else str(valor).strip()
+
+def _maiusculo(valor):
+    return _texto(valor).upper()
+
+def _minusculo(valor):
+    return _texto(valor).lower()
+
+def _fornecedor_existe(id):
+    return repositorio.buscar("fornecedores", id) is not None
+
+CAMPOS_ENDERECO = ("pais", "estado", "cidade", "bairro", "rua_num")
+
+# entidade -> {campo: (converter, validar ou None, mensagem de erro)}
+REGRAS = {
+    "clientes": {
+        "nome": (_maiusculo, bool, "nome vazio"),
+        "cpf": (_texto, validar_cpf, "CPF inválido"),
+        "telefone": (_texto, validar_telefone, "telefone inválido"),
+        "email": (_minusculo, validar_email, "e-mail inválido"),
+    },
+    "fornecedores": {
+        "nome": (_maiusculo, bool, "nome vazio"),
+        "cnpj": (_texto, validar_cnpj, "CNPJ inválido"),
+        "telefone": (_texto, validar_telefone, "telefone inválido"),
+        "email": (_minusculo, validar_email, "e-mail inválido"),
+        **{campo: (_maiusculo, None, None) for campo in CAMPOS_ENDERECO},
+    },
+    "produtos": {
+        "nome": (_maiusculo, bool, "nome vazio"),
+        "preco": (float, lambda preco: preco >= 0, "preço negativo"),
+        "estoque": (int, lambda estoque: estoque >= 0, "estoque negativo"),
+        "fornecedor_id": (int, _fornecedor_existe, "fornecedor {valor} não existe"),
+    },
+}
+
+def preparar(entidade, dados, parcial=False):
+    """Converte e valida os campos de um cadastro (ou, com parcial, só os enviados).
+
+    Campos desconhecidos são ignorados; o primeiro campo inválido levanta
+    DadoInvalido com o motivo.
+    """
+    campos = {}
+    for campo, (converter, validar, mensagem) in REGRAS[entidade].items():
+        if campo not in dados and parcial:
+            continue
+        valor = dados.get(campo)
+        try:
+            valor = converter(valor)
+        except (TypeError, ValueError):
+            raise DadoInvalido(campo, f"{campo} não numérico") from None
+        if validar is not None and not validar(valor):
+            raise DadoInvalido(campo, mensagem.format(valor=valor))
+        campos[campo] = valor
+    return campos
+
+# ===================== Consultas =====================
+
+def buscar(entidade, id):
+    """Registro com o ID informado; levanta NaoEncontrado se não existir."""
+    registro = repositorio.buscar(entidade, id)
+    if registro is None:
+        raise NaoEncontrado(entidade, id)
+    return registro
+
+def listar(entidade):
+    """Todos os registros da entidade, em ordem de cadastro (uma visão, sem cópia)."""
+    return repositorio.carregar(entidade)
+
+def pesquisar(entidade, consulta, limite=busca.LIMITE_RESULTADOS):
+    """Registros cujo nome começa pelos termos da consulta, ou com o CPF/CNPJ/e-mail dado."""
+    return busca.buscar(entidade, consulta, limite)
+
+def dependentes(entidade, id):
+    """{entidade: {IDs}} de tudo que depende do registro, direta ou indiretamente
+    (ex.: os produtos de um fornecedor e as vendas desses produtos)."""
+    vinculados = {}
+    for nome, id_dependente in integridade.alcancados(entidade, id)[1:]:
+        vinculados.setdefault(nome, set()).add(id_dependente)
+    return vinculados
+
+def buscar_cliente(id):
+    return buscar("clientes", id)
+
+def buscar_fornecedor(id):
+    return buscar("fornecedores", id)
+
+def buscar_produto(id):
+    return buscar("produtos", id)
+
+def buscar_venda(id):
+    return buscar("vendas", id)
+
+# ===================== Cadastro, atualização e exclusão =====================
+
+def cadastrar(entidade, dados):
+    """Valida e grava um novo registro; retorna o registro gravado, já com o ID."""
+    registro = preparar(entidade, dados)
+    chave = repositorio.chave(entidade)
+    # Unicidade conferida sob a trava: outro terminal pode ter cadastrado o mesmo valor
+    with repositorio.transacao(entidade):
+        busca.garantir_unicos(entidade, registro)
+        registro[chave] = proximo_id(entidade)
+        repositorio.inserir(entidade, registro)
+        if entidade == "produtos":
+            movimentos.registrar("cadastro", {registro[chave]: registro["estoque"]})
+    return repositorio.buscar(entidade, registro[chave])
+
+def atualizar(entidade, id, dados):
+    """Valida e aplica os campos enviados ao registro; retorna o registro atualizado."""
+    campos = preparar(entidade, dados, parcial=True)
+    with repositorio.transacao(entidade):
+        registro = buscar(entidade, id)
+        busca.garantir_unicos(entidade, campos, ignorar_id=id)
+        estoque_anterior = registro.get("estoque")
+        repositorio.atualizar(entidade, registro, campos)
+        if entidade == "produtos" and "estoque" in campos:
+            movimentos.registrar("ajuste", {id: registro["estoque"] - estoque_anterior})
+    return registro
+
+def excluir(entidade, id, cascata=False):
+    """Remove o registro; retorna o registro removido.
+
+    Se outros registros apontam para ele (produtos do fornecedor, vendas do
+    cliente ou do produto), levanta RegistroEmUso; com cascata, remove também
+    os dependentes, tudo numa única gravação. Vendas nunca saem em cascata
+    (integridade.POLITICAS): um registro com vendas não pode ser excluído.
+    """
+    with repositorio.transacao(entidade):
+        registro = buscar(entidade, id)
+        plano = integridade.plano_de_exclusao(entidade, id, cascata)
+        # O estoque que sai com os produtos excluídos fica registrado no livro
+        baixas = {id_produto: -repositorio.buscar(nome, id_produto)["estoque"]
+                  for nome, id_produto in plano if nome == "produtos"}
+        if len(plano) == 1:
+            repositorio.remover(entidade, registro)
+        else:
+            repositorio.efetivar([
+                ("remover", nome, repositorio.buscar(nome, id_dependente)) for nome, id_dependente in plano
+            ])
+        movimentos.registrar("exclusao", baixas)
+    return registro
+
+def cadastrar_cliente(nome, cpf, telefone, email):
+    return cadastrar("clientes", {"nome": nome, "cpf": cpf, "telefone": telefone, "email": email})
+
+def atualizar_cliente(id, **campos):
+    return atualizar("clientes", id, campos)
+
+def excluir_cliente(id, cascata=False):
+    return excluir("clientes", id, cascata)
+
+def cadastrar_fornecedor(nome, cnpj, telefone, email, **endereco):
+    """Cadastra um fornecedor; o endereço vai em pais, estado, cidade, bairro e rua_num."""
+    return cadastrar("fornecedores", {"nome": nome, "cnpj": cnpj, "telefone": telefone, "email": email, **endereco})
+
+def atualizar_fornecedor(id, **campos):
+    return atualizar("fornecedores", id, campos)
+
+def excluir_fornecedor(id, cascata=False):
+    return excluir("fornecedores", id, cascata)
+
+def cadastrar_produto(nome, preco, estoque, fornecedor_id):
+    return cadastrar("produtos", {"nome": nome, "preco": preco, "estoque": estoque, "fornecedor_id": fornecedor_id})
+
+def atualizar_produto(id, **campos):
+    return atualizar("produtos", id, campos)
+
+def excluir_produto(id, cascata=False):
+    return excluir("produtos", id, cascata)
+
+def repor_estoque(id, quantidade, referencia=None):
+    """Soma uma entrada (ex.: chegada de um pedido ao fornecedor) ao estoque; retorna o produto."""
+    try:
+        quantidade = int(quantidade)
+    except (TypeError, ValueError):
+        raise DadoInvalido("quantidade", "quantidade não numérica") from None
+    if quantidade <= 0:
+        raise DadoInvalido("quantidade", "a quantidade reposta deve ser positiva")
+    with repositorio.transacao("produtos"):
+        produto = buscar("produtos", id)
+        repositorio.atualizar("produtos", produto, {"estoque": produto["estoque"] + quantidade})
+        movimentos.registrar("reposicao", {id: quantidade}, referencia)
+    return produto
+
+# ===================== Vendas =====================
+
+def _quantidades(itens):
+    """Soma as quantidades por produto; cada item é (id_produto, quantidade) ou um dict com essas chaves."""
+    quantidades = {}
+    for item in itens:
+        if isinstance(item, Mapping):
+            item = (item.get("id_produto"), item.get("quantidade"))
+        try:
+            id_produto, quantidade = int(item[0]), int(item[1])
+        except (TypeError, ValueError, IndexError):
+            raise DadoInvalido("itens", f"item inválido: {item}") from None
+        quantidades[id_produto] = quantidades.get(id_produto, 0) + quantidade
+    return quantidades
+
+def registrar_venda(id_cliente, itens, versoes=None):
+    """Registra uma venda com vários itens e baixa o estoque de todos numa única gravação.
+
+    `itens` é uma lista de (id_produto, quantidade); produtos repetidos são
+    somados. Todo o carrinho é validado contra o estoque numa passada, e com
+    `versoes` ({id_produto: versão lida}) a venda só é gravada se nenhum produto
+    mudou desde a leitura (senão levanta ConflitoDeVersao).
+    """
+    buscar("clientes", id_cliente)
+    quantidades = _quantidades(itens)
+    if not quantidades:
+        raise ErroDeVenda("O carrinho está vazio.")
+
+    with repositorio.transacao("produtos", "vendas"):
+        operacoes = []
+        itens_venda = []
+        for id_produto, quantidade in quantidades.items():
+            produto = buscar("produtos", id_produto)
+            if versoes and produto.get("versao", 0) != versoes.get(id_produto, produto.get("versao", 0)):
+                raise ConflitoDeVersao(produto)
+            if not 0 < quantidade <= produto["estoque"]:
+                raise EstoqueInsuficiente(produto, quantidade)
+
+            itens_venda.append({
+                "id_produto": id_produto,
+                "quantidade": quantidade,
+                "valor_produto": produto["preco"],
+                "valor_total": produto["preco"] * quantidade,
+            })
+            operacoes.append(
+                ("atualizar", "produtos", {"id_produto": id_produto, "estoque": produto["estoque"] - quantidade})
+            )
+
+        venda = {
+            "id_venda": proximo_id("vendas"),
+            "id_cliente": id_cliente,
+            "data_hora": datetime.now().isoformat(timespec="seconds"),
+            "itens": itens_venda,
+            "valor_total": sum(item["valor_total"] for item in itens_venda),
+        }
+        # Baixa de estoque e venda vão juntas: ou tudo fica gravado, ou nada
+        operacoes.append(("inserir", "vendas", venda))
+        repositorio.efetivar(operacoes)
+        # Só uma venda gravada chega ao livro
+        movimentos.registrar(
+            "venda", {id_produto: -quantidade for id_produto, quantidade in quantidades.items()},
+            venda["id_venda"], venda["data_hora"],
+        )
+    return repositorio.buscar("vendas", venda["id_venda"])
+
+def vender_produto(id_cliente, id_produto, quantidade, versao_esperada=None):
+    """Registra a venda de um único produto (um carrinho de um item)."""
+    versoes = {id_produto: versao_esperada} if versao_esperada is not None else None
+    return registrar_venda(id_cliente, [(id_produto, quantidade)], versoes)
@@ -0,0 +1,238 @@
+"""Servidor HTTP/JSON local: um processo dono dos dados, vários terminais de caixa.
+
+Os terminais falam com o servidor em vez de cada um carregar (e regravar) a
+pasta de dados: a coleção fica em memória num só lugar, as conexões HTTP/1.1
+são mantidas abertas (keep-alive) e cada conexão é atendida por uma thread.
+As rotas são clientes finos de servicos.py:
+
+    GET    /<entidade>?inicio=0&limite=100   lista (em ordem de ID de cadastro)
+    GET    /<entidade>?q=texto               busca por nome, CPF, CNPJ ou e-mail
+    GET    /vendas?de=2024-03-01&ate=2024-03-31   vendas do período (só as partições dele)
+    GET    /<entidade>/<id>                  um registro
+    POST   /<entidade>                       cadastra (corpo: os campos)
+    PATCH  /<entidade>/<id>                  atualiza os campos enviados
+    DELETE /<entidade>/<id>?cascata=1        exclui (com cascata, também os produtos do fornecedor; vendas nunca)
+    POST   /vendas                           {"id_cliente": 1, "itens": [{"id_produto": 2, "quantidade": 3}]}
+    GET    /reposicao                        pedidos sugeridos por fornecedor
+
+<entidade> é clientes, fornecedores ou produtos (vendas só tem GET e POST).
+Erros voltam como {"erro": mensagem, "tipo": classe} com o status HTTP.
+
+Uso (a partir da raiz do projeto):
+    python servidor.py --porta 8000
+    python servidor.py --pasta copia_dados --backend sqlite --host 0.0.0.0
+"""
+import argparse
+import json
+import signal
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+import busca
+import reposicao
+import repositorio
+import serializacao
+import servicos
+from erros import (
+    ConflitoDeVersao, DadoInvalido, ErroDeVenda, EstoqueInsuficiente, NaoEncontrado, RegistroEmUso, ValorDuplicado,
+)
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+CADASTROS = ("clientes", "fornecedores", "produtos")
+
+# Erro -> status HTTP (o primeiro que casar; subclasses antes das bases)
+STATUS_DOS_ERROS = (
+    (NaoEncontrado, HTTPStatus.NOT_FOUND),
+    (ValorDuplicado, HTTPStatus.CONFLICT),
+    (RegistroEmUso, HTTPStatus.CONFLICT),
+    (ConflitoDeVersao, HTTPStatus.CONFLICT),
+    (EstoqueInsuficiente, HTTPStatus.CONFLICT),
+    (DadoInvalido, HTTPStatus.BAD_REQUEST),
+    (ErroDeVenda, HTTPStatus.BAD_REQUEST),
+)
+
+class RequisicaoInvalida(Exception):
+    """Rota, método ou corpo que o servidor não entende."""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+# ===================== Rotas =====================
+
+def _numero(texto, nome):
+    try:
+        return int(texto)
+    except (TypeError, ValueError):
+        raise RequisicaoInvalida(HTTPStatus.BAD_REQUEST, f"{nome} deve ser um número inteiro") from None
+
+def listar(entidade, parametros):
+    """Uma página da coleção, ou o resultado de uma busca (?q=)."""
+    limite = min(_numero(parametros.get("limite", LIMITE_PADRAO), "limite"), LIMITE_MAXIMO)
+    inicio = _numero(parametros.get("inicio", 0), "inicio")
+    # Sob a trava: outra thread pode estar gravando enquanto a página é montada
+    with repositorio.trava_memoria:
+        if entidade == "vendas" and ("de" in parametros or "ate" in parametros):
+            vendas = repositorio.periodo(entidade, parametros.get("de"), parametros.get("ate"))
+            return vendas[inicio:inicio + limite]
+        if "q" in parametros:
+            return servicos.pesquisar(entidade, parametros["q"], limite)
+        return list(islice(servicos.listar(entidade), inicio, inicio + limite))
+
+def registrar_venda(corpo):
+    versoes = corpo.get("versoes")
+    if versoes:
+        # Chaves de objetos JSON são sempre texto
+        versoes = {_numero(id_produto, "ID do produto"): versao for id_produto, versao in versoes.items()}
+    id_cliente = _numero(corpo.get("id_cliente"), "ID do cliente")
+    return servicos.registrar_venda(id_cliente, corpo.get("itens") or [], versoes)
+
+def despachar(metodo, entidade, id, parametros, corpo):
+    """Executa a rota e retorna (status, resposta)."""
+    if entidade == "reposicao" and metodo == "GET" and id is None:
+        return HTTPStatus.OK, reposicao.sugestoes()
+    if entidade not in CADASTROS and entidade != "vendas":
+        raise RequisicaoInvalida(HTTPStatus.NOT_FOUND, f"Rota desconhecida: /{entidade}")
+
+    if metodo == "GET":
+        if id is None:
+            return HTTPStatus.OK, listar(entidade, parametros)
+        return HTTPStatus.OK, servicos.buscar(entidade, id)
+    if metodo == "POST" and id is None:
+        if entidade == "vendas":
+            return HTTPStatus.CREATED, registrar_venda(corpo)
+        return HTTPStatus.CREATED, servicos.cadastrar(entidade, corpo)
+    if entidade in CADASTROS and id is not None:
+        if metodo in ("PATCH", "PUT"):
+            return HTTPStatus.OK, servicos.atualizar(entidade, id, corpo)
+        if metodo == "DELETE":
+            cascata = parametros.get("cascata", "").lower() in ("1", "true", "sim")
+            return HTTPStatus.OK, servicos.excluir(entidade, id, cascata)
+    raise RequisicaoInvalida(HTTPStatus.METHOD_NOT_ALLOWED, f"{metodo} não é permitido nesta rota")
+
+# ===================== HTTP =====================
+
+class Manipulador(BaseHTTPRequestHandler):
+    """Atende uma conexão (várias requisições, com keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas: sem isto, o algoritmo de
+    # Nagle segura o corpo até o ACK do cliente (~40 ms por requisição)
+    disable_nagle_algorithm = True
+    server_version = "OtimizaServidor/1.0"
+    verboso = False
+
+    def _ler_corpo(self):
+        try:
+            tamanho = _numero(self.headers.get("Content-Length") or 0, "Content-Length")
+            if tamanho < 0:
+                raise RequisicaoInvalida(HTTPStatus.BAD_REQUEST, "Content-Length não pode ser negativo")
+        except RequisicaoInvalida:
+            self.close_connection = True  # sem saber onde o corpo acaba, a conexão não serve mais
+            raise
+        if not tamanho:
+            return {}
+        try:
+            corpo = serializacao.decodificar(self.rfile.read(tamanho))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise RequisicaoInvalida(HTTPStatus.BAD_REQUEST, f"JSON inválido: {e}") from None
+        if not isinstance(corpo, dict):
+            raise RequisicaoInvalida(HTTPStatus.BAD_REQUEST, "O corpo deve ser um objeto JSON")
+        return corpo
+
+    def _responder(self, status, dados):
+        conteudo = serializacao.codificar(dados, legivel=False)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def _atender(self, metodo):
+        url = urlsplit(self.path)
+        partes = [parte for parte in url.path.split("/") if parte]
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        try:
+            if not 1 <= len(partes) <= 2:
+                raise RequisicaoInvalida(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {url.path}")
+            id = _numero(partes[1], "ID") if len(partes) == 2 else None
+            corpo = self._ler_corpo() if metodo in ("POST", "PATCH", "PUT") else {}
+            status, resposta = despachar(metodo, partes[0], id, parametros, corpo)
+        except RequisicaoInvalida as e:
+            status, resposta = e.status, {"erro": str(e), "tipo": type(e).__name__}
+        except Exception as e:
+            status = next((s for tipo, s in STATUS_DOS_ERROS if isinstance(e, tipo)), None)
+            if status is None:
+                self.log_error("Erro inesperado em %s %s: %r", metodo, self.path, e)
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+            resposta = {"erro": str(e), "tipo": type(e).__name__}
+            if getattr(e, "campo", None):
+                resposta["campo"] = e.campo
+            if getattr(e, "dependentes", None):
+                resposta["dependentes"] = {nome: len(ids) for nome, ids in e.dependentes.items()}
+        self._responder(status, resposta)
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def do_PATCH(self):
+        self._atender("PATCH")
+
+    def do_PUT(self):
+        self._atender("PUT")
+
+    def do_DELETE(self):
+        self._atender("DELETE")
+
+    def log_message(self, formato, *args):
+        if self.verboso:
+            super().log_message(formato, *args)
+
+def criar_servidor(host="127.0.0.1", porta=8000, verboso=False):
+    """Cria o servidor (ainda parado); a porta 0 escolhe uma livre."""
+    Manipulador.verboso = verboso
+    return ThreadingHTTPServer((host, porta), Manipulador)
+
+def _parar(sinal, quadro):
+    raise KeyboardInterrupt
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="endereço de escuta (padrão: só a máquina local)")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--pasta", default=repositorio.PASTA_DADOS, help="pasta de dados")
+    parser.add_argument("--backend", choices=sorted(repositorio.BACKENDS), help="backend de armazenamento")
+    parser.add_argument("--verboso", action="store_true", help="registra cada requisição")
+    args = parser.parse_args()
+
+    if args.backend:
+        repositorio.configurar_backend(args.backend)
+    repositorio.configurar_pasta(args.pasta)
+    # Carrega tudo (e os índices de busca) antes de aceitar conexões: a primeira
+    # requisição não paga a leitura do disco, e as threads não montam índices juntas
+    for entidade in repositorio.ENTIDADES:
+        repositorio.indice(entidade)
+    for entidade in CADASTROS:
+        busca.indice(entidade)
+
+    servidor = criar_servidor(args.host, args.porta, args.verboso)
+    # SIGTERM (ex.: systemd, kill) para como o Ctrl+C, gravando o que estiver pendente
+    signal.signal(signal.SIGTERM, _parar)
+    print(f"🌐 Servindo {args.pasta} em http://{args.host}:{servidor.server_address[1]} (Ctrl+C para parar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Parando o servidor...")
+    finally:
+        servidor.server_close()
+        repositorio.descarregar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import ItemsView, MutableMapping, ValuesView
+
+from arquivos import escrita_atomica
+
+# ===================== Snapshot binário =====================
+# Um arquivo <entidade>.bin espelha o snapshot <entidade>.json:
+#
+#   "OTZSNAP1" | tamanho do cabeçalho (int64) | cabeçalho JSON | blocos
+#
+# O cabeçalho diz quantos registros há, de qual versão do .json eles vieram
+# (mtime/tamanho) e onde está cada bloco. Cada campo numérico é uma coluna de
+# largura fixa (int64 ou float64, um valor por registro); cada campo texto é
+# um par de colunas (início, tamanho) apontando para um heap de bytes UTF-8.
+# Os itens das vendas formam uma tabela filha com as mesmas regras, e o que
+# não couber no esquema (campos desconhecidos, tipos diferentes) vai como
+# JSON no heap, na coluna "extras". Os registros são gravados em ordem de ID,
+# então achar um registro é uma busca binária na coluna de IDs.
+#
+# Abrir o arquivo só lê o cabeçalho: as colunas são memoryviews sobre o mmap,
+# e um registro só é montado quando é acessado, lendo apenas as páginas que
+# ele toca.
+
+MAGICO = b"OTZSNAP1"
+ALINHAMENTO = 8
+
+NULO_INTEIRO = -(2 ** 63)   # int64 ausente (float64 ausente é NaN)
+
+ITENS = [("id_produto", "q"), ("quantidade", "q"), ("valor_produto", "d"), ("valor_total", "d")]
+
+# Campos de cada entidade, na ordem do registro; o primeiro é a chave. O tipo
+# é "q" (int64), "d" (float64), "s" (texto) ou uma lista (tabela filha).
+ESQUEMAS = {
+    "clientes": [("id", "q"), ("nome", "s"), ("cpf", "s"), ("telefone", "s"), ("email", "s")],
+    "fornecedores": [
+        ("id", "q"), ("nome", "s"), ("cnpj", "s"), ("telefone", "s"), ("email", "s"),
+        ("pais", "s"), ("estado", "s"), ("cidade", "s"), ("bairro", "s"), ("rua_num", "s"),
+    ],
+    "produtos": [
+        ("id_produto", "q"), ("nome", "s"), ("preco", "d"), ("estoque", "q"),
+        ("fornecedor_id", "q"), ("versao", "q"),
+    ],
+    "vendas": [("id_venda", "q"), ("id_cliente", "q"), ("data_hora", "s"), ("itens", ITENS), ("valor_total", "d")],
+}
+
+TIPOS_PYTHON = {"q": int, "d": float, "s": str}
+
+# ===================== Gravação =====================
+
+class _Colunas:
+    """Acumula as colunas e o heap de texto durante a gravação."""
+
+    def __init__(self):
+        self.colunas = {}
+        self.heap = bytearray()
+        self.filhos = {}   # tabela filha -> linhas já gravadas
+
+    def coluna(self, nome, tipo):
+        if nome not in self.colunas:
+            self.colunas[nome] = array(tipo)
+        return self.colunas[nome]
+
+    def texto(self, nome, valor):
+        inicio, tamanho = self.coluna(nome + ":inicio", "q"), self.coluna(nome + ":tamanho", "q")
+        if valor is None:
+            inicio.append(0)
+            tamanho.append(-1)
+            return
+        dados = valor.encode("utf-8")
+        inicio.append(len(self.heap))
+        tamanho.append(len(dados))
+        self.heap += dados
+
+def _criar_colunas(colunas, prefixo, esquema):
+    """Cria as colunas do esquema (vazias também existem, para a leitura não depender dos dados)."""
+    for campo, tipo in esquema:
+        nome = prefixo + campo
+        if isinstance(tipo, list):
+            colunas.coluna(nome + ":inicio", "q")
+            colunas.coluna(nome + ":quantidade", "q")
+            _criar_colunas(colunas, nome + ".", tipo)
+        elif tipo == "s":
+            colunas.coluna(nome + ":inicio", "q")
+            colunas.coluna(nome + ":tamanho", "q")
+        else:
+            colunas.coluna(nome, tipo)
+
+def _cabe(valor, tipo):
+    """O valor pode ir na coluna do tipo? (o tipo exato, para a volta ser idêntica)"""
+    if isinstance(tipo, list):
+        return type(valor) in (list, tuple) and all(
+            set(item) <= {campo for campo, _ in tipo}
+            and all(_cabe(item[campo], t) for campo, t in tipo if campo in item)
+            for item in valor
+        )
+    return type(valor) is TIPOS_PYTHON[tipo]
+
+def _gravar_campos(colunas, prefixo, esquema, registro, extras):
+    for campo, tipo in esquema:
+        nome = prefixo + campo
+        valor = registro.get(campo)
+        if campo in registro and not _cabe(valor, tipo):
+            extras[campo] = valor
+            valor = None
+        if isinstance(tipo, list):
+            inicio, quantidade = colunas.coluna(nome + ":inicio", "q"), colunas.coluna(nome + ":quantidade", "q")
+            inicio.append(colunas.filhos.get(nome, 0))
+            quantidade.append(-1 if valor is None else len(valor))
+            colunas.filhos[nome] = colunas.filhos.get(nome, 0) + len(valor or ())
+            for item in valor or ():
+                _gravar_campos(colunas, nome + ".", tipo, item, {})
+        elif tipo == "s":
+            colunas.texto(nome, valor)
+        elif tipo == "d":
+            colunas.coluna(nome, "d").append(float("nan") if valor is None else valor)
+        else:
+            colunas.coluna(nome, "q").append(NULO_INTEIRO if valor is None else valor)
+
+def gravar(caminho, entidade, registros, origem):
+    """Grava os registros no formato binário; `origem` é a assinatura do .json espelhado."""
+    esquema = ESQUEMAS[entidade]
+    chave = esquema[0][0]
+    conhecidos = {campo for campo, _ in esquema}
+    colunas = _Colunas()
+    _criar_colunas(colunas, "", esquema + [("extras", "s")])
+    registros = sorted(registros, key=lambda r: r[chave])
+
+    for registro in registros:
+        extras = {campo: valor for campo, valor in registro.items() if campo not in conhecidos}
+        _gravar_campos(colunas, "", esquema, registro, extras)
+        colunas.texto("extras", json.dumps(extras, ensure_ascii=False, default=dict) if extras else None)
+
+    blocos = list(colunas.colunas.items()) + [("heap", array("B", colunas.heap))]
+    cabecalho = {"entidade": entidade, "registros": len(registros), "origem": list(origem), "blocos": {}}
+    posicao = 0
+    for nome, dados in blocos:
+        posicao += -posicao % ALINHAMENTO
+        cabecalho["blocos"][nome] = [dados.typecode, posicao, len(dados)]
+        posicao += len(dados) * dados.itemsize
+
+    texto = json.dumps(cabecalho).encode("utf-8")
+    texto += b" " * (-len(texto) % ALINHAMENTO)
+    with escrita_atomica(caminho, "wb") as f:
+        f.write(MAGICO + struct.pack("<q", len(texto)) + texto)
+        escrito = 0
+        for nome, dados in blocos:
+            f.write(b"\0" * (-escrito % ALINHAMENTO))
+            escrito += -escrito % ALINHAMENTO
+            dados.tofile(f)
+            escrito += len(dados) * dados.itemsize
+
+# ===================== Leitura =====================
+
+class SnapshotBinario:
+    """Um arquivo .bin aberto com mmap; registro(i) monta o i-ésimo registro."""
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGICO)] != MAGICO:
+            raise ValueError(f"{caminho} não é um snapshot binário")
+        tamanho = struct.unpack_from("<q", self._mmap, len(MAGICO))[0]
+        inicio_dados = len(MAGICO) + 8 + tamanho
+        cabecalho = json.loads(bytes(self._mmap[len(MAGICO) + 8:inicio_dados]))
+
+        self.entidade = cabecalho["entidade"]
+        self.origem = tuple(cabecalho["origem"])
+        self.quantidade = cabecalho["registros"]
+        self.esquema = ESQUEMAS[self.entidade]
+        visao = memoryview(self._mmap)
+        self._blocos = {}
+        for nome, (tipo, posicao, quantidade) in cabecalho["blocos"].items():
+            inicio = inicio_dados + posicao
+            bloco = visao[inicio:inicio + quantidade * array(tipo).itemsize]
+            self._blocos[nome] = bloco if tipo == "B" else bloco.cast(tipo)
+        self.ids = self._blocos[self.esquema[0][0]]
+
+    def posicao(self, id):
+        """Posição do registro com o ID, ou None (busca binária na coluna de IDs)."""
+        posicao = bisect_left(self.ids, id)
+        if posicao < self.quantidade and self.ids[posicao] == id:
+            return posicao
+        return None
+
+    def _texto(self, nome, i):
+        tamanho = self._blocos[nome + ":tamanho"][i]
+        if tamanho < 0:
+            return None
+        inicio = self._blocos[nome + ":inicio"][i]
+        return str(self._blocos["heap"][inicio:inicio + tamanho], "utf-8")
+
+    def _campos(self, prefixo, esquema, i):
+        registro = {}
+        blocos = self._blocos
+        for campo, tipo in esquema:
+            nome = prefixo + campo
+            if isinstance(tipo, list):
+                quantidade = blocos[nome + ":quantidade"][i]
+                if quantidade >= 0:
+                    inicio = blocos[nome + ":inicio"][i]
+                    registro[campo] = [self._campos(nome + ".", tipo, j) for j in range(inicio, inicio + quantidade)]
+            elif tipo == "s":
+                valor = self._texto(nome, i)
+                if valor is not None:
+                    registro[campo] = valor
+            else:
+                valor = blocos[nome][i]
+                if valor == valor and valor != NULO_INTEIRO:  # NaN != NaN
+                    registro[campo] = valor
+        return registro
+
+    def registro(self, i):
+        """Monta (decodifica) o i-ésimo registro como dict."""
+        registro = self._campos("", self.esquema, i)
+        extras = self._texto("extras", i)
+        if extras is not None:
+            registro.update(json.loads(extras))
+        return registro
+
+def abrir(caminho, origem):
+    """Abre o snapshot se ele espelha a versão `origem` do .json; senão, None."""
+    try:
+        snapshot = SnapshotBinario(caminho)
+    except (OSError, ValueError, KeyError):
+        return None
+    return snapshot if snapshot.origem == tuple(origem) else None
+
+# ===================== Coleção preguiçosa =====================
+
+class _Valores(ValuesView):
+    def __iter__(self):
+        return self._mapping._valores()
+
+class _Itens(ItemsView):
+    def __iter__(self):
+        colecao = self._mapping
+        return zip(iter(colecao), colecao._valores())
+
+class ColecaoBinaria(MutableMapping):
+    """{id: registro} sobre um snapshot binário, com as alterações por cima em memória.
+
+    Um registro acessado por ID é decodificado uma vez e guardado (quem o
+    altera vê sempre o mesmo objeto). Percorrer a coleção inteira decodifica
+    cada registro sem guardá-lo, para a memória não crescer até o tamanho do
+    arquivo.
+    """
+
+    def __init__(self, snapshot, converter=lambda registro: registro):
+        self._snapshot = snapshot
+        self._converter = converter
+        self._decodificados = {}   # id -> registro do snapshot já montado (ou substituído)
+        self._removidos = set()    # ids do snapshot removidos
+        self._novos = {}           # id -> registro que não está no snapshot
+
+    def _do_snapshot(self, id):
+        return id not in self._removidos and self._snapshot.posicao(id) is not None
+
+    def __getitem__(self, id):
+        registro = self._decodificados.get(id)
+        if registro is not None:
+            return registro
+        if id in self._novos:
+            return self._novos[id]
+        posicao = None if id in self._removidos else self._snapshot.posicao(id)
+        if posicao is None:
+            raise KeyError(id)
+        registro = self._decodificados[id] = self._converter(self._snapshot.registro(posicao))
+        return registro
+
+    def __setitem__(self, id, registro):
+        registro = self._converter(registro)
+        if self._snapshot.posicao(id) is not None:
+            self._removidos.discard(id)
+            self._decodificados[id] = registro
+        else:
+            self._novos[id] = registro
+
+    def __delitem__(self, id):
+        if id in self._novos:
+            del self._novos[id]
+        elif self._do_snapshot(id):
+            self._removidos.add(id)
+            self._decodificados.pop(id, None)
+        else:
+            raise KeyError(id)
+
+    def __contains__(self, id):
+        return id in self._novos or self._do_snapshot(id)
+
+    def __iter__(self):
+        removidos = self._removidos
+        for id in self._snapshot.ids:
+            if not removidos or id not in removidos:
+                yield id
+        yield from list(self._novos)
+
+    def __len__(self):
+        return self._snapshot.quantidade - len(self._removidos) + len(self._novos)
+
+    def _valores(self):
+        snapshot, decodificados, removidos = self._snapshot, self._decodificados, self._removidos
+        for i, id in enumerate(snapshot.ids):
+            if removidos and id in removidos:
+                continue
+            registro = decodificados.get(id)
+            yield registro if registro is not None else self._converter(snapshot.registro(i))
+        yield from list(self._novos.values())
+
+    def values(self):
+        return _Valores(self)
+
+    def items(self):
+        return _Itens(self)
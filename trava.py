@@ -0,0 +1,59 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ===================== Trava entre processos =====================
+# Vários terminais podem rodar o programa sobre a mesma pasta dados/. Esta
+# trava exclusiva usa um arquivo auxiliar (flock no Linux/macOS, msvcrt no
+# Windows) e é reentrante dentro do mesmo processo.
+
+_travas = {}  # caminho -> [RLock, arquivo aberto, profundidade]
+_travas_lock = threading.Lock()
+
+def _bloquear(arquivo):
+    """Obtém a trava do sistema operacional sobre o arquivo."""
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        return
+    arquivo.seek(0)
+    while True:
+        try:
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue  # LK_LOCK desiste após ~10s; tenta de novo
+
+def _desbloquear(arquivo):
+    """Libera a trava do sistema operacional."""
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+        return
+    arquivo.seek(0)
+    msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def travar(caminho):
+    """Mantém uma trava exclusiva sobre `caminho` enquanto o bloco executa."""
+    caminho = os.path.abspath(caminho)
+    with _travas_lock:
+        estado = _travas.setdefault(caminho, [threading.RLock(), None, 0])
+
+    with estado[0]:
+        if estado[2] == 0:
+            estado[1] = open(caminho, "a+b")
+            _bloquear(estado[1])
+        estado[2] += 1
+        try:
+            yield
+        finally:
+            estado[2] -= 1
+            if estado[2] == 0:
+                _desbloquear(estado[1])
+                estado[1].close()
+                estado[1] = None
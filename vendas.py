@@ -1,61 +1,25 @@
-import json
-import os
-
-ARQUIVO_CLIENTES = os.path.join("dados", "clientes.json")
-ARQUIVO_PRODUTOS = os.path.join("dados", "produtos.json")
-ARQUIVO_VENDAS = os.path.join("dados", "vendas.json")
+import repositorio
+import servicos
+from erros import ConflitoDeVersao, EstoqueInsuficiente, NaoEncontrado
+from paginacao import paginar
+from sequencias import proximo_id
 
 # ========== Funções utilitárias ==========
 
-def carregar_clientes():
-    """Carrega os clientes do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_CLIENTES):
-        return []
-    with open(ARQUIVO_CLIENTES, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def carregar_produtos():
-    """Carrega os produtos do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_PRODUTOS):
-        return []
-    with open(ARQUIVO_PRODUTOS, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def carregar_vendas():
-    """Carrega as vendas do arquivo JSON."""
-    if not os.path.exists(ARQUIVO_VENDAS):
-        return []
-    with open(ARQUIVO_VENDAS, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def salvar_clientes(clientes):
-    """Salva a lista de clientes no arquivo JSON."""
-    with open(ARQUIVO_CLIENTES, "w", encoding="utf-8") as f:
-        json.dump(clientes, f, indent=4, ensure_ascii=False)
-
-def salvar_produtos(produtos):
-    """Salva a lista de produtos no arquivo JSON."""
-    with open(ARQUIVO_PRODUTOS, "w", encoding="utf-8") as f:
-        json.dump(produtos, f, indent=4, ensure_ascii=False)
-
-def salvar_vendas(vendas):
-    """Salva a lista de vendas no arquivo JSON."""
-    with open(ARQUIVO_VENDAS, "w", encoding="utf-8") as f:
-        json.dump(vendas, f, indent=4, ensure_ascii=False)
-
-def verificar_id_existe(id, vendas):
-    """Verifica se o ID já existe em qualquer lista de vendas."""
-    for v in vendas:
-        if v["id_venda"] == id:
-            return True
-    return False
-
-def gerar_id(vendas):
-    """Gera um novo ID baseado no maior existente, garantindo que seja único."""
-    new_id = max(v["id_venda"] for v in vendas) + 1 if vendas else 1
-    while verificar_id_existe(new_id, vendas):
-        new_id += 1  # Garantir que o ID seja único
-    return new_id
+def gerar_id():
+    """Gera um novo ID único a partir da sequência persistida (O(1))."""
+    return proximo_id("vendas")
+
+def itens_da_venda(venda):
+    """Retorna os itens de uma venda (vendas antigas têm um único produto, sem lista de itens)."""
+    if "itens" in venda:
+        return venda["itens"]
+    return [{
+        "id_produto": venda["id_produto"],
+        "quantidade": venda["quantidade"],
+        "valor_produto": venda["valor_produto"],
+        "valor_total": venda["valor_total"],
+    }]
 
 # ========== Funções de Validação e Cadastro de Venda ==========
 
@@ -64,10 +28,7 @@ def listar_clientes(clientes):
     if not clientes:
         print("Não há clientes cadastrados.")
         return []
-    print("\n--- Clientes Cadastrados ---")
-    for cliente in clientes:
-        print(f"ID: {cliente['id']} | Nome: {cliente['nome']}")
-    print()
+    paginar(clientes, lambda c: f"ID: {c['id']} | Nome: {c['nome']}", "id", "Clientes Cadastrados", entidade_busca="clientes")
     return clientes
 
 def listar_produtos(produtos):
@@ -75,14 +36,28 @@ def listar_produtos(produtos):
     if not produtos:
         print("Não há produtos cadastrados.")
         return []
-    print("\n--- Produtos Cadastrados ---")
-    for produto in produtos:
-        print(f"ID: {produto['id_produto']} | Nome: {produto['nome']} | Preço: R${produto['preco']:.2f} | Estoque: {produto['estoque']}")
-    print()
+    paginar(
+        produtos,
+        lambda p: f"ID: {p['id_produto']} | Nome: {p['nome']} | Preço: R${p['preco']:.2f} | Estoque: {p['estoque']}",
+        "id_produto",
+        "Produtos Cadastrados",
+        entidade_busca="produtos",
+    )
     return produtos
 
+def mostrar_carrinho(carrinho):
+    """Mostra os itens do carrinho e o total parcial."""
+    print("\n--- Carrinho ---")
+    total = 0
+    for id_produto, quantidade in carrinho.items():
+        produto = repositorio.buscar("produtos", id_produto)
+        subtotal = produto["preco"] * quantidade
+        total += subtotal
+        print(f"{produto['nome']} (ID: {id_produto}) | {quantidade} x R${produto['preco']:.2f} = R${subtotal:.2f}")
+    print(f"Total parcial: R${total:.2f}\n")
+
 def cadastrar_venda(vendas, clientes, produtos):
-    """Cadastra uma nova venda com validação de ID único."""
+    """Cadastra uma nova venda com um ou mais itens, gravada de uma só vez."""
     print("\n--- Cadastro de Venda ---")
     
     clientes = listar_clientes(clientes)
@@ -91,7 +66,7 @@ def cadastrar_venda(vendas, clientes, produtos):
     while True:
         try:
             id_cliente = int(input("Escolha o ID do Cliente: "))
-            cliente = next((c for c in clientes if c["id"] == id_cliente), None)
+            cliente = repositorio.buscar("clientes", id_cliente)
             if cliente:
                 break
             else:
@@ -102,61 +77,83 @@ def cadastrar_venda(vendas, clientes, produtos):
     produtos = listar_produtos(produtos)
     if not produtos:
         return
+
+    carrinho = {}  # id_produto -> quantidade
+    versoes = {}   # id_produto -> versão lida ao colocar no carrinho
     while True:
         try:
-            id_produto = int(input("Escolha o ID do Produto: "))
-            produto = next((p for p in produtos if p["id_produto"] == id_produto), None)
-            if produto:
-                break
-            else:
-                print("ID de produto inválido, tente novamente.")
+            id_produto = int(input("Escolha o ID do Produto (0 para fechar a venda): "))
         except ValueError:
             print("Erro: Por favor, insira um número válido para o ID do Produto.")
+            continue
+        if id_produto == 0:
+            if carrinho:
+                break
+            print("O carrinho está vazio, escolha ao menos um produto.")
+            continue
 
-    while True:
+        produto = repositorio.buscar("produtos", id_produto)
+        if not produto:
+            print("ID de produto inválido, tente novamente.")
+            continue
+
+        disponivel = produto['estoque'] - carrinho.get(id_produto, 0)
         try:
-            quantidade = int(input(f"Quantidade de {produto['nome']} (estoque disponível: {produto['estoque']}): "))
-            if 0 < quantidade <= produto['estoque']:
-                break
-            else:
-                print(f"Quantidade inválida, deve ser maior que 0 e não exceder o estoque ({produto['estoque']}).")
+            quantidade = int(input(f"Quantidade de {produto['nome']} (estoque disponível: {disponivel}): "))
         except ValueError:
             print("Erro: Por favor, insira um número válido para a Quantidade.")
+            continue
+        if not 0 < quantidade <= disponivel:
+            print(f"Quantidade inválida, deve ser maior que 0 e não exceder o estoque ({disponivel}).")
+            continue
 
-    valor_total = produto["preco"] * quantidade
-
-    venda = {
-        "id_venda": gerar_id(vendas),
-        "id_cliente": id_cliente,
-        "id_produto": id_produto,
-        "quantidade": quantidade,
-        "valor_produto": produto["preco"],
-        "valor_total": valor_total,
-    }
+        carrinho[id_produto] = carrinho.get(id_produto, 0) + quantidade
+        versoes.setdefault(id_produto, produto.get("versao", 0))
+        mostrar_carrinho(carrinho)
 
-    # Atualizar o estoque do produto
-    produto['estoque'] -= quantidade
-    salvar_produtos(produtos)  # Atualiza o arquivo de produtos
-
-    vendas.append(venda)
-    salvar_vendas(vendas)
+    while True:
+        try:
+            venda = servicos.registrar_venda(id_cliente, carrinho.items(), versoes)
+            break
+        except NaoEncontrado as e:
+            # Cliente ou produto excluído por outro terminal
+            print(f"⚠️ {e}\nVenda cancelada.\n")
+            return
+        except (ConflitoDeVersao, EstoqueInsuficiente) as e:
+            # Outro terminal vendeu ou alterou um produto enquanto o carrinho era montado
+            print(f"⚠️ {e}")
+            produto = e.produto
+            if produto["estoque"] < carrinho[produto["id_produto"]]:
+                print(f"{produto['nome']} foi retirado do carrinho.")
+                del carrinho[produto["id_produto"]]
+            versoes[produto["id_produto"]] = produto.get("versao", 0)
+            if not carrinho:
+                print("Venda cancelada: o carrinho ficou vazio.\n")
+                return
+            mostrar_carrinho(carrinho)
+            if input("Confirmar a venda com o estoque atual? (s/n): ").strip().lower() != 's':
+                print("Venda cancelada.\n")
+                return
 
     # Formatação mais bonita para o retorno
     print(f"\nVenda Cadastrada com Sucesso! 🎉\n")
     print(f"Venda ID: {venda['id_venda']}")
     print(f"Cliente: {cliente['nome']} (ID: {venda['id_cliente']})")
-    print(f"Produto: {produto['nome']} (ID: {venda['id_produto']})")
-    print(f"Preço Unitário: R${venda['valor_produto']:.2f}")
-    print(f"Quantidade: {venda['quantidade']}")
+    for item in venda["itens"]:
+        produto = repositorio.buscar("produtos", item["id_produto"])
+        print(
+            f"Produto: {produto['nome']} (ID: {item['id_produto']}) | "
+            f"Preço Unitário: R${item['valor_produto']:.2f} | Quantidade: {item['quantidade']}"
+        )
     print(f"Total: R${venda['valor_total']:.2f}")
     print("\n")
 
 # ========== MENU ==========
 
 def menu_vendas():
-    clientes = carregar_clientes()
-    produtos = carregar_produtos()
-    vendas = carregar_vendas()
+    clientes = repositorio.carregar("clientes")
+    produtos = repositorio.carregar("produtos")
+    vendas = repositorio.carregar("vendas")
 
     while True:
         print("""
@@ -174,22 +171,26 @@ def menu_vendas():
             listar_vendas(vendas)
         elif opcao == "3":
             print("Voltando ao menu principal...\n")
-            salvar_vendas(vendas)
             break
         else:
             print("Opção inválida. Tente novamente.\n")
 
+def formatar_venda(v):
+    """Formata uma venda para a listagem."""
+    itens = itens_da_venda(v)
+    produtos = ", ".join(f"{item['id_produto']} (x{item['quantidade']})" for item in itens)
+    return (
+        f"ID: {v['id_venda']} | Cliente: {v['id_cliente']} | Produtos: {produtos} | "
+        f"Qtd: {sum(item['quantidade'] for item in itens)} | Total: R${v['valor_total']:.2f}"
+    )
+
 def listar_vendas(vendas):
-    print("\n--- Lista de Vendas ---")
+    """Lista as vendas cadastradas, página por página."""
     if not vendas:
+        print("\n--- Lista de Vendas ---")
         print("Não há vendas cadastradas.")
         return
-    for v in vendas:
-        print(
-            f"ID: {v['id_venda']} | Cliente: {v['id_cliente']} | Produto: {v['id_produto']} | "
-            f"Qtd: {v['quantidade']} | Total: R${v['valor_total']:.2f}"
-        )
-    print()
+    paginar(vendas, formatar_venda, "id_venda", "Lista de Vendas")
 
 # Função principal para iniciar o programa
 if __name__ == "__main__":